@@ -30,6 +30,13 @@ TOKEN_FILE = CONFIG_DIR / "token.json"
 GOOGLE_SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME", "Internship_Leads")
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 
+# Seconds before the in-memory lead sheet snapshot is re-downloaded
+LEAD_SOURCE_REFRESH_SECONDS = float(os.getenv("LEAD_SOURCE_REFRESH_SECONDS", "600"))
+
+# Buffered sheet writes: flushed as one batchUpdate when either threshold is hit
+SHEET_WRITE_BATCH_SIZE = int(os.getenv("SHEET_WRITE_BATCH_SIZE", "25"))
+SHEET_WRITE_FLUSH_SECONDS = float(os.getenv("SHEET_WRITE_FLUSH_SECONDS", "30"))
+
 # Google Project Config
 GOOGLE_PROJECT_ID = os.getenv("GOOGLE_PROJECT_ID")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -65,8 +72,66 @@ SCOPES = [
 RESUME_PATH = ROOT_DIR / "resume.md"
 RESUME_PDF_PATH = ROOT_DIR / "resume.pdf"
 
-# Analytics
+# Analytics: indexed SQLite event store. ANALYTICS_FILE (JSON array) and
+# ANALYTICS_LOG (JSON Lines) are the older formats, imported on first use.
+ANALYTICS_DB = ROOT_DIR / "analytics.db"
 ANALYTICS_FILE = ROOT_DIR / "analytics.json"
+ANALYTICS_LOG = ROOT_DIR / "analytics.jsonl"
+ANALYTICS_ROLLUP = ROOT_DIR / "analytics_rollup.json"  # summary counters + last folded event id
+ANALYTICS_QUEUE_SIZE = int(os.getenv("ANALYTICS_QUEUE_SIZE", "1000"))  # events buffered for the writer thread
+# Compaction (fix_analytics_data.py --compact): months kept in the live store;
+# older events are moved to gzip segments in ANALYTICS_ARCHIVE_DIR
+ANALYTICS_RETAIN_MONTHS = int(os.getenv("ANALYTICS_RETAIN_MONTHS", "6"))
+ANALYTICS_ARCHIVE_DIR = ROOT_DIR / "analytics_archive"
+
+# Email validation cache (syntax per address, MX verdicts per domain)
+VALIDATION_CACHE_FILE = ROOT_DIR / "validation_cache.db"
+MX_CACHE_TTL_SECONDS = float(os.getenv("MX_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+MX_NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("MX_NEGATIVE_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# --prevalidate: concurrent DNS lookups and per-lookup timeout (seconds)
+PREVALIDATE_CONCURRENCY = int(os.getenv("PREVALIDATE_CONCURRENCY", "50"))
+PREVALIDATE_DNS_TIMEOUT = float(os.getenv("PREVALIDATE_DNS_TIMEOUT", "10"))
+
+# Company research cache ("sqlite" by default, or "redis" via REDIS_URL)
+RESEARCH_CACHE_BACKEND = os.getenv("RESEARCH_CACHE_BACKEND", "sqlite").lower()
+RESEARCH_CACHE_FILE = ROOT_DIR / "research_cache.db"
+RESEARCH_CACHE_TTL_SECONDS = float(os.getenv("RESEARCH_CACHE_TTL_SECONDS", str(14 * 24 * 3600)))
+RESEARCH_CACHE_PER_RECIPIENT = os.getenv("RESEARCH_CACHE_PER_RECIPIENT", "False").lower() == "true"
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Content-addressed store for resume/research text referenced from graph state
+BLOB_DIR = ROOT_DIR / "blobs"
+
+# Durable LangGraph checkpoints for --resume ("sqlite" or "redis")
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+CHECKPOINT_FILE = ROOT_DIR / "checkpoints.db"
+
+# Journal of sheet writes that have not been flushed yet (replayed on startup)
+SHEET_WRITE_JOURNAL = ROOT_DIR / "sheet_writes.journal"
+
+# Concurrent auto_draft pipeline: leads in flight, and per-API call limits
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "4"))
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "4"))
+GMAIL_CONCURRENCY = int(os.getenv("GMAIL_CONCURRENCY", "4"))
+SHEETS_CONCURRENCY = int(os.getenv("SHEETS_CONCURRENCY", "2"))
+GMAIL_BATCH_SIZE = min(int(os.getenv("GMAIL_BATCH_SIZE", "100")), 100)  # reads per HTTP batch (API max 100)
+GMAIL_MEDIA_UPLOAD = os.getenv("GMAIL_MEDIA_UPLOAD", "True").lower() == "true"  # False: send messages as base64 "raw" JSON
+THREAD_CACHE_SIZE = int(os.getenv("THREAD_CACHE_SIZE", "200"))  # full Gmail threads kept in memory
+THREAD_HISTORY_TOKEN_BUDGET = int(os.getenv("THREAD_HISTORY_TOKEN_BUDGET", "1500"))  # per thread sent to the LLM; newest messages kept
+MAILBOX_INDEX_FILE = ROOT_DIR / "mailbox_index.db"  # ACE threads, synced via history.list
+
+# --send-drafts pacing (see src/send_scheduler.py); the queue survives interruptions
+SEND_QUEUE_FILE = ROOT_DIR / "send_queue.db"
+SEND_RATE_PER_MINUTE = float(os.getenv("SEND_RATE_PER_MINUTE", "3"))
+SEND_RATE_PER_DAY = int(os.getenv("SEND_RATE_PER_DAY", "500"))  # Gmail's limit for personal accounts
+SEND_BURST = int(os.getenv("SEND_BURST", "1"))  # sends allowed back to back
+SEND_DOMAIN_SPACING = float(os.getenv("SEND_DOMAIN_SPACING", "60"))  # seconds between sends to one domain
+SEND_JITTER = float(os.getenv("SEND_JITTER", "0.25"))  # random extra delay, as a share of the interval
+SEND_MAX_ATTEMPTS = int(os.getenv("SEND_MAX_ATTEMPTS", "3"))
+
+# Interactive mode: leads drafted in the background while one is being reviewed
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "2"))
 
 # Iteration Guards
 MAX_REFINEMENT_ITERATIONS = 5
@@ -1,52 +1,97 @@
 import logging
+import re
 import sys
-from src.tools_gmail import get_gmail_service
-from src.tools_followup import setup_followup_columns, get_all_leads_with_status, update_thread_id
+from datetime import datetime, timedelta
+from src.mailbox_index import get_mailbox_index
+from src.tools_gmail import latest_threads_by_recipient, sync_mailbox_index
+from src.tools_followup import setup_followup_columns, get_all_leads_with_status, update_thread_ids
+from src.tools_sheets import EMAIL_REGEX
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def find_thread_id_for_email(service, email):
-    """Searches Gmail for the latest message sent to the given email."""
-    query = f"to:{email}"
-    try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=1).execute()
-        messages = results.get('messages', [])
-        if not messages:
-            # Also check drafts
-            draft_results = service.users().drafts().list(userId='me', q=query).execute()
-            drafts = draft_results.get('drafts', [])
-            if drafts:
-                # Get the message ID from the draft
-                draft = service.users().drafts().get(userId='me', id=drafts[0]['id']).execute()
-                return draft['message']['threadId']
+# Searched in this order: a sent message wins over a draft to the same address
+SCAN_LABELS = ("SENT", "DRAFT")
+
+
+def lead_addresses(email_cell):
+    """Lower-cased addresses in an Email cell (the cell itself if none parse)."""
+    return [a.lower() for a in re.findall(EMAIL_REGEX, email_cell)] or [email_cell.strip().lower()]
+
+
+def scan_after(leads):
+    """Day before the oldest lead's Sent/Drafted date, bounding the label scan (None if any date is missing)."""
+    dates = []
+    for lead in leads:
+        match = re.search(r"\d{4}-\d{2}-\d{2}", lead.get('status', ''))
+        if not match:
             return None
-            
-        return messages[0]['threadId']
-    except Exception as e:
-        logger.error(f"Error searching for {email}: {e}")
-        return None
+        dates.append(datetime.strptime(match.group(), "%Y-%m-%d").date())
+    # A day of slack: Gmail reads after: in its own timezone
+    return min(dates) - timedelta(days=1) if dates else None
+
+
+def match_thread(addresses, recipient_threads):
+    for addr in addresses:
+        if addr in recipient_threads:
+            return recipient_threads[addr]
+    return None
+
 
 def main():
     print("Setting up follow-up columns...")
     setup_followup_columns()
-    
+
     print("Fetching leads to sync...")
     leads = get_all_leads_with_status()
     if not leads:
         print("No leads found that need a Thread ID sync.")
         return
-        
-    print(f"Found {len(leads)} leads to sync. Starting Gmail search...")
-    service = get_gmail_service()
-    
+
+    print(f"Found {len(leads)} leads to sync.")
+    # Threads ACE wrote to are already in the mailbox index
+    index = get_mailbox_index()
+    try:
+        sync_mailbox_index()
+    except Exception as e:
+        logger.warning(f"Mailbox sync failed ({e}); scanning Gmail for every lead.")
+
+    found = {}
+    pending = []
     for lead in leads:
-        print(f"Searching for: {lead['email']}...")
-        thread_id = find_thread_id_for_email(service, lead['email'])
+        addresses = lead_addresses(lead['email'])
+        thread_id = next(filter(None, (index.latest_thread_for(a) for a in addresses)), None)
         if thread_id:
-            update_thread_id(lead['row_index'], thread_id, lead['thread_idx'])
+            found[lead['row_index']] = thread_id
         else:
-            print(f"No thread found for {lead['email']}")
+            pending.append((lead, addresses))
+
+    # One pass over each label matches every remaining lead locally
+    for label in SCAN_LABELS:
+        if not pending:
+            break
+        after = scan_after([lead for lead, _ in pending])
+        since = f" since {after:%Y-%m-%d}" if after else ""
+        print(f"Scanning {label}{since} for {len(pending)} lead(s)...")
+        recipient_threads = latest_threads_by_recipient(
+            label, wanted=[addresses for _, addresses in pending], after=after,
+        )
+        still_pending = []
+        for lead, addresses in pending:
+            thread_id = match_thread(addresses, recipient_threads)
+            if thread_id:
+                found[lead['row_index']] = thread_id
+            else:
+                still_pending.append((lead, addresses))
+        pending = still_pending
+
+    for lead, _ in pending:
+        print(f"No thread found for {lead['email']}")
+
+    if found:
+        thread_idx = leads[0]['thread_idx']
+        update_thread_ids(found, thread_idx)
+    print(f"Thread IDs written for {len(found)} of {len(leads)} lead(s).")
 
 if __name__ == "__main__":
     main()
@@ -1,98 +1,117 @@
 #!/usr/bin/env python3
 """
-One-time cleanup script for analytics.json.
+Cleanup script for the analytics event store (analytics.db).
 
 Detects and reports data quality issues:
 - Unknown/Unknown entries from empty sheet rows
 - Duplicate lead_processed events from pipeline retries
 - Creates a backup before any modifications
+
+With --compact it also fixes them: duplicate lead_processed events and
+Unknown/Unknown events are deleted, months older than --retain-months are
+moved to compressed archive segments, and the summary rollup is rebuilt.
+Run it while the pipeline is not running.
 """
-import json
-import shutil
-from collections import Counter
-from datetime import datetime
+import argparse
 from pathlib import Path
 
-ANALYTICS_FILE = Path(__file__).parent / "analytics.json"
-BACKUP_FILE = Path(__file__).parent / "analytics_backup.json"
+from config.settings import ANALYTICS_ARCHIVE_DIR, ANALYTICS_RETAIN_MONTHS
+from src.analytics import (
+    compact_events,
+    daily_counts,
+    duplicates,
+    events_for_company,
+    get_event_store,
+    get_rollup,
+)
+
+BACKUP_FILE = Path(__file__).parent / "analytics_backup.db"
 
 
 def main():
-    if not ANALYTICS_FILE.exists():
-        print("No analytics.json found. Nothing to clean.")
+    parser = argparse.ArgumentParser(description="Report (and optionally fix) analytics data quality issues")
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="Delete duplicate and Unknown/Unknown events and archive old months"
+    )
+    parser.add_argument(
+        "--retain-months", type=int, default=ANALYTICS_RETAIN_MONTHS,
+        help=f"Months kept in the live store by --compact (default: {ANALYTICS_RETAIN_MONTHS})"
+    )
+    args = parser.parse_args()
+
+    # Opening the store also migrates an older analytics.json/.jsonl into it
+    store = get_event_store()
+    rollup = get_rollup()
+    if not rollup.total_events:
+        print("No analytics events found. Nothing to clean.")
         return
 
-    with open(ANALYTICS_FILE, "r") as f:
-        events = json.load(f)
-
-    print(f"Loaded {len(events)} events from analytics.json\n")
+    print(f"Loaded {rollup.total_events} events from {store.path.name}\n")
 
     # ── 1. Backup ──
-    shutil.copy2(ANALYTICS_FILE, BACKUP_FILE)
+    store.backup(BACKUP_FILE)
     print(f"✓ Backup created: {BACKUP_FILE}\n")
 
     # ── 2. Report: Unknown/Unknown leads ──
     unknown_leads = [
-        e for e in events
-        if e["event_type"] == "lead_processed"
-        and e.get("recipient", "") == "Unknown"
-        and e.get("company", "") == "Unknown"
+        e for e in events_for_company("Unknown", "lead_processed")
+        if e.get("recipient", "") == "Unknown"
     ]
     print(f"Unknown/Unknown lead_processed events: {len(unknown_leads)}")
 
     # ── 3. Report: Duplicate lead_processed ──
-    lead_keys = []
-    for e in events:
-        if e["event_type"] == "lead_processed":
-            key = (e.get("recipient", ""), e.get("company", ""))
-            lead_keys.append(key)
-
-    key_counts = Counter(lead_keys)
-    duplicates = {k: v for k, v in key_counts.items() if v > 1}
-    print(f"Duplicate lead_processed entries: {len(duplicates)} unique keys with dupes")
-    for (r, c), count in sorted(duplicates.items(), key=lambda x: -x[1])[:15]:
-        print(f"  ({r}, {c}): {count}x")
+    dupes = duplicates("lead_processed")
+    print(f"Duplicate lead_processed entries: {len(dupes)} unique keys with dupes")
+    for (r, c, stage), count in sorted(dupes.items(), key=lambda x: -x[1])[:15]:
+        label = f", follow-up {stage}" if stage else ""
+        print(f"  ({r}, {c}{label}): {count}x")
 
     # ── 4. Report: Event type distribution ──
     print(f"\nEvent type distribution:")
-    type_counts = Counter(e["event_type"] for e in events)
-    for t, c in sorted(type_counts.items(), key=lambda x: -x[1]):
+    for t, c in sorted(rollup.type_counts.items(), key=lambda x: -x[1]):
         print(f"  {t:<25}: {c:>5}")
 
     # ── 5. Report: Skip reason breakdown ──
-    skips = [e for e in events if e["event_type"] == "email_skipped"]
-    skip_reasons = Counter(e.get("reason", "unknown") for e in skips)
     print(f"\nSkip reason breakdown:")
-    for reason, count in sorted(skip_reasons.items(), key=lambda x: -x[1]):
+    for reason, count in sorted(rollup.skip_reasons.items(), key=lambda x: -x[1]):
         print(f"  {reason:<20}: {count:>5}")
 
     # ── 6. Report: Date range ──
-    timestamps = []
-    for e in events:
-        try:
-            timestamps.append(datetime.fromisoformat(e["timestamp"]))
-        except (KeyError, ValueError):
-            pass
-
-    if timestamps:
-        print(f"\nDate range: {min(timestamps).strftime('%Y-%m-%d %H:%M')} → {max(timestamps).strftime('%Y-%m-%d %H:%M')}")
-        date_counts = Counter(t.strftime("%Y-%m-%d") for t in timestamps)
+    if rollup.first_ts and rollup.last_ts:
+        print(f"\nDate range: {rollup.first_ts.strftime('%Y-%m-%d %H:%M')} → {rollup.last_ts.strftime('%Y-%m-%d %H:%M')}")
         print("Events per day:")
-        for dt, count in sorted(date_counts.items()):
+        for dt, count in daily_counts().items():
             print(f"  {dt}: {count:>5}")
 
     # ── 7. Report: Follow-up analysis ──
-    followups = [e for e in events if e["event_type"] == "followup_draft_created"]
-    if followups:
-        fu_threads = set(e.get("thread_id", "").strip() for e in followups if e.get("thread_id"))
-        fu_by_stage = Counter(e.get("followup_number", "?") for e in followups)
-        print(f"\nFollow-up drafts: {len(followups)}")
-        print(f"Unique follow-up threads: {len(fu_threads)}")
-        for stage, count in sorted(fu_by_stage.items(), key=lambda x: str(x[0])):
+    followup_count = rollup.type_counts["followup_draft_created"]
+    if followup_count:
+        print(f"\nFollow-up drafts: {followup_count}")
+        print(f"Unique follow-up threads: {len(rollup.followup_threads)}")
+        for stage, count in sorted(rollup.followup_by_number.items(), key=lambda x: str(x[0])):
             print(f"  Stage {stage}: {count}")
 
-    print("\n✓ Analysis complete. No destructive changes made.")
-    print("  The analytics.json data is preserved as-is.")
+    if not args.compact:
+        print("\n✓ Analysis complete. No destructive changes made.")
+        print(f"  The {store.path.name} data is preserved as-is.")
+        print(f"  Backup saved at: {BACKUP_FILE}")
+        return
+
+    # ── 8. Compact ──
+    print(f"\nCompacting {store.path.name}...")
+    result = compact_events(retain_months=args.retain_months)
+    print(f"  Duplicate lead_processed events removed: {result['duplicates_removed']}")
+    print(f"  Unknown/Unknown events removed: {result['unknown_removed']}")
+    archived = result["archived"]
+    if archived:
+        print(f"  Archived {sum(archived.values())} event(s) dated before {result['archive_cutoff']} to {ANALYTICS_ARCHIVE_DIR}:")
+        for month, count in sorted(archived.items()):
+            print(f"    {month}: {count:>5}")
+    else:
+        print(f"  No events dated before {result['archive_cutoff']} to archive.")
+
+    print(f"\n✓ Compaction complete. {get_rollup().total_events} event(s) remain in {store.path.name}.")
     print(f"  Backup saved at: {BACKUP_FILE}")
 
 
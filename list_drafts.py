@@ -1,12 +1,10 @@
 import json
 import logging
-from src.google_auth import get_credentials
-from googleapiclient.discovery import build
+from src.tools_gmail import get_gmail_service
 
 logging.basicConfig(level=logging.ERROR)
 
-creds = get_credentials()
-service = build('gmail', 'v1', credentials=creds)
+service = get_gmail_service()
 
 drafts = service.users().drafts().list(userId='me', maxResults=1).execute().get('drafts', [])
 
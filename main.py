@@ -8,12 +8,20 @@ from rich.prompt import Prompt
 from rich.table import Table
 from rich.live import Live
 
-from src.graph import create_graph
+from src.runner import run_auto_draft
+from src.prefetch import Prefetcher
 from src.state import AgentState
 from src.analytics import log_event, format_summary
-from src.tools_gmail import list_drafts, get_draft_details, send_draft, list_starred_threads, get_thread_history, get_thread_metadata, create_draft_reply
-from src.nodes import evaluate_starred_thread
-from config.settings import MAX_REFINEMENT_ITERATIONS, RESUME_PDF_PATH
+from src.tools_gmail import list_drafts, get_drafts_details_bulk, send_draft, list_starred_threads, get_threads_bulk, format_thread_history, extract_thread_metadata, create_draft_reply, sync_mailbox_index
+from src.mailbox_index import get_mailbox_index
+from src.nodes import evaluate_starred_thread, update_sheet_node
+from src.checkpoints import complete_lead, pending_leads, prune_lead, run_settings, sweep_blobs
+from src.graph import create_graph
+from src.tools_sheets import get_lead_source
+from src.prevalidate import prevalidate_sheet
+from src.research_cache import get_research_cache
+from src.send_scheduler import SendScheduler, describe_pace, is_gone
+from config.settings import MAX_REFINEMENT_ITERATIONS, PIPELINE_CONCURRENCY, PREFETCH_DEPTH, RESUME_PDF_PATH
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -69,82 +77,124 @@ def display_variants(state: AgentState) -> None:
     return selected_subject
 
 
+def sync_mailbox() -> None:
+    """Pulls replies and bounces since the last run into the mailbox index."""
+    console.print("[dim]Syncing mailbox index...[/dim]")
+    try:
+        sync_mailbox_index()
+    except Exception as e:
+        console.print(f"[yellow]Mailbox sync failed ({e}); continuing without it.[/yellow]")
+
+
 # ---------------------------------------------------------------------------
 # Send Drafts Mode
 # ---------------------------------------------------------------------------
-SEND_INTERVAL = 20  # seconds between sends
+def _draft_headers(details) -> tuple:
+    """(To, Subject) of a draft from its metadata, or placeholders."""
+    if details is None:
+        return "[unknown]", "[could not fetch details]"
+    headers = {
+        h["name"]: h["value"]
+        for h in details.get("message", {}).get("payload", {}).get("headers", [])
+    }
+    return headers.get("To", "[unknown]"), headers.get("Subject", "[no subject]")
 
 
 def send_drafts_loop(limit: int) -> None:
-    """Fetch recent Gmail drafts and send them at 20-second intervals.
+    """Queue recent Gmail drafts and send them at the pace the scheduler allows.
+
+    Recent drafts are added to the queue on every run; drafts left there by
+    an interrupted run keep their place and are sent first.
 
     Args:
         limit: Max number of drafts to send. 0 means unlimited (until exhausted).
     """
+    scheduler = SendScheduler()
     mode_label = f"up to {limit}" if limit > 0 else "all available"
     console.print(Panel(
         f"[bold magenta]Send Drafts Mode[/bold magenta]\n"
-        f"Sending [bold]{mode_label}[/bold] recent drafts at {SEND_INTERVAL}s intervals.\n"
-        f"Press [bold red]Ctrl+C[/bold red] to stop.",
+        f"Sending [bold]{mode_label}[/bold] recent drafts, {scheduler.describe()}.\n"
+        f"Press [bold red]Ctrl+C[/bold red] to stop; unsent drafts stay queued for the next run.",
         expand=False,
     ))
 
+    queued = scheduler.pending()
+    if queued:
+        console.print(f"\n[yellow]Resuming {len(queued)} draft(s) queued by an earlier run.[/yellow]")
+
     # Fetch drafts
     fetch_count = limit if limit > 0 else 500  # reasonable upper bound
     console.print(f"\n[dim]Fetching drafts...[/dim]")
-    drafts = list_drafts(max_results=fetch_count)
-
-    if not drafts:
+    already_queued = {item.draft_id for item in queued}
+    drafts = [d for d in list_drafts(max_results=fetch_count) if d["id"] not in already_queued]
+
+    if drafts:
+        # Header details (recipient domain, display), fetched in batches up front
+        try:
+            details_by_id = get_drafts_details_bulk([d["id"] for d in drafts])
+        except Exception as e:
+            console.print(f"[yellow]Could not fetch draft details: {e}[/yellow]")
+            details_by_id = {}
+
+        # Drafts queued earlier are ignored, so they keep their place
+        scheduler.enqueue(
+            (d["id"], *_draft_headers(details_by_id.get(d["id"]))) for d in drafts
+        )
+        queued = scheduler.pending()
+
+    if not queued:
         console.print("[yellow]No drafts found. Nothing to send.[/yellow]")
         return
 
-    total = len(drafts)
-    if limit > 0:
-        total = min(total, limit)
-        drafts = drafts[:total]
-
-    console.print(f"[green]Found {len(drafts)} draft(s) to send.[/green]\n")
+    total = min(len(queued), limit) if limit > 0 else len(queued)
+    console.print(f"[green]{total} draft(s) to send.[/green]\n")
 
     sent_count = 0
+    failed_count = 0
     try:
-        for i, draft_meta in enumerate(drafts, 1):
-            draft_id = draft_meta["id"]
-
-            # Fetch header details for display
-            try:
-                details = get_draft_details(draft_id)
-                headers = {
-                    h["name"]: h["value"]
-                    for h in details.get("message", {}).get("payload", {}).get("headers", [])
-                }
-                to_field = headers.get("To", "[unknown]")
-                subject = headers.get("Subject", "[no subject]")
-            except Exception:
-                to_field = "[unknown]"
-                subject = "[could not fetch details]"
+        while sent_count + failed_count < total:
+            item, wait = scheduler.next_ready()
+            if item is None and wait == 0:
+                break
+            if item is None:
+                if scheduler.daily_limit_reached():
+                    console.print(
+                        f"[yellow]Daily send limit reached ({scheduler.sent_today()} in the last 24h). "
+                        f"Run --send-drafts again later to continue the queue.[/yellow]"
+                    )
+                    break
+                console.print(f"  [dim]Waiting {wait:.0f}s...[/dim]")
+                time.sleep(wait)
+                continue
 
             console.print(
-                f"[bold cyan][{i}/{total}][/bold cyan] "
-                f"Sending → [bold]{to_field}[/bold]  ·  {subject}"
+                f"[bold cyan][{sent_count + failed_count + 1}/{total}][/bold cyan] "
+                f"Sending → [bold]{item.to}[/bold]  ·  {item.subject}"
             )
 
             # Send
             try:
-                send_draft(draft_id)
+                send_draft(item.draft_id, max_retries=0)
+                scheduler.record_sent(item)
                 sent_count += 1
                 console.print(f"  [green]✓ Sent successfully[/green]")
             except Exception as e:
-                console.print(f"  [red]✗ Failed: {e}[/red]")
-
-            # Sleep between sends (skip after the last one)
-            if i < total:
-                console.print(f"  [dim]Waiting {SEND_INTERVAL}s...[/dim]")
-                time.sleep(SEND_INTERVAL)
+                if scheduler.record_failure(item, e):
+                    console.print(f"  [yellow]Deferred: {e}[/yellow]")
+                elif is_gone(e):
+                    console.print(f"  [yellow]Skipped: draft no longer exists (already sent or deleted).[/yellow]")
+                    failed_count += 1
+                else:
+                    console.print(f"  [red]✗ Failed: {e}[/red]")
+                    failed_count += 1
 
     except KeyboardInterrupt:
         console.print(f"\n[bold red]Interrupted![/bold red]")
 
+    left = len(scheduler.pending())
     console.print(f"\n[bold green]Done. Sent {sent_count}/{total} draft(s).[/bold green]")
+    if left:
+        console.print(f"[dim]{left} draft(s) still queued; --send-drafts resumes them.[/dim]")
 
 
 # ---------------------------------------------------------------------------
@@ -177,6 +227,26 @@ def starred_emails_loop(limit: int) -> None:
 
     console.print(f"[green]Found {len(threads)} starred thread(s) to process.[/green]\n")
 
+    # Bounced threads need neither a read nor an evaluation
+    sync_mailbox()
+    index = get_mailbox_index()
+    bounced = set()
+    for t in threads:
+        status = index.status(t["id"])
+        if status and status.is_bounced:
+            bounced.add(t["id"])
+    if bounced:
+        console.print(f"[dim]Skipping {len(bounced)} bounced thread(s).[/dim]")
+        threads = [t for t in threads if t["id"] not in bounced]
+        total = len(threads)
+
+    # One batched read per 100 threads; each thread is then served from the
+    # thread cache for its metadata, history and any draft reply
+    threads_by_id = get_threads_bulk(
+        [t["id"] for t in threads],
+        {t["id"]: t["historyId"] for t in threads if "historyId" in t},
+    )
+
     try:
         for i, thread_meta in enumerate(threads, 1):
             thread_id = thread_meta["id"]
@@ -184,8 +254,12 @@ def starred_emails_loop(limit: int) -> None:
             console.print(f"[bold cyan]--- [{i}/{total}] Processing Thread {thread_id} ---[/bold cyan]")
             
             # Get metadata & history
-            meta = get_thread_metadata(thread_id)
-            chat_history = get_thread_history(thread_id)
+            thread = threads_by_id.get(thread_id)
+            if thread is None:
+                console.print("[red]Could not fetch this thread. Skipping.[/red]")
+                continue
+            meta = extract_thread_metadata(thread)
+            chat_history = format_thread_history(thread)
             
             # Evaluate
             console.print("[dim]Evaluating thread with LLM...[/dim]")
@@ -242,22 +316,198 @@ def starred_emails_loop(limit: int) -> None:
     console.print(f"\n[bold green]Done processing starred threads.[/bold green]")
 
 
+# ---------------------------------------------------------------------------
+# Interactive Mode
+# ---------------------------------------------------------------------------
+
+def review_lead(graph, config) -> dict:
+    """Walks the user through reviewing one prepared lead.
+
+    Loops through refinements until the lead's graph finishes (approved and
+    sent, or skipped) and returns its final state.
+    """
+    while True:
+        state = graph.get_state(config)
+        current_state = state.values
+
+        if not state.next:
+            return current_state
+        if "review" not in state.next or current_state.get("status") == "refining":
+            # Resumed mid-step (e.g. feedback given, refinement not done yet): finish it first
+            graph.invoke(None, config, durability="sync")
+            prune_lead(graph.checkpointer, config)
+            continue
+
+        display_draft(current_state)
+
+        # A/B Variant Selection
+        selected_subject = display_variants(current_state)
+        if selected_subject:
+            graph.update_state(config, {"email_subject": selected_subject})
+            # Refresh state
+            state = graph.get_state(config)
+            current_state = state.values
+
+        # Handle Email Selection if needed
+        candidate_emails = current_state.get('candidate_emails', [])
+        selected_emails = current_state.get('selected_emails')
+
+        if len(candidate_emails) > 1 and not selected_emails:
+            console.print(Panel(
+                "[bold yellow]WARNING:[/bold yellow] Multiple emails found for this lead.",
+                border_style="yellow"
+            ))
+            for i, email in enumerate(candidate_emails, 1):
+                console.print(f"  [{i}] {email}")
+
+            choice = Prompt.ask(
+                "Target which email? (Type 'all' for all, or '1', '2'...)",
+                default="all"
+            )
+
+            if choice.lower() == 'all':
+                selected_emails = candidate_emails
+            else:
+                try:
+                    idx = int(choice) - 1
+                    if 0 <= idx < len(candidate_emails):
+                        selected_emails = [candidate_emails[idx]]
+                    else:
+                        console.print("[red]Invalid index, defaulting to first.[/red]")
+                        selected_emails = [candidate_emails[0]]
+                except ValueError:
+                    console.print("[red]Invalid input, defaulting to first.[/red]")
+                    selected_emails = [candidate_emails[0]]
+
+            console.print(f"[green]Selected:[/green] {', '.join(selected_emails)}\n")
+        elif len(candidate_emails) == 1:
+            selected_emails = [candidate_emails[0]]
+
+        # Iteration guard — restrict options if max reached
+        iteration_count = current_state.get('iteration_count', 0)
+        if iteration_count >= MAX_REFINEMENT_ITERATIONS:
+            console.print(
+                f"[bold yellow]Max refinements ({MAX_REFINEMENT_ITERATIONS}) reached. "
+                f"You can only approve or skip.[/bold yellow]"
+            )
+            action = Prompt.ask(
+                "[y] Approve / [s] Skip",
+                default="y"
+            )
+        else:
+            action = Prompt.ask(
+                "[y] Approve / [s] Skip / [type feedback] Refine",
+                default="y"
+            )
+
+        if action.lower() == 'y':
+            graph.update_state(config, {
+                "status": "approved",
+                "selected_emails": selected_emails
+            })
+        elif action.lower() in ['s', 'skip']:
+            graph.update_state(config, {
+                "status": "skipped",
+                "selected_emails": None
+            })
+        else:
+            graph.update_state(config, {"user_feedback": action, "status": "refining"})
+
+        # Resume execution
+        logger.info("Resuming workflow...")
+        graph.invoke(None, config, durability="sync")
+        prune_lead(graph.checkpointer, config)
+
+
+def interactive_loop(base_state: dict, prefetch_depth: int, resume: list = None) -> None:
+    """Reviews leads one by one while the next ones are drafted in the background."""
+    prefetcher = Prefetcher(base_state, prefetch_depth, resume)
+    try:
+        while True:
+            prepared = prefetcher.next()
+            if prepared is None:
+                break
+            config, failed_state = prepared
+            final_state = failed_state or review_lead(prefetcher.graph, config)
+            update_sheet_node(final_state)
+            complete_lead(prefetcher.graph.checkpointer, config, final_state)
+    finally:
+        prefetcher.close()
+
+    console.print("\n[bold green]All leads processed. Goodbye![/bold green]")
+    # Print analytics summary
+    console.print(f"\n{format_summary()}")
+
+
+def settle_finished_leads(graph, pending: list) -> list:
+    """Writes back leads an interrupted run finished but never recorded.
+
+    Such a lead already went through ``send`` (or was skipped), so it must
+    not run again: its status is written to the sheet and its thread is
+    compacted. Returns the other leads as ``(config, values, created_at)``.
+    """
+    unfinished = []
+    for config, values, created_at, next_nodes in pending:
+        if next_nodes or "row_index" not in values:
+            unfinished.append((config, values, created_at))
+            continue
+        update_sheet_node(values)
+        complete_lead(graph.checkpointer, config, values)
+        console.print(f"[dim]Recorded the finished lead at row {values['row_index']} left by an interrupted run.[/dim]")
+    return unfinished
+
+
 def main():
     parser = argparse.ArgumentParser(description="ACE: Agentic Cold Emailer")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--follow-ups", type=int, choices=[1, 2], help="Run follow-up sequence (1 or 2)")
     group.add_argument(
         "--send-drafts", type=int, nargs="?", const=0, default=None, metavar="N",
-        help="Send recent Gmail drafts at 20s intervals. Optionally specify N to limit count."
+        help=f"Send recent Gmail drafts, {describe_pace()}. Optionally specify N to limit count."
     )
     group.add_argument(
         "--starred", type=int, nargs="?", const=0, default=None, metavar="N",
         help="Process starred emails and draft AI-suggested follow-ups. Optionally specify N to limit count."
     )
+    group.add_argument(
+        "--prevalidate", action="store_true",
+        help="Validate every pending lead's emails up front and write verdicts to the 'Validation' column."
+    )
+    group.add_argument(
+        "--resume", action="store_true",
+        help="Continue the leads an interrupted run left in progress, then carry on with new leads."
+    )
+    group.add_argument(
+        "--invalidate-research", nargs="?", const="", default=None, metavar="COMPANY",
+        help="Drop cached research for COMPANY (a name or an email domain such as acme.com), or for all companies if omitted."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=PIPELINE_CONCURRENCY, metavar="K",
+        help=f"Leads processed in parallel in automatic draft mode (default: {PIPELINE_CONCURRENCY})."
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=PREFETCH_DEPTH, metavar="N",
+        help=f"Leads drafted ahead in the background during interactive review; 0 disables (default: {PREFETCH_DEPTH})."
+    )
     args = parser.parse_args()
 
     console.print(Panel("[bold green]ACE: Agentic Cold Emailer[/bold green]", expand=False))
 
+    if args.invalidate_research is not None:
+        removed = get_research_cache().invalidate(args.invalidate_research)
+        target = args.invalidate_research or "all companies"
+        console.print(f"[green]Removed {removed} cached research entr{'y' if removed == 1 else 'ies'} for {target}.[/green]")
+        return
+
+    if args.prevalidate:
+        console.print("\n[dim]Pre-validating pending leads...[/dim]")
+        counts = prevalidate_sheet()
+        console.print(
+            f"[bold green]Done.[/bold green] Valid: {counts.get('valid', 0)}  "
+            f"Invalid: {counts.get('invalid', 0)}  Unverified: {counts.get('unverified', 0)}"
+        )
+        return
+
     if args.starred is not None:
         starred_emails_loop(args.starred)
         return
@@ -267,22 +517,49 @@ def main():
         send_drafts_loop(args.send_drafts)
         return
 
-    is_followup = args.follow_ups is not None
-    followup_num = args.follow_ups if is_followup else 0
-
-    if is_followup:
-        console.print(f"\n[bold yellow]FOLLOW-UP MODE: Stage {followup_num}[/bold yellow]")
-        run_mode = "auto_draft" # Follow-ups are usually bulk drafted
+    # Leads an interrupted run left mid-graph
+    graph = create_graph(single_lead=True)
+    pending = settle_finished_leads(graph, pending_leads(graph))
+    sweep_blobs()
+    # Their rows are never claimed afresh, whatever this run does: a lead may
+    # already have been emailed or drafted
+    get_lead_source().reserve(values["row_index"] for _, values, _ in pending if "row_index" in values)
+    resume_configs = []
+
+    if args.resume:
+        if not pending:
+            console.print("[yellow]No interrupted leads to resume.[/yellow]")
+            return
+        # Continue the most recent run; leads from other runs wait for another --resume
+        latest = run_settings(max(pending, key=lambda item: item[2])[1])
+        resumable = [(config, values) for config, values, _ in pending if run_settings(values) == latest]
+        resume_configs = [config for config, _ in resumable]
+        console.print(f"\n[bold]Resuming {len(resume_configs)} interrupted lead(s).[/bold]")
+        if len(pending) > len(resumable):
+            console.print(f"[dim]{len(pending) - len(resumable)} lead(s) from an earlier run remain; run --resume again for them.[/dim]")
+        run_mode = latest["mode"]
+        is_followup = latest["is_followup_mode"]
+        followup_num = latest["followup_number"]
     else:
-        # Mode Selection
-        console.print("\n[bold]Select Execution Mode:[/bold]")
-        console.print("1. [bold cyan]Interactive (HITL)[/bold cyan]: Review and approve each email before sending.")
-        console.print("2. [bold magenta]Automatic (Draft Mode)[/bold magenta]: Automatically create drafts for all leads to review later in Gmail.")
+        if pending:
+            console.print(f"[dim]{len(pending)} interrupted lead(s) found; their rows are held back. Use --resume to continue them.[/dim]")
+        is_followup = args.follow_ups is not None
+        followup_num = args.follow_ups if is_followup else 0
+
+        if is_followup:
+            console.print(f"\n[bold yellow]FOLLOW-UP MODE: Stage {followup_num}[/bold yellow]")
+            run_mode = "auto_draft" # Follow-ups are usually bulk drafted
+            sync_mailbox()
+        else:
+            # Mode Selection
+            console.print("\n[bold]Select Execution Mode:[/bold]")
+            console.print("1. [bold cyan]Interactive (HITL)[/bold cyan]: Review and approve each email before sending.")
+            console.print("2. [bold magenta]Automatic (Draft Mode)[/bold magenta]: Automatically create drafts for all leads to review later in Gmail.")
 
-        mode_choice = Prompt.ask("Enter choice", choices=["1", "2"], default="1")
+            mode_choice = Prompt.ask("Enter choice", choices=["1", "2"], default="1")
 
-        is_autonomous = (mode_choice == "2")
-        run_mode = "auto_draft" if is_autonomous else "interactive"
+            is_autonomous = (mode_choice == "2")
+            run_mode = "auto_draft" if is_autonomous else "interactive"
 
     is_autonomous = (run_mode == "auto_draft")
 
@@ -291,137 +568,19 @@ def main():
     elif not is_followup:
         console.print(f"\n[bold cyan]Starting in Interactive Mode.[/bold cyan]")
 
-    # Create Graph with conditional interrupt
-    graph = create_graph(autonomous=is_autonomous)
-    config = {"configurable": {"thread_id": "ace_session"}}
-
-    console.print("Starting workflow...")
-
-    # Run loop
-    first_run = True
-
-    while True:
-        state = graph.get_state(config)
-
-        if not state.values or first_run:
-            if not state.values:
-                initial_input = {
-                    "mode": run_mode,
-                    "is_followup_mode": is_followup,
-                    "followup_number": followup_num
-                }
-                graph.invoke(initial_input, config)
-            else:
-                graph.update_state(config, {
-                    "mode": run_mode,
-                    "is_followup_mode": is_followup,
-                    "followup_number": followup_num
-                })
-                if first_run and is_autonomous:
-                    graph.invoke(None, config)
-            first_run = False
-
-        # Refresh state after invoke
-        state = graph.get_state(config)
-        current_state = state.values
-
-        if not current_state:
-            break
-
-        if current_state.get("status") == "end":
-            console.print("\n[bold green]All leads processed. Goodbye![/bold green]")
-            # Print analytics summary
-            console.print(f"\n{format_summary()}")
-            break
-
-        # INTERACTIVE MODE LOGIC
-        if not is_autonomous:
-            if state.next and "review" in state.next:
-                display_draft(current_state)
-
-                # A/B Variant Selection
-                selected_subject = display_variants(current_state)
-                if selected_subject:
-                    graph.update_state(config, {"email_subject": selected_subject})
-                    # Refresh state
-                    state = graph.get_state(config)
-                    current_state = state.values
-
-                # Handle Email Selection if needed
-                candidate_emails = current_state.get('candidate_emails', [])
-                selected_emails = current_state.get('selected_emails')
-
-                if len(candidate_emails) > 1 and not selected_emails:
-                    console.print(Panel(
-                        "[bold yellow]WARNING:[/bold yellow] Multiple emails found for this lead.",
-                        border_style="yellow"
-                    ))
-                    for i, email in enumerate(candidate_emails, 1):
-                        console.print(f"  [{i}] {email}")
-
-                    choice = Prompt.ask(
-                        "Target which email? (Type 'all' for all, or '1', '2'...)",
-                        default="all"
-                    )
-
-                    if choice.lower() == 'all':
-                        selected_emails = candidate_emails
-                    else:
-                        try:
-                            idx = int(choice) - 1
-                            if 0 <= idx < len(candidate_emails):
-                                selected_emails = [candidate_emails[idx]]
-                            else:
-                                console.print("[red]Invalid index, defaulting to first.[/red]")
-                                selected_emails = [candidate_emails[0]]
-                        except ValueError:
-                            console.print("[red]Invalid input, defaulting to first.[/red]")
-                            selected_emails = [candidate_emails[0]]
-
-                    console.print(f"[green]Selected:[/green] {', '.join(selected_emails)}\n")
-                elif len(candidate_emails) == 1:
-                    selected_emails = [candidate_emails[0]]
-
-                # Iteration guard — restrict options if max reached
-                iteration_count = current_state.get('iteration_count', 0)
-                if iteration_count >= MAX_REFINEMENT_ITERATIONS:
-                    console.print(
-                        f"[bold yellow]Max refinements ({MAX_REFINEMENT_ITERATIONS}) reached. "
-                        f"You can only approve or skip.[/bold yellow]"
-                    )
-                    action = Prompt.ask(
-                        "[y] Approve / [s] Skip",
-                        default="y"
-                    )
-                else:
-                    action = Prompt.ask(
-                        "[y] Approve / [s] Skip / [type feedback] Refine",
-                        default="y"
-                    )
-
-                if action.lower() == 'y':
-                    graph.update_state(config, {
-                        "status": "approved",
-                        "selected_emails": selected_emails
-                    })
-                elif action.lower() in ['s', 'skip']:
-                    graph.update_state(config, {
-                        "status": "skipped",
-                        "selected_emails": None
-                    })
-                else:
-                    graph.update_state(config, {"user_feedback": action, "status": "refining"})
-
-                # Resume execution
-                logger.info("Resuming workflow...")
-                graph.invoke(None, config)
-            else:
-                graph.invoke(None, config)
+    if is_autonomous:
+        console.print(f"Starting workflow with up to {args.concurrency} lead(s) in parallel...")
+        processed = run_auto_draft(run_mode, is_followup, followup_num, args.concurrency, resume_configs)
+        console.print(f"\n[bold green]All leads processed ({processed}). Goodbye![/bold green]")
+        console.print(f"\n{format_summary()}")
+        return
 
-        # AUTOMATIC MODE LOGIC
-        else:
-            if current_state.get("status") != "end":
-                graph.invoke(None, config)
+    base_state = {
+        "mode": run_mode,
+        "is_followup_mode": is_followup,
+        "followup_number": followup_num,
+    }
+    interactive_loop(base_state, args.prefetch, resume_configs)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,479 @@
 """
 Analytics tracking for the ACE pipeline.
 
-Logs events to a JSON file and provides comprehensive summary reporting
-for email campaigns, follow-ups, A/B testing, and data quality insights.
+Stores events in an indexed SQLite database (EventStore) and provides
+comprehensive summary reporting for email campaigns, follow-ups, A/B
+testing, and data quality insights. Ad-hoc questions go through the query
+API (events_for_company, daily_counts, variant_stats, duplicates), which
+is answered from the indexes instead of by scanning every event. The older
+analytics.json / analytics.jsonl files are imported on first use.
+
+The summary comes from an AnalyticsRollup: running counters, per-day
+buckets, per-company draft counts, A/B distributions and the lead keys
+seen (for the duplicate count), saved to ANALYTICS_ROLLUP together with
+the id of the last folded event. Each summary therefore only reads the
+events logged since the last one, and events logged in this process are
+folded in as they are recorded.
+
+``log_event`` never touches the disk itself: events go onto a bounded
+queue drained by a background AnalyticsWriter thread, which appends them
+in batches, one transaction each. When the queue is full ``log_event``
+waits for room rather than dropping the event. Readers (summaries,
+iter_events) flush the queue first, and it is drained at interpreter exit.
 """
+import atexit
+import gzip
 import json
 import logging
+import os
+import queue
+import sqlite3
+import threading
 from collections import Counter
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-from config.settings import ANALYTICS_FILE
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from config.settings import (
+    ANALYTICS_ARCHIVE_DIR,
+    ANALYTICS_DB,
+    ANALYTICS_FILE,
+    ANALYTICS_LOG,
+    ANALYTICS_ROLLUP,
+    ANALYTICS_QUEUE_SIZE,
+    ANALYTICS_RETAIN_MONTHS,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def _load_events() -> List[Dict[str, Any]]:
-    """Load all events from the analytics JSON file."""
-    if ANALYTICS_FILE.exists():
+# ---------------------------------------------------------------------------
+# Event Store
+# ---------------------------------------------------------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    timestamp TEXT,
+    day TEXT,
+    recipient TEXT,
+    company TEXT,
+    thread_id TEXT,
+    data TEXT NOT NULL
+);
+"""
+
+# Created after the table so a migration bulk-loads before indexing
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_events_type ON events (event_type, day);
+CREATE INDEX IF NOT EXISTS idx_events_lead ON events (event_type, company, recipient);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_day ON events (day);
+CREATE INDEX IF NOT EXISTS idx_events_company ON events (company, event_type);
+CREATE INDEX IF NOT EXISTS idx_events_thread ON events (thread_id);
+CREATE INDEX IF NOT EXISTS idx_events_variant ON events (json_extract(data, '$.variant_index'))
+    WHERE event_type = 'variant_selected';
+"""
+
+# Follow-up stage of an event (0 for the initial email, and for events logged without one)
+_STAGE = "COALESCE(json_extract(data, '$.followup_number'), 0)"
+
+_INSERT = (
+    "INSERT INTO events (event_type, timestamp, day, recipient, company, thread_id, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _event_row(event: Dict[str, Any]) -> Tuple[Any, ...]:
+    timestamp = event.get("timestamp")
+    try:
+        day = datetime.fromisoformat(timestamp).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        day = None
+    return (
+        event["event_type"],
+        None if timestamp is None else str(timestamp),
+        day,
+        event.get("recipient", ""),
+        event.get("company", ""),
+        event.get("thread_id"),
+        json.dumps(event, default=str),
+    )
+
+
+def _read_legacy_file(path: Path) -> Iterator[Dict[str, Any]]:
+    """Events from the old analytics.json array or analytics.jsonl log."""
+    if path.suffix == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line {line_no} of {path.name}.")
+    else:
+        with open(path, "r") as f:
+            yield from json.load(f)
+
+
+class EventStore:
+    """SQLite event store with one indexed row per event.
+
+    Besides the columns used for filtering, each row keeps the full event
+    as JSON, so readers get back exactly what was logged. The database runs
+    in WAL mode with ``synchronous=NORMAL``: a commit survives a crash of
+    the process, and fsyncs are batched into WAL checkpoints.
+    """
+
+    def __init__(
+        self,
+        path: Path = ANALYTICS_DB,
+        legacy_paths: Tuple[Optional[Path], ...] = (ANALYTICS_FILE, ANALYTICS_LOG),
+    ):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        legacy = [Path(p) for p in legacy_paths if p is not None and Path(p).exists()]
+        if legacy and not self.last_id():
+            self._migrate(legacy)
+        self._conn.executescript(_INDEXES)
+
+    def _migrate(self, legacy: List[Path]) -> None:
+        """One-shot import of the older file formats, in a single transaction.
+
+        Imported files are kept, renamed with a ``.migrated`` suffix.
+        """
+        count = 0
+        try:
+            with self._lock, self._conn:
+                for path in legacy:
+                    rows = [_event_row(event) for event in _read_legacy_file(path)]
+                    self._conn.executemany(_INSERT, rows)
+                    count += len(rows)
+        except (json.JSONDecodeError, IOError, KeyError) as e:
+            logger.warning(f"Could not migrate legacy analytics ({e}); leaving it in place.")
+            return
+        for path in legacy:
+            path.rename(path.with_name(path.name + ".migrated"))
+        names = ", ".join(path.name for path in legacy)
+        logger.info(f"Migrated {count} analytics event(s) from {names} to {self.path.name}.")
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Stores one event; returns its id."""
+        return self.append_many([event])[0]
+
+    def append_many(self, events: List[Dict[str, Any]]) -> List[int]:
+        """Stores events in one transaction; returns their ids, in order."""
+        rows = [_event_row(event) for event in events]
+        with self._lock, self._conn:
+            return [self._conn.execute(_INSERT, row).lastrowid for row in rows]
+
+    def last_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def read_from(self, after_id: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """Streams ``(event, id)`` for every event stored after ``after_id``."""
+        # A connection of its own, so a long read never holds up the writer
+        conn = sqlite3.connect(str(self.path))
+        try:
+            rows = conn.execute("SELECT id, data FROM events WHERE id > ? ORDER BY id", (after_id,))
+            for event_id, data in rows:
+                yield json.loads(data), event_id
+        finally:
+            conn.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Streams every event in the order it was recorded."""
+        for event, _ in self.read_from(0):
+            yield event
+
+    # ── Queries ──
+    def events_for_company(self, company: str, event_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every event logged for ``company`` (optionally of one type), oldest first."""
+        if event_type is None:
+            rows = self._query("SELECT data FROM events WHERE company = ? ORDER BY id", (company,))
+        else:
+            rows = self._query(
+                "SELECT data FROM events WHERE event_type = ? AND company = ? ORDER BY id",
+                (event_type, company),
+            )
+        return [json.loads(data) for (data,) in rows]
+
+    def daily_counts(self, event_type: Optional[str] = None) -> Dict[str, int]:
+        """Events per calendar day (``YYYY-MM-DD``), by date."""
+        if event_type is None:
+            rows = self._query(
+                "SELECT day, COUNT(*) FROM events WHERE day IS NOT NULL GROUP BY day ORDER BY day"
+            )
+        else:
+            rows = self._query(
+                "SELECT day, COUNT(*) FROM events WHERE event_type = ? AND day IS NOT NULL "
+                "GROUP BY day ORDER BY day",
+                (event_type,),
+            )
+        return dict(rows)
+
+    def variant_stats(self) -> Dict[str, int]:
+        """How often each subject line variant was chosen, keyed by variant index."""
+        rows = self._query(
+            "SELECT json_extract(data, '$.variant_index'), COUNT(*) FROM events "
+            "INDEXED BY idx_events_variant WHERE event_type = 'variant_selected' "
+            "GROUP BY json_extract(data, '$.variant_index')"
+        )
+        stats: Dict[str, int] = {}
+        for index, count in rows:
+            key = "?" if index is None else str(index)
+            stats[key] = stats.get(key, 0) + count
+        return stats
+
+    def duplicates(
+        self, event_type: str = "lead_processed", until_id: Optional[int] = None
+    ) -> Dict[Tuple[str, str, int], int]:
+        """``(recipient, company, followup_number)`` keys logged more than once for ``event_type``.
+
+        An initial email and each follow-up stage are separate keys.
+        ``until_id`` limits the count to events up to and including that id.
+        """
+        rows = self._query(
+            f"SELECT recipient, company, {_STAGE}, COUNT(*) FROM events "
+            f"WHERE event_type = ? AND id <= ? GROUP BY company, recipient, {_STAGE} HAVING COUNT(*) > 1",
+            (event_type, until_id if until_id is not None else self.last_id()),
+        )
+        return {(recipient, company, stage): count for recipient, company, stage, count in rows}
+
+    # ── Compaction ──
+    def dedupe_leads(self) -> int:
+        """Deletes repeated lead_processed events, keeping the first per lead and follow-up stage."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM events WHERE event_type = 'lead_processed' AND id NOT IN ("
+                "SELECT MIN(id) FROM events WHERE event_type = 'lead_processed' "
+                f"GROUP BY company, recipient, {_STAGE})"
+            ).rowcount
+
+    def drop_unknown(self) -> int:
+        """Deletes events logged for empty sheet rows (Unknown/Unknown)."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM events WHERE company = 'Unknown' AND recipient = 'Unknown'"
+            ).rowcount
+
+    def archive_before(self, cutoff_day: str, archive_dir: Path) -> Dict[str, int]:
+        """Moves events dated before ``cutoff_day`` into gzip archive segments.
+
+        Events are streamed, one month at a time, to a temporary file that
+        is renamed to ``archive_dir/events-YYYY-MM.<first id>.jsonl.gz`` when
+        the month is complete, and deleted from the store once every segment
+        is on disk. A segment is named after the smallest event id in it, so
+        a re-run after a failed delete rewrites the same segment instead of
+        archiving the events twice. Returns the number of events archived
+        per month.
+        """
+        archive_dir = Path(archive_dir)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_dir / "events.jsonl.gz.tmp"
+        archived: Dict[str, int] = {}
+        last_id = 0
+        segment = None
+        month = None
+        first_id = 0
+
+        def finish_segment() -> None:
+            segment.close()
+            os.replace(tmp_path, archive_dir / f"events-{month}.{first_id}.jsonl.gz")
+
+        conn = sqlite3.connect(str(self.path))
         try:
-            with open(ANALYTICS_FILE, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            logger.warning("Could not read analytics file. Starting fresh.")
-    return []
+            rows = conn.execute(
+                "SELECT id, day, data FROM events WHERE day < ? ORDER BY day, id", (cutoff_day,)
+            )
+            for event_id, day, data in rows:
+                if day[:7] != month:
+                    if segment is not None:
+                        finish_segment()
+                    month = day[:7]
+                    segment = gzip.open(tmp_path, "wt", encoding="utf-8")
+                    archived[month] = 0
+                    first_id = event_id
+                segment.write(data + "\n")
+                archived[month] += 1
+                first_id = min(first_id, event_id)
+                last_id = max(last_id, event_id)
+            if segment is not None:
+                finish_segment()
+                segment = None
+        finally:
+            if segment is not None:
+                segment.close()
+                tmp_path.unlink(missing_ok=True)
+            conn.close()
+
+        if archived:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM events WHERE day < ? AND id <= ?", (cutoff_day, last_id))
+        return archived
+
+    def vacuum(self) -> None:
+        """Returns the space freed by deletes to the filesystem."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def backup(self, dest: Path) -> None:
+        """Writes a consistent copy of the database to ``dest``."""
+        target = sqlite3.connect(str(dest))
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_event_store: Optional[EventStore] = None
+_event_store_lock = threading.Lock()
+
+
+def get_event_store() -> EventStore:
+    """Returns the process-wide EventStore, opening (and migrating) it on first use."""
+    global _event_store
+    with _event_store_lock:
+        if _event_store is None:
+            _event_store = EventStore()
+            atexit.register(_event_store.close)
+        return _event_store
+
+
+def iter_events() -> Iterator[Dict[str, Any]]:
+    """Streams every logged event in the order it was recorded."""
+    flush_events()
+    return iter(get_event_store())
+
+
+def events_for_company(company: str, event_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    flush_events()
+    return get_event_store().events_for_company(company, event_type)
 
 
-def _save_events(events: List[Dict[str, Any]]) -> None:
-    """Persist events to the analytics JSON file."""
-    with open(ANALYTICS_FILE, "w") as f:
-        json.dump(events, f, indent=2, default=str)
+def daily_counts(event_type: Optional[str] = None) -> Dict[str, int]:
+    flush_events()
+    return get_event_store().daily_counts(event_type)
+
+
+def variant_stats() -> Dict[str, int]:
+    flush_events()
+    return get_event_store().variant_stats()
+
+
+def duplicates(event_type: str = "lead_processed") -> Dict[Tuple[str, str, int], int]:
+    flush_events()
+    return get_event_store().duplicates(event_type)
+
+
+# ---------------------------------------------------------------------------
+# Background Writer
+# ---------------------------------------------------------------------------
+_STOP = object()
+
+
+class AnalyticsWriter:
+    """Drains queued events into the EventStore on a background thread.
+
+    The queue is bounded: ``submit`` blocks while it is full, so a slow disk
+    slows event producers down instead of losing events.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, store: EventStore, maxsize: int = ANALYTICS_QUEUE_SIZE):
+        self.store = store
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(maxsize, 1))
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ace-analytics", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Dict[str, Any]) -> None:
+        if self._closed or not self._thread.is_alive():
+            # Closed (e.g. during interpreter exit): write through instead
+            self._write([event])
+            return
+        self._queue.put(event)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            events = [item for item in batch if item is not _STOP]
+            try:
+                if events:
+                    self._write(events)
+            except Exception as e:
+                logger.error(f"Could not write {len(events)} analytics event(s): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        ids = self.store.append_many(events)
+        rollup = _rollup
+        if rollup is not None:
+            for event, event_id in zip(events, ids):
+                rollup.fold_at(event, event_id)
+
+    def flush(self) -> None:
+        """Waits until every event submitted so far is stored."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Writes out the remaining events and stops the thread."""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+_writer: Optional[AnalyticsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_analytics_writer() -> AnalyticsWriter:
+    """Returns the process-wide AnalyticsWriter, starting its thread on first use."""
+    global _writer
+    store = get_event_store()
+    with _writer_lock:
+        if _writer is None:
+            _writer = AnalyticsWriter(store)
+            # atexit runs in reverse order: this drains before the store is closed
+            atexit.register(_writer.close)
+        return _writer
+
+
+def flush_events() -> None:
+    """Blocks until every event logged so far has been stored."""
+    writer = _writer
+    if writer is not None:
+        writer.flush()
 
 
 def log_event(
@@ -39,8 +482,7 @@ def log_event(
     company: str = "",
     data: Optional[Dict[str, Any]] = None,
 ) -> None:
-    """Append a single analytics event."""
-    events = _load_events()
+    """Queue a single analytics event for the background writer."""
     event = {
         "timestamp": datetime.now().isoformat(),
         "event_type": event_type,
@@ -48,141 +490,336 @@ def log_event(
         "company": company,
         **(data or {}),
     }
-    events.append(event)
-    _save_events(events)
+    get_analytics_writer().submit(event)
     logger.debug(f"Analytics event: {event_type}")
 
 
 # ---------------------------------------------------------------------------
-# In-Depth Summary Computation
+# Incremental Rollups
 # ---------------------------------------------------------------------------
-def get_summary() -> Dict[str, Any]:
-    """Compute comprehensive analytics from all logged events."""
-    events = _load_events()
-    if not events:
-        return {"total_events": 0}
-
-    # ── Categorize events ──
-    leads = [e for e in events if e["event_type"] == "lead_processed"]
-    drafts = [e for e in events if e["event_type"] == "draft_created"]
-    sent = [e for e in events if e["event_type"] == "email_sent"]
-    skipped = [e for e in events if e["event_type"] == "email_skipped"]
-    refined = [e for e in events if e["event_type"] == "email_refined"]
-    invalid = [e for e in events if e["event_type"] == "invalid_email"]
-    followup_drafts = [e for e in events if e["event_type"] == "followup_draft_created"]
-    variant_events = [e for e in events if e["event_type"] == "variant_selected"]
-
-    # ── Core Counts ──
-    total_leads = len(leads)
-    total_drafts = len(drafts)
-    total_sent = len(sent)
-    total_skipped = len(skipped)
-    total_refined = len(refined)
-    total_invalid = len(invalid)
-    total_followup_drafts = len(followup_drafts)
-
-    # ── Data Quality: Unknown/Unknown leads ──
-    unknown_leads = [e for e in leads if e.get("recipient", "") == "Unknown" and e.get("company", "") == "Unknown"]
-    valid_leads = [e for e in leads if not (e.get("recipient", "") == "Unknown" and e.get("company", "") == "Unknown")]
-
-    # ── Unique leads (deduplicated by recipient+company) ──
-    lead_keys = [(e.get("recipient", ""), e.get("company", "")) for e in valid_leads]
-    unique_lead_keys = set(lead_keys)
-    duplicate_lead_count = len(valid_leads) - len(unique_lead_keys)
-
-    # ── Unique companies (deduplicated) ──
-    unique_companies = set()
-    for e in valid_leads:
-        key = (e.get("recipient", ""), e.get("company", ""))
-        unique_companies.add(key)
-
-    # ── Skip Reason Breakdown ──
-    skip_reasons = Counter(e.get("reason", "unknown") for e in skipped)
-
-    # ── Follow-up Analysis ──
-    followup_threads = set(e.get("thread_id", "").strip() for e in followup_drafts if e.get("thread_id"))
-    followup_by_number = Counter(e.get("followup_number", "?") for e in followup_drafts)
-
-    # ── Date / Session Breakdown ──
-    timestamps = []
-    for e in events:
+class AnalyticsRollup:
+    """Running aggregates over the stored events up to id ``last_id``.
+
+    Unique leads are tracked as the set of (recipient, company, stage) keys
+    seen so far, so a summary never has to group every stored event.
+    """
+
+    VERSION = 3
+
+    def __init__(self):
+        self.last_id = 0
+        self.total_events = 0
+        self.type_counts: Counter = Counter()
+        self.unknown_leads = 0
+        self.valid_lead_count = 0
+        self.seen_leads: Set[str] = set()
+        self.duplicate_lead_count = 0
+        self.skip_reasons: Counter = Counter()
+        self.followup_threads = set()
+        self.followup_by_number: Counter = Counter()
+        self.date_breakdown: Counter = Counter()
+        self.first_ts: Optional[datetime] = None
+        self.last_ts: Optional[datetime] = None
+        self.company_draft_counts: Counter = Counter()
+        self.multi_recipient_emails = 0
+        self.total_individual_recipients = 0
+        self.variant_distribution: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def fold(self, e: Dict[str, Any]) -> None:
+        """Adds one event to the aggregates (does not move ``last_id``)."""
+        self.total_events += 1
+        event_type = e["event_type"]
+        self.type_counts[event_type] += 1
+
+        # ── Date / Session Breakdown ──
         try:
-            timestamps.append(datetime.fromisoformat(e["timestamp"]))
+            ts = datetime.fromisoformat(e["timestamp"])
         except (KeyError, ValueError):
-            pass
-
-    date_breakdown = Counter(t.strftime("%Y-%m-%d") for t in timestamps)
-
-    date_range_start = min(timestamps).strftime("%Y-%m-%d %H:%M") if timestamps else "N/A"
-    date_range_end = max(timestamps).strftime("%Y-%m-%d %H:%M") if timestamps else "N/A"
-
-    # ── Conversion Funnel ──
-    # Use unique valid leads as the denominator
-    unique_valid = len(unique_lead_keys) or 1  # avoid division by zero
-    draft_rate = (total_drafts / unique_valid) * 100
-    skip_rate = (total_skipped / unique_valid) * 100
-    invalid_rate = (total_invalid / unique_valid) * 100
-
-    # ── Recipient Analysis (top companies by draft count) ──
-    company_draft_counts = Counter()
-    for e in drafts:
-        company = e.get("recipient", e.get("company", "Unknown"))
-        if company and company != "Unknown":
-            company_draft_counts[company] += 1
-    top_companies = company_draft_counts.most_common(10)
-
-    # ── Email Recipient Stats ──
-    to_fields = [e.get("to", "") for e in drafts + sent if e.get("to")]
-    multi_recipient_emails = sum(1 for t in to_fields if "," in t)
-    total_individual_recipients = sum(len(t.split(",")) for t in to_fields)
-
-    # ── A/B Testing Distribution ──
-    variant_distribution: Dict[str, int] = {}
-    for e in variant_events:
-        idx = str(e.get("variant_index", "?"))
-        variant_distribution[idx] = variant_distribution.get(idx, 0) + 1
-
-    # ── Assemble Summary ──
-    summary: Dict[str, Any] = {
-        # Overview
-        "total_events": len(events),
-        "date_range_start": date_range_start,
-        "date_range_end": date_range_end,
-        "campaign_sessions": len(date_breakdown),
-        # Core Pipeline
-        "total_leads_processed": total_leads,
-        "unique_leads": len(unique_lead_keys),
-        "duplicate_leads": duplicate_lead_count,
-        "drafts_created": total_drafts,
-        "emails_sent": total_sent,
-        "emails_skipped": total_skipped,
-        "refinements": total_refined,
-        "invalid_emails": total_invalid,
-        # Follow-ups
-        "followup_drafts_created": total_followup_drafts,
-        "followup_unique_threads": len(followup_threads),
-        "followup_by_stage": dict(followup_by_number),
-        # Skip Breakdown
-        "skip_reasons": dict(skip_reasons),
-        # Conversion Funnel
-        "draft_conversion_rate": round(draft_rate, 1),
-        "skip_rate": round(skip_rate, 1),
-        "invalid_rate": round(invalid_rate, 1),
-        # Coverage
-        "unique_entities": len(unique_companies),
-        "top_companies": top_companies,
-        # Email Stats
-        "total_individual_recipients": total_individual_recipients,
-        "multi_recipient_emails": multi_recipient_emails,
-        # Data Quality
-        "unknown_leads": len(unknown_leads),
-        # Date breakdown
-        "events_by_date": dict(sorted(date_breakdown.items())),
-        # A/B Testing
-        "subject_variant_distribution": variant_distribution,
+            ts = None
+        if ts is not None:
+            self.date_breakdown[ts.strftime("%Y-%m-%d")] += 1
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+        if event_type == "lead_processed":
+            # ── Data Quality: Unknown/Unknown leads ──
+            if e.get("recipient", "") == "Unknown" and e.get("company", "") == "Unknown":
+                self.unknown_leads += 1
+            else:
+                self.valid_lead_count += 1
+                # Same key as EventStore.duplicates: each follow-up stage is its own lead
+                key = "\x1f".join(
+                    (e.get("recipient", ""), e.get("company", ""), str(e.get("followup_number") or 0))
+                )
+                if key in self.seen_leads:
+                    self.duplicate_lead_count += 1
+                else:
+                    self.seen_leads.add(key)
+        elif event_type == "email_skipped":
+            self.skip_reasons[e.get("reason", "unknown")] += 1
+        elif event_type == "followup_draft_created":
+            if e.get("thread_id"):
+                self.followup_threads.add(e.get("thread_id", "").strip())
+            self.followup_by_number[e.get("followup_number", "?")] += 1
+        elif event_type == "variant_selected":
+            idx = str(e.get("variant_index", "?"))
+            self.variant_distribution[idx] = self.variant_distribution.get(idx, 0) + 1
+
+        if event_type == "draft_created":
+            # ── Recipient Analysis (top companies by draft count) ──
+            company = e.get("recipient", e.get("company", "Unknown"))
+            if company and company != "Unknown":
+                self.company_draft_counts[company] += 1
+
+        if event_type in ("draft_created", "email_sent") and e.get("to"):
+            # ── Email Recipient Stats ──
+            to_field = e["to"]
+            if "," in to_field:
+                self.multi_recipient_emails += 1
+            self.total_individual_recipients += len(to_field.split(","))
+
+    def fold_at(self, event: Dict[str, Any], event_id: int) -> None:
+        """Folds a just-stored event if it directly follows what is already folded.
+
+        Anything else is left in the store for ``catch_up`` to pick up.
+        """
+        with self._lock:
+            if event_id == self.last_id + 1:
+                self.fold(event)
+                self.last_id = event_id
+
+    def catch_up(self, store: EventStore) -> int:
+        """Folds every event stored after ``last_id``; returns how many were new."""
+        with self._lock:
+            folded = 0
+            for event, event_id in store.read_from(self.last_id):
+                self.fold(event)
+                self.last_id = event_id
+                folded += 1
+            return folded
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self.total_events:
+                return {"total_events": 0}
+            return self._summary()
+
+    def _summary(self) -> Dict[str, Any]:
+        # ── Core Counts ──
+        total_leads = self.type_counts["lead_processed"]
+        total_drafts = self.type_counts["draft_created"]
+        total_sent = self.type_counts["email_sent"]
+        total_skipped = self.type_counts["email_skipped"]
+        total_refined = self.type_counts["email_refined"]
+        total_invalid = self.type_counts["invalid_email"]
+        total_followup_drafts = self.type_counts["followup_draft_created"]
+
+        # ── Unique leads (deduplicated by recipient+company+follow-up stage) ──
+        duplicate_lead_count = self.duplicate_lead_count
+        unique_leads = self.valid_lead_count - duplicate_lead_count
+
+        date_range_start = self.first_ts.strftime("%Y-%m-%d %H:%M") if self.first_ts else "N/A"
+        date_range_end = self.last_ts.strftime("%Y-%m-%d %H:%M") if self.last_ts else "N/A"
+
+        # ── Conversion Funnel ──
+        # Use unique valid leads as the denominator
+        unique_valid = unique_leads or 1  # avoid division by zero
+        draft_rate = (total_drafts / unique_valid) * 100
+        skip_rate = (total_skipped / unique_valid) * 100
+        invalid_rate = (total_invalid / unique_valid) * 100
+
+        # ── Assemble Summary ──
+        return {
+            # Overview
+            "total_events": self.total_events,
+            "date_range_start": date_range_start,
+            "date_range_end": date_range_end,
+            "campaign_sessions": len(self.date_breakdown),
+            # Core Pipeline
+            "total_leads_processed": total_leads,
+            "unique_leads": unique_leads,
+            "duplicate_leads": duplicate_lead_count,
+            "drafts_created": total_drafts,
+            "emails_sent": total_sent,
+            "emails_skipped": total_skipped,
+            "refinements": total_refined,
+            "invalid_emails": total_invalid,
+            # Follow-ups
+            "followup_drafts_created": total_followup_drafts,
+            "followup_unique_threads": len(self.followup_threads),
+            "followup_by_stage": dict(self.followup_by_number),
+            # Skip Breakdown
+            "skip_reasons": dict(self.skip_reasons),
+            # Conversion Funnel
+            "draft_conversion_rate": round(draft_rate, 1),
+            "skip_rate": round(skip_rate, 1),
+            "invalid_rate": round(invalid_rate, 1),
+            # Coverage
+            "unique_entities": unique_leads,
+            "top_companies": self.company_draft_counts.most_common(10),
+            # Email Stats
+            "total_individual_recipients": self.total_individual_recipients,
+            "multi_recipient_emails": self.multi_recipient_emails,
+            # Data Quality
+            "unknown_leads": self.unknown_leads,
+            # Date breakdown
+            "events_by_date": dict(sorted(self.date_breakdown.items())),
+            # A/B Testing
+            "subject_variant_distribution": dict(self.variant_distribution),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.VERSION,
+                "last_id": self.last_id,
+                "total_events": self.total_events,
+                "type_counts": dict(self.type_counts),
+                "unknown_leads": self.unknown_leads,
+                "valid_lead_count": self.valid_lead_count,
+                "seen_leads": sorted(self.seen_leads),
+                "duplicate_lead_count": self.duplicate_lead_count,
+                "skip_reasons": dict(self.skip_reasons),
+                "followup_threads": sorted(self.followup_threads),
+                # Stage keys may be ints or "?", so keep them as pairs
+                "followup_by_number": list(self.followup_by_number.items()),
+                "date_breakdown": dict(self.date_breakdown),
+                "first_ts": self.first_ts.isoformat() if self.first_ts else None,
+                "last_ts": self.last_ts.isoformat() if self.last_ts else None,
+                "company_draft_counts": dict(self.company_draft_counts),
+                "multi_recipient_emails": self.multi_recipient_emails,
+                "total_individual_recipients": self.total_individual_recipients,
+                "variant_distribution": dict(self.variant_distribution),
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnalyticsRollup":
+        rollup = cls()
+        rollup.last_id = data["last_id"]
+        rollup.total_events = data["total_events"]
+        rollup.type_counts = Counter(data["type_counts"])
+        rollup.unknown_leads = data["unknown_leads"]
+        rollup.valid_lead_count = data["valid_lead_count"]
+        rollup.seen_leads = set(data["seen_leads"])
+        rollup.duplicate_lead_count = data["duplicate_lead_count"]
+        rollup.skip_reasons = Counter(data["skip_reasons"])
+        rollup.followup_threads = set(data["followup_threads"])
+        rollup.followup_by_number = Counter(dict((k, v) for k, v in data["followup_by_number"]))
+        rollup.date_breakdown = Counter(data["date_breakdown"])
+        rollup.first_ts = datetime.fromisoformat(data["first_ts"]) if data["first_ts"] else None
+        rollup.last_ts = datetime.fromisoformat(data["last_ts"]) if data["last_ts"] else None
+        rollup.company_draft_counts = Counter(data["company_draft_counts"])
+        rollup.multi_recipient_emails = data["multi_recipient_emails"]
+        rollup.total_individual_recipients = data["total_individual_recipients"]
+        rollup.variant_distribution = dict(data["variant_distribution"])
+        return rollup
+
+
+_rollup: Optional[AnalyticsRollup] = None
+_rollup_lock = threading.Lock()
+_saved_last_id: Optional[int] = None
+
+
+def _load_rollup(path: Path, store: EventStore) -> AnalyticsRollup:
+    """Loads the saved rollup, or starts over if it is missing or doesn't fit the store."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") == AnalyticsRollup.VERSION and data["last_id"] <= store.last_id():
+            return AnalyticsRollup.from_dict(data)
+        logger.info("Analytics rollup is out of date with the event store. Rebuilding it.")
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Could not read analytics rollup ({e}). Rebuilding it.")
+    return AnalyticsRollup()
+
+
+def save_rollup() -> None:
+    """Checkpoints the in-memory rollup (and its last event id) to ANALYTICS_ROLLUP."""
+    global _saved_last_id
+    rollup = _rollup
+    if rollup is None or (rollup.last_id == _saved_last_id and ANALYTICS_ROLLUP.exists()):
+        return  # nothing folded since the last save
+    data = rollup.to_dict()
+    tmp = ANALYTICS_ROLLUP.with_name(ANALYTICS_ROLLUP.name + ".tmp")
+    with open(tmp, "w") as f:
+        # One dumps() call uses the C encoder; dump() streams in small chunks
+        f.write(json.dumps(data))
+    os.replace(tmp, ANALYTICS_ROLLUP)
+    _saved_last_id = data["last_id"]
+
+
+def get_rollup() -> AnalyticsRollup:
+    """Returns the rollup, loaded from its checkpoint and caught up with the store."""
+    global _rollup
+    flush_events()
+    store = get_event_store()
+    with _rollup_lock:
+        if _rollup is None:
+            _rollup = _load_rollup(ANALYTICS_ROLLUP, store)
+            atexit.register(save_rollup)
+    folded = _rollup.catch_up(store)
+    if folded:
+        logger.debug(f"Folded {folded} new analytics event(s) into the rollup.")
+    return _rollup
+
+
+def reset_rollup() -> None:
+    """Discards the rollup so the next summary rebuilds it from every stored event."""
+    global _rollup
+    with _rollup_lock:
+        _rollup = None
+        ANALYTICS_ROLLUP.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+def _retention_cutoff(retain_months: int, today: Optional[date] = None) -> str:
+    """First day of the oldest month kept live: the current month plus ``retain_months - 1``."""
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - (max(retain_months, 1) - 1)
+    return date(month_index // 12, month_index % 12 + 1, 1).isoformat()
+
+
+def compact_events(
+    retain_months: int = ANALYTICS_RETAIN_MONTHS,
+    archive_dir: Path = ANALYTICS_ARCHIVE_DIR,
+) -> Dict[str, Any]:
+    """Shrinks the live event store and rebuilds the rollup from what remains.
+
+    Repeated lead_processed events (pipeline retries) and Unknown/Unknown
+    events are deleted, and months older than ``retain_months`` are moved
+    to gzip archive segments. Everything happens in SQLite or is streamed,
+    so memory use does not grow with the size of the store. Archived months
+    no longer count towards the campaign summary.
+    """
+    flush_events()
+    store = get_event_store()
+    cutoff = _retention_cutoff(retain_months)
+    result = {
+        "duplicates_removed": store.dedupe_leads(),
+        "unknown_removed": store.drop_unknown(),
+        "archived": store.archive_before(cutoff, archive_dir),
+        "archive_cutoff": cutoff,
     }
+    store.vacuum()
+    reset_rollup()
+    get_rollup()
+    save_rollup()
+    return result
 
-    return summary
+
+# ---------------------------------------------------------------------------
+# In-Depth Summary Computation
+# ---------------------------------------------------------------------------
+def get_summary() -> Dict[str, Any]:
+    """Compute comprehensive analytics from the rollup of all logged events."""
+    rollup = get_rollup()
+    save_rollup()
+    return rollup.summary()
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,99 @@
+"""
+Content-addressed store for large state payloads.
+
+Graph state carries a short reference (the SHA-256 of the text) for the
+resume and research text instead of the text itself, so checkpoints stay
+small and cheap to serialize at every step. Blobs are written once under
+BLOB_DIR and resolved on demand through an in-process cache. The resume's
+reference is cached against resume.md's mtime, so the file is only re-read
+and re-hashed after it changes.
+
+Blobs are shared by content (every lead at one company gets the same
+research text), so they are never deleted while leads run: the startup
+sweep in ``checkpoints.sweep_blobs`` removes the ones no stored lead thread
+refers to any more.
+"""
+import hashlib
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from config.settings import BLOB_DIR, RESUME_PATH
+from src.utils import load_resume
+
+logger = logging.getLogger(__name__)
+
+
+def _blob_path(ref: str) -> Path:
+    return BLOB_DIR / ref[:2] / ref
+
+
+def put_blob(text: str) -> str:
+    """Stores ``text`` (if not already stored) and returns its reference."""
+    data = text.encode("utf-8")
+    ref = hashlib.sha256(data).hexdigest()
+    path = _blob_path(ref)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{ref}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return ref
+
+
+@lru_cache(maxsize=256)
+def get_blob(ref: str) -> str:
+    """Returns the text stored under ``ref``; blobs never change, so reads are cached."""
+    try:
+        return _blob_path(ref).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise LookupError(
+            f"Blob {ref[:12]} is missing from {BLOB_DIR}: the stored lead state refers to text "
+            f"that was deleted. Discard this lead's checkpoint and run the lead again."
+        ) from None
+
+
+def stored_blobs() -> Iterator[Tuple[str, float]]:
+    """Yields ``(ref, mtime)`` for every blob on disk."""
+    if not BLOB_DIR.exists():
+        return
+    for path in BLOB_DIR.glob("??/*"):
+        if not path.name.endswith(".tmp"):
+            try:
+                yield path.name, path.stat().st_mtime
+            except FileNotFoundError:
+                pass
+
+
+def delete_blobs(refs: Iterable[str]) -> None:
+    """Removes stored blobs; the caller makes sure nothing refers to them any more."""
+    for ref in refs:
+        try:
+            _blob_path(ref).unlink()
+        except FileNotFoundError:
+            pass
+
+
+_resume_lock = threading.Lock()
+_resume_key: Optional[Tuple[int, int]] = None
+_resume_ref: str = ""
+
+
+def resume_ref() -> str:
+    """Reference to the current resume.md, re-hashed only when the file changes."""
+    global _resume_key, _resume_ref
+    try:
+        stat = RESUME_PATH.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = None
+
+    with _resume_lock:
+        if not _resume_ref or key != _resume_key:
+            _resume_ref = put_blob(load_resume())
+            _resume_key = key
+            logger.debug(f"Resume stored as blob {_resume_ref[:12]}")
+        return _resume_ref
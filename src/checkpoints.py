@@ -0,0 +1,267 @@
+"""
+Durable LangGraph checkpoints for lead threads.
+
+Every lead runs under its own graph thread (see ``lead_thread_id``) and each
+step is checkpointed to CHECKPOINT_FILE (SQLite), or to Redis with
+CHECKPOINT_BACKEND=redis. Lead graphs are invoked with ``durability="sync"``,
+so a step is on disk before the next one starts, and a crash, Ctrl+C or
+sleep mid-run loses nothing: ``main.py --resume`` lists the lead threads
+still in the store and continues each from its last checkpoint.
+
+Storage stays flat over a long campaign: a lead paused for review keeps only
+its latest checkpoint, and once its final status has been handed to the
+sheet writer (whose journal keeps that write durable) the thread is deleted
+and compacted into one small row of the ``lead_summaries`` table. Blobs
+(see ``src.blobs``) no stored thread refers to any more are swept at
+startup, before any lead is in flight.
+"""
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from config.settings import CHECKPOINT_BACKEND, CHECKPOINT_FILE, REDIS_URL
+from src.blobs import delete_blobs, resume_ref, stored_blobs
+
+try:
+    from langgraph.checkpoint.redis import AsyncRedisSaver, RedisSaver
+except ImportError:  # optional dependency
+    RedisSaver = AsyncRedisSaver = None
+
+logger = logging.getLogger(__name__)
+
+LEAD_THREAD_PREFIX = "lead-"
+
+
+def lead_thread_id(row_index: int, followup_number: int = 0) -> str:
+    """Graph thread id for one lead; follow-up stages get their own thread."""
+    if followup_number:
+        return f"{LEAD_THREAD_PREFIX}{row_index}-f{followup_number}"
+    return f"{LEAD_THREAD_PREFIX}{row_index}"
+
+
+def lead_config(row_index: int, followup_number: int = 0) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": lead_thread_id(row_index, followup_number)}}
+
+
+def _use_redis() -> bool:
+    if CHECKPOINT_BACKEND != "redis":
+        return False
+    if RedisSaver is None:
+        logger.warning("langgraph-checkpoint-redis not installed. Using the SQLite checkpointer.")
+        return False
+    return True
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Returns the process-wide (synchronous) checkpointer, opening it on first use."""
+    global _checkpointer
+    if _checkpointer is None:
+        if _use_redis():
+            saver = RedisSaver(redis_url=REDIS_URL)
+            saver.setup()
+        else:
+            conn = sqlite3.connect(str(CHECKPOINT_FILE), check_same_thread=False)
+            saver = SqliteSaver(conn)
+        _checkpointer = saver
+    return _checkpointer
+
+
+@asynccontextmanager
+async def async_checkpointer() -> AsyncIterator[BaseCheckpointSaver]:
+    """Opens a checkpointer bound to the running event loop, for ainvoke/astream."""
+    if _use_redis():
+        async with AsyncRedisSaver.from_conn_string(REDIS_URL) as saver:
+            await saver.asetup()
+            yield saver
+    else:
+        async with AsyncSqliteSaver.from_conn_string(str(CHECKPOINT_FILE)) as saver:
+            yield saver
+
+
+def _lead_thread_ids(saver: BaseCheckpointSaver) -> List[str]:
+    if isinstance(saver, SqliteSaver):
+        # Avoid deserializing every checkpoint just to learn the thread ids
+        saver.setup()
+        with saver.lock:
+            rows = saver.conn.execute(
+                "SELECT DISTINCT thread_id FROM checkpoints WHERE thread_id LIKE ?",
+                (f"{LEAD_THREAD_PREFIX}%",),
+            ).fetchall()
+        return [row[0] for row in rows]
+    seen = {t.config["configurable"]["thread_id"] for t in saver.list(None)}
+    return [t for t in seen if t.startswith(LEAD_THREAD_PREFIX)]
+
+
+def pending_leads(graph) -> List[Tuple[Dict[str, Any], Dict[str, Any], str, Tuple[str, ...]]]:
+    """Lists lead threads left in the store by an interrupted run.
+
+    Returns ``(config, values, created_at, next)`` per thread, in sheet row
+    order; ``next`` is empty for a lead whose graph already ran to the end
+    (past ``send``) but whose status was never written back.
+    """
+    pending = []
+    for thread_id in _lead_thread_ids(graph.checkpointer):
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = graph.get_state(config)
+        if snapshot.values:
+            pending.append((config, snapshot.values, snapshot.created_at or "", tuple(snapshot.next)))
+    pending.sort(key=lambda item: item[1].get("row_index", 0))
+    return pending
+
+
+def run_settings(values: Dict[str, Any]) -> Dict[str, Any]:
+    """The run-level fields a resumed lead shares with the run it came from."""
+    return {
+        "mode": values.get("mode", "interactive"),
+        "is_followup_mode": values.get("is_followup_mode", False),
+        "followup_number": values.get("followup_number", 0),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+_SUMMARY_FIELDS = (
+    "row_index", "recipient_name", "company_name", "mode",
+    "followup_number", "status", "thread_id", "error_message",
+)
+
+
+class LeadSummaries:
+    """One small record per completed lead, kept after its checkpoints are gone."""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lead_summaries (
+                graph_thread_id TEXT PRIMARY KEY,
+                row_index INTEGER,
+                recipient_name TEXT,
+                company_name TEXT,
+                mode TEXT,
+                followup_number INTEGER,
+                status TEXT,
+                thread_id TEXT,
+                error_message TEXT,
+                completed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def record(self, graph_thread_id: str, state: Dict[str, Any]) -> None:
+        values = [state.get(field) for field in _SUMMARY_FIELDS]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lead_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (graph_thread_id, *values, time.time()),
+            )
+
+
+_lead_summaries: Optional[LeadSummaries] = None
+
+
+def get_lead_summaries() -> LeadSummaries:
+    """Returns the process-wide LeadSummaries store, opening it on first use."""
+    global _lead_summaries
+    if _lead_summaries is None:
+        _lead_summaries = LeadSummaries()
+    return _lead_summaries
+
+
+def prune_lead(saver: BaseCheckpointSaver, config: Dict[str, Any]) -> None:
+    """Keeps only the latest checkpoint of a lead that is still in progress.
+
+    That checkpoint (with its pending writes) is all resuming needs; the
+    history before it only duplicates the lead's state once per step.
+    """
+    if not isinstance(saver, SqliteSaver):
+        return  # other backends keep their history until the lead completes
+    thread_id = config["configurable"]["thread_id"]
+    latest = "(SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '')"
+    with saver.lock, saver.conn:
+        saver.conn.execute(
+            f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id <> {latest}",
+            (thread_id, thread_id),
+        )
+        saver.conn.execute(
+            f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id <> {latest}",
+            (thread_id, thread_id),
+        )
+
+
+# Blobs this recent are kept by the sweep: another process may be about to checkpoint them
+BLOB_GRACE_SECONDS = 60 * 60
+_BLOB_REF = re.compile(rb"[0-9a-f]{64}")
+
+
+def sweep_blobs() -> int:
+    """Deletes blobs no stored lead thread refers to; returns how many went.
+
+    Run it only while no lead is in flight (main calls it at startup), as a
+    lead may store a blob moments before its checkpoint refers to it.
+    Serialized state holds each reference verbatim, so one pass over the
+    SQLite store finds every blob in use. Redis-backed stores keep theirs.
+    """
+    if _use_redis():
+        return 0
+    in_use = {resume_ref()}
+    conn = sqlite3.connect(str(CHECKPOINT_FILE))
+    try:
+        rows = conn.execute("SELECT checkpoint FROM checkpoints UNION ALL SELECT value FROM writes")
+        for (data,) in rows:
+            if data:
+                in_use.update(ref.decode() for ref in _BLOB_REF.findall(data))
+    except sqlite3.OperationalError:
+        return 0  # no checkpoint tables yet
+    finally:
+        conn.close()
+    cutoff = time.time() - BLOB_GRACE_SECONDS
+    unused = [ref for ref, mtime in stored_blobs() if ref not in in_use and mtime < cutoff]
+    delete_blobs(unused)
+    if unused:
+        logger.info(f"Deleted {len(unused)} blob(s) no lead refers to any more.")
+    return len(unused)
+
+
+def release_lead(saver: BaseCheckpointSaver, config: Dict[str, Any]) -> None:
+    """Drops every checkpoint of a lead that was never reviewed, so its row is claimed afresh later."""
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        saver.delete_thread(thread_id)
+    except Exception as e:
+        logger.warning(f"Could not release checkpoints for {thread_id}: {e}")
+
+
+def complete_lead(saver: BaseCheckpointSaver, config: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Compacts a finished lead: records its summary and drops its checkpoints."""
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        get_lead_summaries().record(thread_id, state)
+        saver.delete_thread(thread_id)
+    except Exception as e:
+        logger.warning(f"Could not compact checkpoints for {thread_id}: {e}")
+
+
+async def acomplete_lead(saver: BaseCheckpointSaver, config: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Async variant of complete_lead."""
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        # Off the loop: the async saver may hold a write transaction until the loop runs again
+        await asyncio.to_thread(get_lead_summaries().record, thread_id, state)
+        await saver.adelete_thread(thread_id)
+    except Exception as e:
+        logger.warning(f"Could not compact checkpoints for {thread_id}: {e}")
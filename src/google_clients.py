@@ -0,0 +1,64 @@
+"""
+Shared registry of Google API service objects.
+
+Each service is built once per process from the discovery document bundled
+with google-api-python-client (static discovery, no network fetch). Requests
+created from it run on a keep-alive, credential-aware HTTP client owned by
+the calling thread, because httplib2 connections are not thread-safe. The
+JSON model already asks for gzip-compressed responses.
+"""
+import logging
+import threading
+from typing import Any, Dict, Tuple
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+from src.google_auth import get_credentials
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT_SECONDS = 60
+
+_services: Dict[Tuple[str, str], Any] = {}
+_services_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+def get_thread_http() -> google_auth_httplib2.AuthorizedHttp:
+    """Returns the calling thread's authorized keep-alive HTTP client."""
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(
+            get_credentials(), http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+        )
+        _thread_local.http = http
+    return http
+
+
+def _build_request(http, *args, **kwargs) -> HttpRequest:
+    """requestBuilder that binds every request to the current thread's client."""
+    return HttpRequest(get_thread_http(), *args, **kwargs)
+
+
+def get_service(api: str, version: str) -> Any:
+    """Returns the shared service object for ``api``/``version``, building it once."""
+    key = (api, version)
+    service = _services.get(key)
+    if service is not None:
+        return service
+
+    with _services_lock:
+        if key not in _services:
+            _services[key] = build(
+                api,
+                version,
+                http=get_thread_http(),
+                requestBuilder=_build_request,
+                static_discovery=True,
+                cache_discovery=False,
+            )
+            logger.debug(f"Built Google API service: {api} {version}")
+        return _services[key]
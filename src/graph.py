@@ -1,8 +1,9 @@
 import logging
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
 from src.state import AgentState
+from src.checkpoints import get_checkpointer
 from src.nodes import (
     fetch_lead_node,
     validate_emails_node,
@@ -11,7 +12,15 @@ from src.nodes import (
     refine_draft_node,
     send_email_node,
     update_sheet_node,
-    human_review_node
+    human_review_node,
+    afetch_lead_node,
+    avalidate_emails_node,
+    aresearch_node,
+    agenerate_draft_node,
+    arefine_draft_node,
+    asend_email_node,
+    aupdate_sheet_node,
+    ahuman_review_node,
 )
 from config.settings import MAX_REFINEMENT_ITERATIONS
 
@@ -52,24 +61,48 @@ def human_review_router(state: AgentState):
     return "review"
 
 
-def create_graph(autonomous: bool = False):
+def _node(func, afunc) -> RunnableLambda:
+    """A node that runs ``func`` under invoke/stream and ``afunc`` under ainvoke/astream."""
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
+
+def create_graph(autonomous: bool = False, single_lead: bool = False, checkpointer=None):
+    """Builds and compiles the ACE workflow.
+
+    By default the graph loops fetch → ... → update → fetch until the sheet
+    is exhausted. With ``single_lead=True`` it processes one lead that the
+    caller has already claimed: it starts at validate and ends where the
+    sheet update would happen, leaving the status write to the caller.
+
+    Every node has a sync and an async implementation, so the compiled graph
+    can be driven with either ``invoke`` or ``ainvoke``/``astream``. Pass an
+    async ``checkpointer`` (see src.checkpoints) for the latter; by default
+    the shared durable one is used.
+    """
     workflow = StateGraph(AgentState)
 
     # Add Nodes
-    workflow.add_node("fetch", fetch_lead_node)
-    workflow.add_node("validate", validate_emails_node)
-    workflow.add_node("research", research_node)
-    workflow.add_node("generate", generate_draft_node)
-    workflow.add_node("review", human_review_node)
-    workflow.add_node("refine", refine_draft_node)
-    workflow.add_node("send", send_email_node)
-    workflow.add_node("update", update_sheet_node)
+    if not single_lead:
+        workflow.add_node("fetch", _node(fetch_lead_node, afetch_lead_node))
+    workflow.add_node("validate", _node(validate_emails_node, avalidate_emails_node))
+    workflow.add_node("research", _node(research_node, aresearch_node))
+    workflow.add_node("generate", _node(generate_draft_node, agenerate_draft_node))
+    workflow.add_node("review", _node(human_review_node, ahuman_review_node))
+    workflow.add_node("refine", _node(refine_draft_node, arefine_draft_node))
+    workflow.add_node("send", _node(send_email_node, asend_email_node))
+    if not single_lead:
+        workflow.add_node("update", _node(update_sheet_node, aupdate_sheet_node))
+
+    # Where a finished lead goes: the sheet update, or straight out
+    done = END if single_lead else "update"
 
     # Add Edges
-    workflow.set_entry_point("fetch")
-
-    # fetch → validate (always)
-    workflow.add_edge("fetch", "validate")
+    if single_lead:
+        workflow.set_entry_point("validate")
+    else:
+        workflow.set_entry_point("fetch")
+        # fetch → validate (always)
+        workflow.add_edge("fetch", "validate")
 
     # validate → check if emails survived validation
     workflow.add_conditional_edges(
@@ -77,7 +110,7 @@ def create_graph(autonomous: bool = False):
         check_email_count,
         {
             "continue": "research",
-            "skip": "update",
+            "skip": done,
             "end": END
         }
     )
@@ -92,20 +125,18 @@ def create_graph(autonomous: bool = False):
         {
             "send": "send",
             "refine": "refine",
-            "update": "update",
+            "update": done,
             "review": "review"
         }
     )
 
-    workflow.add_edge("send", "update")
-    workflow.add_edge("update", "fetch")
-
-    # Checkpointer for persistence
-    memory = MemorySaver()
+    workflow.add_edge("send", done)
+    if not single_lead:
+        workflow.add_edge("update", "fetch")
 
     interrupts = [] if autonomous else ["review"]
 
     return workflow.compile(
-        checkpointer=memory,
+        checkpointer=checkpointer or get_checkpointer(),
         interrupt_before=interrupts
-    )
\ No newline at end of file
+    )
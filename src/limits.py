@@ -0,0 +1,52 @@
+"""
+Per-API concurrency limits shared by every worker in the process.
+
+Gemini, Gmail and Sheets have independent quotas, so each gets its own
+semaphore. Wrap any call that hits one of these APIs in ``api_limit(name)``,
+or ``async_api_limit(name)`` from coroutines.
+"""
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator
+
+from config.settings import GEMINI_CONCURRENCY, GMAIL_CONCURRENCY, SHEETS_CONCURRENCY
+
+_LIMIT_SIZES: Dict[str, int] = {
+    "gemini": GEMINI_CONCURRENCY,
+    "gmail": GMAIL_CONCURRENCY,
+    "sheets": SHEETS_CONCURRENCY,
+}
+
+_limits: Dict[str, threading.BoundedSemaphore] = {
+    name: threading.BoundedSemaphore(size) for name, size in _LIMIT_SIZES.items()
+}
+
+# asyncio semaphores belong to one event loop, so keep a set per loop
+_async_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@contextmanager
+def api_limit(name: str) -> Iterator[None]:
+    """Holds one of the ``name`` API's concurrency slots for the block."""
+    semaphore = _limits[name]
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+@asynccontextmanager
+async def async_api_limit(name: str) -> AsyncIterator[None]:
+    """Async counterpart of api_limit; waits on the event loop, not a thread."""
+    loop = asyncio.get_running_loop()
+    semaphores = _async_limits.get(loop)
+    if semaphores is None:
+        semaphores = {n: asyncio.Semaphore(size) for n, size in _LIMIT_SIZES.items()}
+        _async_limits[loop] = semaphores
+    async with semaphores[name]:
+        yield
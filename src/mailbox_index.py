@@ -0,0 +1,198 @@
+"""
+Local index of the Gmail threads ACE has written to.
+
+Every thread ACE sends, drafts or replies in is recorded with its
+recipients. Once read, the index also records whether the other side has
+replied, whether the thread bounced and when it was last active.
+``sync_mailbox_index`` (src.tools_gmail) keeps it current with
+``users.history.list``: starting from the history id stored by the
+previous sync, it only re-reads threads with messages added since then.
+Bounce checks and recipient-to-thread lookups are then answered locally.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import getaddresses
+from typing import Iterable, List, Optional, Set, Tuple
+
+from config.settings import MAILBOX_INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+_OWN_LABELS = frozenset({"SENT", "DRAFT"})
+
+
+@dataclass
+class ThreadStatus:
+    """What the index knows about one thread."""
+    thread_id: str
+    has_reply: bool
+    is_bounced: bool
+    last_activity: int  # ms since the epoch (Gmail internalDate)
+    message_count: int
+
+
+def is_bounce_sender(from_field: str) -> bool:
+    from_field = from_field.lower()
+    return "mailer-daemon" in from_field or "postmaster" in from_field
+
+
+def summarize_thread(thread: dict) -> Tuple[ThreadStatus, Set[str]]:
+    """Reply/bounce status of a fetched thread and the addresses ACE wrote to in it.
+
+    Works on full or metadata-format threads with From/To/Cc headers.
+    """
+    has_reply = is_bounced = False
+    last_activity = 0
+    recipients: Set[str] = set()
+    messages = thread.get("messages", [])
+    for msg in messages:
+        headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        last_activity = max(last_activity, int(msg.get("internalDate", 0)))
+        if is_bounce_sender(headers.get("from", "")):
+            is_bounced = True
+        elif _OWN_LABELS & set(msg.get("labelIds", [])):
+            fields = [headers.get("to", ""), headers.get("cc", "")]
+            recipients.update(addr.lower() for _, addr in getaddresses(fields) if addr)
+        else:
+            has_reply = True
+    status = ThreadStatus(thread["id"], has_reply, is_bounced, last_activity, len(messages))
+    return status, recipients
+
+
+class MailboxIndex:
+    """SQLite index of ACE's threads plus the history id of the last sync."""
+
+    def __init__(self, path=MAILBOX_INDEX_FILE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                synced INTEGER NOT NULL DEFAULT 0,
+                has_reply INTEGER NOT NULL DEFAULT 0,
+                is_bounced INTEGER NOT NULL DEFAULT 0,
+                last_activity INTEGER NOT NULL,
+                message_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS thread_recipients (
+                email TEXT NOT NULL,
+                thread_id TEXT NOT NULL,
+                PRIMARY KEY (email, thread_id)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+
+    def track(self, thread_id: str, recipients: Iterable[str] = ()) -> None:
+        """Adds a thread ACE just wrote to; it is read on the next sync.
+
+        A thread already in the index keeps its status (and its ``synced``
+        flag): the new message shows up in the history the next sync reads.
+        """
+        now_ms = int(time.time() * 1000)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO threads (thread_id, last_activity) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET "
+                "last_activity = MAX(last_activity, excluded.last_activity)",
+                (thread_id, now_ms),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO thread_recipients VALUES (?, ?)",
+                [(email.strip().lower(), thread_id) for email in recipients if email.strip()],
+            )
+
+    def record(self, thread: dict) -> ThreadStatus:
+        """Stores the status of a freshly read thread."""
+        status, recipients = summarize_thread(thread)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads VALUES (?, 1, ?, ?, ?, ?)",
+                (status.thread_id, status.has_reply, status.is_bounced,
+                 status.last_activity, status.message_count),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO thread_recipients VALUES (?, ?)",
+                [(email, status.thread_id) for email in recipients],
+            )
+        return status
+
+    def mark_unsynced(self, thread_ids: Iterable[str]) -> None:
+        """Flags threads whose re-read failed, so every later sync retries them."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE threads SET synced = 0 WHERE thread_id = ?", [(t,) for t in thread_ids]
+            )
+
+    def status(self, thread_id: str) -> Optional[ThreadStatus]:
+        """Status of a thread as of the last sync, or None if it was never read."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT has_reply, is_bounced, last_activity, message_count "
+                "FROM threads WHERE thread_id = ? AND synced = 1",
+                (thread_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return ThreadStatus(thread_id, bool(row[0]), bool(row[1]), row[2], row[3])
+
+    def latest_thread_for(self, email: str) -> Optional[str]:
+        """Most recently active thread in which ACE wrote to ``email``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT t.thread_id FROM thread_recipients r JOIN threads t USING (thread_id) "
+                "WHERE r.email = ? ORDER BY t.last_activity DESC LIMIT 1",
+                (email.strip().lower(),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def thread_ids(self, unsynced_only: bool = False) -> List[str]:
+        sql = "SELECT thread_id FROM threads"
+        if unsynced_only:
+            sql += " WHERE synced = 0"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql)]
+
+    def known(self, thread_ids: Iterable[str]) -> Set[str]:
+        """The subset of ``thread_ids`` that is in the index."""
+        ids = list(set(thread_ids))
+        known: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT thread_id FROM threads WHERE thread_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                known.update(row[0] for row in rows)
+        return known
+
+    def history_id(self) -> Optional[str]:
+        """History id the next sync starts from (None before the first sync)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'history_id'").fetchone()
+        return row[0] if row else None
+
+    def set_history_id(self, history_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('history_id', ?)", (str(history_id),)
+            )
+
+
+_mailbox_index: Optional[MailboxIndex] = None
+
+
+def get_mailbox_index() -> MailboxIndex:
+    """Returns the process-wide MailboxIndex, opening it on first use."""
+    global _mailbox_index
+    if _mailbox_index is None:
+        _mailbox_index = MailboxIndex()
+    return _mailbox_index
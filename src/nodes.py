@@ -1,14 +1,28 @@
+import asyncio
 import logging
 import random
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
 from src.state import AgentState
-from src.tools_sheets import fetch_lead, update_lead_status
-from src.tools_gmail import send_email, create_draft, create_draft_reply, validate_recipients, validate_email
-from src.utils import load_resume, infer_first_name_from_email
+from src.tools_sheets import fetch_lead, update_lead_status, afetch_lead, aupdate_lead_status
+from src.tools_gmail import (
+    ValidationResult,
+    send_email,
+    create_draft,
+    create_draft_reply,
+    validate_recipients,
+    validate_email,
+    asend_email,
+    acreate_draft,
+    acreate_draft_reply,
+    avalidate_recipients,
+    avalidate_email,
+)
+from src.utils import infer_first_name_from_email
+from src.blobs import get_blob, put_blob, resume_ref
 from src.prompts import (
     get_research_prompt,
     get_generate_draft_system_prompt,
@@ -21,6 +35,8 @@ from src.prompts import (
     get_starred_evaluation_user_prompt,
 )
 from src.analytics import log_event
+from src.research_cache import get_research_cache, research_key
+from src.limits import api_limit, async_api_limit
 from langchain_google_genai import ChatGoogleGenerativeAI
 from config.settings import GOOGLE_API_KEY, RESUME_PDF_PATH
 
@@ -105,8 +121,33 @@ def fetch_lead_node(state: AgentState) -> Dict[str, Any]:
         logger.info("No more leads found. Ending workflow.")
         return {"status": "end"}
 
+    return build_lead_state(lead, state)
+
+
+async def afetch_lead_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of fetch_lead_node."""
+    logger.info("Fetching next lead...")
+    is_followup = state.get('is_followup_mode', False)
+    followup_num = state.get('followup_number', 0)
+
+    lead = await afetch_lead(followup_number=followup_num if is_followup else 0)
+    if not lead:
+        logger.info("No more leads found. Ending workflow.")
+        return {"status": "end"}
+
+    return build_lead_state(lead, state)
+
+
+def build_lead_state(lead: Dict[str, Any], state: AgentState) -> Dict[str, Any]:
+    """Turns a claimed sheet row into the state update that starts its pipeline.
+
+    Shared by fetch_lead_node and runners that claim leads themselves.
+    """
+    is_followup = state.get('is_followup_mode', False)
+
     logger.info(f"Processing Lead: {lead['recipient_name']} at {lead['company_name']}")
-    log_event("lead_processed", lead['recipient_name'], lead['company_name'])
+    log_event("lead_processed", lead['recipient_name'], lead['company_name'],
+              data={"followup_number": state.get('followup_number', 0) if is_followup else 0})
 
     # Auto-select emails if in auto_draft mode
     selected_emails = None
@@ -134,8 +175,6 @@ def fetch_lead_node(state: AgentState) -> Dict[str, Any]:
     elif inferred_name and recipient_name in ('Unknown', ''):
         lead['recipient_name'] = inferred_name
 
-    resume_content = load_resume()
-
     # Check if resume PDF exists for attachment
     resume_pdf_path = str(RESUME_PDF_PATH) if RESUME_PDF_PATH.is_file() else None
     if resume_pdf_path:
@@ -145,9 +184,9 @@ def fetch_lead_node(state: AgentState) -> Dict[str, Any]:
 
     return {
         **lead,
-        "resume_content": resume_content,
+        "resume_ref": resume_ref(),
         "resume_pdf_path": resume_pdf_path,
-        "search_summary": "Pending Research..." if not is_followup else "Skipped for follow-up",
+        "research_ref": put_blob("Pending Research..." if not is_followup else "Skipped for follow-up"),
         "company_domain": "Tech",
         "iteration_count": 0,
         "selected_emails": selected_emails,
@@ -155,33 +194,20 @@ def fetch_lead_node(state: AgentState) -> Dict[str, Any]:
     }
 
 
-def validate_emails_node(state: AgentState) -> Dict[str, Any]:
-    """Validates all candidate emails using RFC syntax + MX record checks.
-
-    Filters out invalid emails early — before wasting LLM calls on
-    research and draft generation for unreachable addresses.
-    """
-    if state.get('status') == 'end':
-        return {}
-
-    candidates = state.get('candidate_emails', [])
-    if not candidates:
-        return {}
-
-    logger.info(f"Validating {len(candidates)} candidate email(s)...")
+def _validation_update(state: AgentState, results: List[ValidationResult]) -> Dict[str, Any]:
+    """Turns per-address validation results into the validate node's state update."""
     valid = []
     invalid = []
 
-    for email in candidates:
-        result = validate_email(email)
+    for result in results:
         if result.is_valid:
             valid.append(result.normalized)
             logger.info(f"  ✓ {result.normalized}")
         else:
-            invalid.append(email)
-            logger.warning(f"  ✗ {email} — {result.failure_reason}")
+            invalid.append(result.original)
+            logger.warning(f"  ✗ {result.original} — {result.failure_reason}")
             log_event("email_validation_failed", state.get('recipient_name', ''), state.get('company_name', ''),
-                      data={"email": email, "reason": result.failure_reason})
+                      data={"email": result.original, "reason": result.failure_reason})
 
     if not valid:
         logger.error(f"All emails invalid for {state.get('recipient_name')}. Skipping lead.")
@@ -204,11 +230,58 @@ def validate_emails_node(state: AgentState) -> Dict[str, Any]:
     }
 
 
-def research_node(state: AgentState) -> Dict[str, Any]:
-    """Performs Google Search to gather context on the company and recipient."""
+def validate_emails_node(state: AgentState) -> Dict[str, Any]:
+    """Validates all candidate emails using RFC syntax + MX record checks.
+
+    Filters out invalid emails early — before wasting LLM calls on
+    research and draft generation for unreachable addresses.
+    """
+    if state.get('status') == 'end':
+        return {}
+
+    candidates = state.get('candidate_emails', [])
+    if not candidates:
+        return {}
+
+    logger.info(f"Validating {len(candidates)} candidate email(s)...")
+    return _validation_update(state, [validate_email(email) for email in candidates])
+
+
+async def avalidate_emails_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of validate_emails_node; candidates are checked concurrently."""
+    if state.get('status') == 'end':
+        return {}
+
+    candidates = state.get('candidate_emails', [])
+    if not candidates:
+        return {}
+
+    logger.info(f"Validating {len(candidates)} candidate email(s)...")
+    results = await asyncio.gather(*(avalidate_email(email) for email in candidates))
+    return _validation_update(state, list(results))
+
+
+def _research_update(research: Dict[str, str]) -> Dict[str, Any]:
+    """State update for a research payload; the summary text goes to the blob store."""
+    return {
+        "research_ref": put_blob(research["search_summary"]),
+        "company_domain": research["company_domain"],
+    }
+
+
+def _research_request(state: AgentState) -> Tuple[Optional[Dict[str, Any]], str, str]:
+    """Returns (ready_result, cache_key, prompt); ready_result skips the model call."""
     if state.get('is_followup_mode'):
         logger.info("Skipping research for follow-up.")
-        return {"search_summary": "Skipped for follow-up", "company_domain": "Tech"}
+        return _research_update({"search_summary": "Skipped for follow-up", "company_domain": "Tech"}), "", ""
+
+    key = research_key(
+        state['company_name'], state.get('recipient_name', ''), state.get('candidate_emails')
+    )
+    cached = get_research_cache().get(key) if key else None
+    if cached:
+        logger.info(f"Using cached research for {state['company_name']}. Domain: {cached['company_domain']}")
+        return _research_update(cached), key, ""
 
     logger.info(f"Researching target: {state['company_name']}...")
 
@@ -217,26 +290,70 @@ def research_node(state: AgentState) -> Dict[str, Any]:
         recipient_name=state['recipient_name'],
         position=state['position'],
     )
+    return None, key, prompt
+
+
+def _research_result(key: str, response: ResearchResult) -> Dict[str, Any]:
+    logger.info(f"Research completed. Detected Domain: {response.company_domain}")
+    result = {
+        "search_summary": response.search_summary,
+        "company_domain": response.company_domain,
+    }
+    if key:
+        # A cache failure must not cost the research just paid for
+        try:
+            get_research_cache().put(key, result)
+        except Exception as e:
+            logger.warning(f"Could not cache research for {key}: {e}")
+    return _research_update(result)
+
+
+def _research_failed(state: AgentState, e: Exception) -> Dict[str, Any]:
+    logger.error(f"Research failed: {e}")
+    return _research_update({
+        "search_summary": f"Could not research {state['company_name']}.",
+        "company_domain": "Tech",
+    })
+
+
+def research_node(state: AgentState) -> Dict[str, Any]:
+    """Performs Google Search to gather context on the company and recipient."""
+    ready, key, prompt = _research_request(state)
+    if ready:
+        return ready
 
     structured_researcher = _get_model("research").with_structured_output(ResearchResult)
 
     try:
-        response: ResearchResult = structured_researcher.invoke(prompt)
-        logger.info(f"Research completed. Detected Domain: {response.company_domain}")
-        return {
-            "search_summary": response.search_summary,
-            "company_domain": response.company_domain,
-        }
+        with api_limit("gemini"):
+            response: ResearchResult = structured_researcher.invoke(prompt)
     except Exception as e:
-        logger.error(f"Research failed: {e}")
-        return {
-            "search_summary": f"Could not research {state['company_name']}.",
-            "company_domain": "Tech",
-        }
+        return _research_failed(state, e)
+    return _research_result(key, response)
 
 
-def generate_draft_node(state: AgentState) -> Dict[str, Any]:
-    """Generates the initial email draft (or follow-up)."""
+async def aresearch_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of research_node.
+
+    The research cache and blob store are SQLite and file I/O, so they run
+    in worker threads rather than stalling the other leads on the loop.
+    """
+    ready, key, prompt = await asyncio.to_thread(_research_request, state)
+    if ready:
+        return ready
+
+    structured_researcher = _get_model("research").with_structured_output(ResearchResult)
+
+    try:
+        async with async_api_limit("gemini"):
+            response: ResearchResult = await structured_researcher.ainvoke(prompt)
+    except Exception as e:
+        return await asyncio.to_thread(_research_failed, state, e)
+    return await asyncio.to_thread(_research_result, key, response)
+
+
+def _generate_draft_request(state: AgentState) -> Tuple[Any, List[Any]]:
+    """Picks the model and builds the messages for a cold draft or follow-up."""
     is_followup = state.get('is_followup_mode', False)
     followup_num = state.get('followup_number', 0)
 
@@ -246,7 +363,7 @@ def generate_draft_node(state: AgentState) -> Dict[str, Any]:
             followup_number=followup_num,
             recipient_name=state['recipient_name'],
             company_name=state['company_name'],
-            resume_content=state['resume_content']
+            resume_content=get_blob(state['resume_ref'])
         )
         user_prompt = get_followup_user_prompt()
         structured_llm = _get_model("flash").with_structured_output(EmailDraft) # Follow-ups don't need variants
@@ -255,43 +372,69 @@ def generate_draft_node(state: AgentState) -> Dict[str, Any]:
         system_prompt = get_generate_draft_system_prompt(
             recipient_name=state['recipient_name'],
             company_name=state['company_name'],
-            search_summary=state['search_summary'],
-            resume_content=state['resume_content'],
+            search_summary=get_blob(state['research_ref']),
+            resume_content=get_blob(state['resume_ref']),
         )
         user_prompt = get_generate_draft_user_prompt()
         structured_llm = _get_model("pro").with_structured_output(EmailDraftWithVariants)
 
-    try:
-        response = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ])
-
-        if is_followup:
-            return {
-                "email_subject": "Follow-up", # Will be handled by create_draft_reply if threaded
-                "email_body": response.body,
-                "status": "reviewing",
-            }
-        else:
-            variants = response.subject_variants or []
-            return {
-                "email_subject": variants[0] if variants else "Internship Inquiry",
-                "email_body": response.body,
-                "subject_variants": variants,
-                "status": "reviewing",
-            }
-    except Exception as e:
-        logger.error(f"Error generating draft: {e}")
+    return structured_llm, [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+
+
+def _generate_draft_result(state: AgentState, response: Any) -> Dict[str, Any]:
+    if state.get('is_followup_mode', False):
         return {
-            "email_subject": "Follow-up" if is_followup else "Internship Inquiry",
-            "email_body": "Error generating draft. Please refine.",
+            "email_subject": "Follow-up", # Will be handled by create_draft_reply if threaded
+            "email_body": response.body,
             "status": "reviewing",
         }
+    variants = response.subject_variants or []
+    return {
+        "email_subject": variants[0] if variants else "Internship Inquiry",
+        "email_body": response.body,
+        "subject_variants": variants,
+        "status": "reviewing",
+    }
 
 
-def refine_draft_node(state: AgentState) -> Dict[str, Any]:
-    """Refines the email draft based on user feedback."""
+def _generate_draft_failed(state: AgentState, e: Exception) -> Dict[str, Any]:
+    logger.error(f"Error generating draft: {e}")
+    return {
+        "email_subject": "Follow-up" if state.get('is_followup_mode', False) else "Internship Inquiry",
+        "email_body": "Error generating draft. Please refine.",
+        "status": "reviewing",
+    }
+
+
+def generate_draft_node(state: AgentState) -> Dict[str, Any]:
+    """Generates the initial email draft (or follow-up)."""
+    structured_llm, messages = _generate_draft_request(state)
+
+    try:
+        with api_limit("gemini"):
+            response = structured_llm.invoke(messages)
+        return _generate_draft_result(state, response)
+    except Exception as e:
+        return _generate_draft_failed(state, e)
+
+
+async def agenerate_draft_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of generate_draft_node."""
+    # Reads the resume and research blobs from disk
+    structured_llm, messages = await asyncio.to_thread(_generate_draft_request, state)
+
+    try:
+        async with async_api_limit("gemini"):
+            response = await structured_llm.ainvoke(messages)
+        return _generate_draft_result(state, response)
+    except Exception as e:
+        return _generate_draft_failed(state, e)
+
+
+def _refine_draft_request(state: AgentState) -> Tuple[Any, List[Any]]:
     logger.info("Refining draft...")
     log_event(
         "email_refined",
@@ -307,32 +450,99 @@ def refine_draft_node(state: AgentState) -> Dict[str, Any]:
     )
 
     structured_llm = _get_model("flash").with_structured_output(EmailDraft)
+    return structured_llm, [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+
+
+def _refine_draft_result(state: AgentState, response: EmailDraft) -> Dict[str, Any]:
+    return {
+        "email_subject": response.subject,
+        "email_body": response.body,
+        "iteration_count": state['iteration_count'] + 1,
+        "status": "reviewing",
+    }
+
+
+def _refine_draft_failed(e: Exception) -> Dict[str, Any]:
+    logger.error(f"Error refining draft: {e}")
+    return {
+        "email_body": f"Error refining draft: {e}",
+        "status": "reviewing",
+    }
+
+
+def refine_draft_node(state: AgentState) -> Dict[str, Any]:
+    """Refines the email draft based on user feedback."""
+    structured_llm, messages = _refine_draft_request(state)
 
     try:
-        response: EmailDraft = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ])
+        with api_limit("gemini"):
+            response: EmailDraft = structured_llm.invoke(messages)
+        return _refine_draft_result(state, response)
+    except Exception as e:
+        return _refine_draft_failed(e)
 
-        return {
-            "email_subject": response.subject,
-            "email_body": response.body,
-            "iteration_count": state['iteration_count'] + 1,
-            "status": "reviewing",
-        }
+
+async def arefine_draft_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of refine_draft_node."""
+    structured_llm, messages = _refine_draft_request(state)
+
+    try:
+        async with async_api_limit("gemini"):
+            response: EmailDraft = await structured_llm.ainvoke(messages)
+        return _refine_draft_result(state, response)
     except Exception as e:
-        logger.error(f"Error refining draft: {e}")
-        return {
-            "email_body": f"Error refining draft: {e}",
-            "status": "reviewing",
-        }
+        return _refine_draft_failed(e)
+
+
+# --- send_email_node helpers (shared by the sync and async variants) ---
+def _followup_reply_result(state: AgentState, draft: dict) -> Dict[str, Any]:
+    if draft.get('is_bounced'):
+        return {"status": "bounced"}
+
+    log_event("followup_draft_created", state.get('recipient_name', ''), state.get('company_name', ''),
+              data={"thread_id": state.get('thread_id'), "followup_number": state.get('followup_number')})
+    return {"status": "sent"}
+
+
+def _followup_reply_failed(e: Exception) -> Dict[str, Any]:
+    logger.error(f"Failed to create threaded draft: {e}")
+    error_str = str(e)
+    if "404" in error_str and "notFound" in error_str:
+        error_str = "Thread Not Found in Gmail (404)"
+    return {"status": "error", "error_message": error_str}
+
+
+def _filter_recipients(state: AgentState, valid_emails: List[str], invalid_emails: List[str]) -> Optional[Dict[str, Any]]:
+    """Logs rejected recipients; returns an early state update if none remain."""
+    if invalid_emails:
+        for inv in invalid_emails:
+            logger.warning(f"Skipping invalid email: {inv}")
+            log_event("invalid_email", state.get('recipient_name', ''), state.get('company_name', ''),
+                      data={"invalid_email": inv})
+
+    if not valid_emails:
+        logger.error("No valid emails to send to. Skipping.")
+        return {"status": "skipped"}
+    return None
+
+
+def _message_sent_result(state: AgentState, event_type: str, to_field: str, thread_id: Optional[str]) -> Dict[str, Any]:
+    log_event(event_type, state.get('recipient_name', ''), state.get('company_name', ''),
+              data={"to": to_field, "subject": state['email_subject'], "thread_id": thread_id})
+    if event_type == "draft_created":
+        logger.info(f"Draft created successfully. Thread ID: {thread_id}")
+    else:
+        logger.info(f"Email sent successfully. Thread ID: {thread_id}")
+    return {"status": "sent", "thread_id": thread_id}
 
 
 def send_email_node(state: AgentState) -> Dict[str, Any]:
     """Sends the email or creates a draft (supports threaded replies)."""
     is_followup = state.get('is_followup_mode', False)
     thread_id = state.get('thread_id')
-    mode = state.get('mode', 'interactive')
     
     if is_followup and thread_id:
         logger.info(f"Creating threaded follow-up draft in thread: {thread_id}")
@@ -342,18 +552,9 @@ def send_email_node(state: AgentState) -> Dict[str, Any]:
                 body=state['email_body'],
                 attachment_path=state.get('resume_pdf_path'),
             )
-            if draft.get('is_bounced'):
-                return {"status": "bounced"}
-                
-            log_event("followup_draft_created", state.get('recipient_name', ''), state.get('company_name', ''),
-                      data={"thread_id": thread_id, "followup_number": state.get('followup_number')})
-            return {"status": "sent"}
+            return _followup_reply_result(state, draft)
         except Exception as e:
-            logger.error(f"Failed to create threaded draft: {e}")
-            error_str = str(e)
-            if "404" in error_str and "notFound" in error_str:
-                error_str = "Thread Not Found in Gmail (404)"
-            return {"status": "error", "error_message": error_str}
+            return _followup_reply_failed(e)
 
     # Fallback to normal send/draft logic
     recipients = state.get('selected_emails', [])
@@ -362,18 +563,10 @@ def send_email_node(state: AgentState) -> Dict[str, Any]:
         return {"status": "error", "error_message": "No selected emails found"}
 
     # Validate emails before sending
-    to_field = ", ".join(recipients)
-    valid_emails, invalid_emails = validate_recipients(to_field)
-
-    if invalid_emails:
-        for inv in invalid_emails:
-            logger.warning(f"Skipping invalid email: {inv}")
-            log_event("invalid_email", state.get('recipient_name', ''), state.get('company_name', ''),
-                      data={"invalid_email": inv})
-
-    if not valid_emails:
-        logger.error("No valid emails to send to. Skipping.")
-        return {"status": "skipped"}
+    valid_emails, invalid_emails = validate_recipients(", ".join(recipients))
+    skipped = _filter_recipients(state, valid_emails, invalid_emails)
+    if skipped:
+        return skipped
 
     to_field = ", ".join(valid_emails)
     mode = state.get('mode', 'interactive')
@@ -389,10 +582,7 @@ def send_email_node(state: AgentState) -> Dict[str, Any]:
                 attachment_path=attachment_path,
             )
             thread_id = draft.get('message', {}).get('threadId')
-            log_event("draft_created", state.get('recipient_name', ''), state.get('company_name', ''),
-                      data={"to": to_field, "subject": state['email_subject'], "thread_id": thread_id})
-            logger.info(f"Draft created successfully. Thread ID: {thread_id}")
-            return {"status": "sent", "thread_id": thread_id}
+            return _message_sent_result(state, "draft_created", to_field, thread_id)
         except Exception as e:
             logger.error(f"Failed to create draft: {e}")
             return {"status": "error", "error_message": str(e)}
@@ -405,51 +595,130 @@ def send_email_node(state: AgentState) -> Dict[str, Any]:
                 body=state['email_body'],
                 attachment_path=attachment_path,
             )
-            thread_id = result.get('threadId')
-            log_event("email_sent", state.get('recipient_name', ''), state.get('company_name', ''),
-                      data={"to": to_field, "subject": state['email_subject'], "thread_id": thread_id})
-            logger.info(f"Email sent successfully. Thread ID: {thread_id}")
-            return {"status": "sent", "thread_id": thread_id}
+            return _message_sent_result(state, "email_sent", to_field, result.get('threadId'))
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
             return {"status": "error", "error_message": str(e)}
 
 
-def update_sheet_node(state: AgentState) -> Dict[str, Any]:
-    """Updates the Google Sheet with completion status and Thread ID."""
-    status_text = ""
+async def asend_email_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of send_email_node."""
+    is_followup = state.get('is_followup_mode', False)
+    thread_id = state.get('thread_id')
+
+    if is_followup and thread_id:
+        logger.info(f"Creating threaded follow-up draft in thread: {thread_id}")
+        try:
+            draft = await acreate_draft_reply(
+                thread_id=thread_id,
+                body=state['email_body'],
+                attachment_path=state.get('resume_pdf_path'),
+            )
+            return _followup_reply_result(state, draft)
+        except Exception as e:
+            return _followup_reply_failed(e)
+
+    recipients = state.get('selected_emails', [])
+    if not recipients:
+        logger.error("No selected emails found.")
+        return {"status": "error", "error_message": "No selected emails found"}
+
+    valid_emails, invalid_emails = await avalidate_recipients(", ".join(recipients))
+    skipped = _filter_recipients(state, valid_emails, invalid_emails)
+    if skipped:
+        return skipped
+
+    to_field = ", ".join(valid_emails)
+    mode = state.get('mode', 'interactive')
+    attachment_path = state.get('resume_pdf_path')
+
+    if mode == 'auto_draft':
+        logger.info(f"[Auto Mode] Creating draft for: {to_field}...")
+        try:
+            draft = await acreate_draft(
+                to=to_field,
+                subject=state['email_subject'],
+                body=state['email_body'],
+                attachment_path=attachment_path,
+            )
+            thread_id = draft.get('message', {}).get('threadId')
+            return _message_sent_result(state, "draft_created", to_field, thread_id)
+        except Exception as e:
+            logger.error(f"Failed to create draft: {e}")
+            return {"status": "error", "error_message": str(e)}
+    else:
+        logger.info(f"[Interactive] Sending email to: {to_field}...")
+        try:
+            result = await asend_email(
+                to=to_field,
+                subject=state['email_subject'],
+                body=state['email_body'],
+                attachment_path=attachment_path,
+            )
+            return _message_sent_result(state, "email_sent", to_field, result.get('threadId'))
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+            return {"status": "error", "error_message": str(e)}
+
+
+def _status_text(state: AgentState) -> str:
+    """The text written to the sheet for a lead's final status ("" for none)."""
     current_status = state['status']
     mode = state.get('mode', 'interactive')
     is_followup = state.get('is_followup_mode', False)
-    followup_num = state.get('followup_number', 0)
-    thread_id = state.get('thread_id')
 
     if current_status == 'sent':
         status_prefix = "Drafted" if mode == 'auto_draft' or is_followup else "Sent"
-        status_text = f"{status_prefix}: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        return f"{status_prefix}: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
     elif current_status == 'skipped':
-        status_text = "Skipped"
+        return "Skipped"
     elif current_status == 'bounced':
-        status_text = "Bounced"
+        return "Bounced"
     elif current_status == 'error':
         error_msg = state.get("error_message", "Failed")
-        status_text = f"Error: {error_msg}"
+        return f"Error: {error_msg}"
+    return ""
+
+
+def _status_update_kwargs(state: AgentState) -> Dict[str, Any]:
+    is_followup = state.get('is_followup_mode', False)
+    followup_num = state.get('followup_number', 0)
+    return {
+        "status_index": state.get('status_index', 5),
+        "followup_number": followup_num if is_followup else 0,
+        "f_indices": {
+            'f1': state.get('f1_index'),
+            'f2': state.get('f2_index')
+        },
+        "thread_id": state.get('thread_id'),
+        "thread_id_index": state.get('thread_id_index'),
+    }
+
+
+def update_sheet_node(state: AgentState) -> Dict[str, Any]:
+    """Updates the Google Sheet with completion status and Thread ID."""
+    status_text = _status_text(state)
 
     if status_text:
         logger.info(f"Updating Row {state['row_index']}: '{status_text}'")
         try:
-            update_lead_status(
-                state['row_index'],
-                status_text,
-                status_index=state.get('status_index', 5),
-                followup_number=followup_num if is_followup else 0,
-                f_indices={
-                    'f1': state.get('f1_index'),
-                    'f2': state.get('f2_index')
-                },
-                thread_id=thread_id,
-                thread_id_index=state.get('thread_id_index')
-            )
+            update_lead_status(state['row_index'], status_text, **_status_update_kwargs(state))
+        except Exception as e:
+            logger.error(f"Sheet update FAILED: {str(e)}")
+    else:
+        logger.debug("No status text to update.")
+
+    return {"status": "updated"}
+
+
+async def aupdate_sheet_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of update_sheet_node."""
+    status_text = _status_text(state)
+
+    if status_text:
+        logger.info(f"Updating Row {state['row_index']}: '{status_text}'")
+        try:
+            await aupdate_lead_status(state['row_index'], status_text, **_status_update_kwargs(state))
         except Exception as e:
             logger.error(f"Sheet update FAILED: {str(e)}")
     else:
@@ -463,26 +732,53 @@ def human_review_node(state: AgentState) -> Dict[str, Any]:
     return {}
 
 
-def evaluate_starred_thread(chat_history: str) -> ThreadEvaluation:
-    """Evaluates a full chat history of a starred Gmail thread natively."""
+async def ahuman_review_node(state: AgentState) -> Dict[str, Any]:
+    """Async variant of human_review_node."""
+    return {}
+
+
+def _starred_evaluation_request(chat_history: str) -> Tuple[Any, List[Any]]:
     system_prompt = get_starred_evaluation_system_prompt()
     user_prompt = get_starred_evaluation_user_prompt(chat_history=chat_history)
     
     # We use Flash here for speed, context window, and cost
     structured_llm = _get_model("flash").with_structured_output(ThreadEvaluation)
+    return structured_llm, [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+
+
+def _starred_evaluation_failed(e: Exception) -> ThreadEvaluation:
+    logger.error(f"Error evaluating starred thread: {e}")
+    # Return a safe fallback
+    return ThreadEvaluation(
+        follow_up=False,
+        confidence_score=0,
+        reason=f"LLM parsing failed: {str(e)}",
+        suggested_draft=""
+    )
+
+
+def evaluate_starred_thread(chat_history: str) -> ThreadEvaluation:
+    """Evaluates a full chat history of a starred Gmail thread natively."""
+    structured_llm, messages = _starred_evaluation_request(chat_history)
     
     try:
-        response: ThreadEvaluation = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ])
+        with api_limit("gemini"):
+            response: ThreadEvaluation = structured_llm.invoke(messages)
+        return response
+    except Exception as e:
+        return _starred_evaluation_failed(e)
+
+
+async def aevaluate_starred_thread(chat_history: str) -> ThreadEvaluation:
+    """Async variant of evaluate_starred_thread."""
+    structured_llm, messages = _starred_evaluation_request(chat_history)
+
+    try:
+        async with async_api_limit("gemini"):
+            response: ThreadEvaluation = await structured_llm.ainvoke(messages)
         return response
     except Exception as e:
-        logger.error(f"Error evaluating starred thread: {e}")
-        # Return a safe fallback
-        return ThreadEvaluation(
-            follow_up=False,
-            confidence_score=0,
-            reason=f"LLM parsing failed: {str(e)}",
-            suggested_draft=""
-        )
\ No newline at end of file
+        return _starred_evaluation_failed(e)
@@ -0,0 +1,127 @@
+"""
+Background preparation of upcoming leads for interactive mode.
+
+While the user reviews one draft, the next PREFETCH_DEPTH leads are claimed
+from the sheet and run through the single-lead graph (validate → research →
+generate) on worker threads. The graph is compiled with an interrupt before
+``review``, so prefetched leads stop with a ready draft and can never reach
+``send`` without the user's approval. Nothing is written to the sheet for a
+lead until it has been reviewed, so leads still queued when the user quits
+are simply dropped, and so are their checkpoints: the rows go back to the
+pool instead of being held for ``--resume``.
+
+Preparations run on daemon threads, so quitting never waits for them. One
+still running stops at its next graph step; if the process exits before
+that step ends, its last checkpoint is left behind and ``--resume`` picks
+the lead up again.
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.checkpoints import lead_config, prune_lead, release_lead
+from src.graph import create_graph
+from src.nodes import build_lead_state
+from src.tools_sheets import fetch_lead
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Keeps up to ``depth`` claimed leads drafting in the background."""
+
+    def __init__(
+        self,
+        base_state: Dict[str, Any],
+        depth: int,
+        resume: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.base_state = base_state
+        self.depth = max(depth, 0)
+        self.graph = create_graph(autonomous=False, single_lead=True)
+        self._followup_filter = base_state["followup_number"] if base_state.get("is_followup_mode") else 0
+        self._resume: Deque[Dict[str, Any]] = deque(resume or [])
+        self._queue: Deque[Tuple[Dict[str, Any], Future]] = deque()
+        self._closed = threading.Event()
+        self._exhausted = False
+
+    def _prepare(self, lead: Dict[str, Any], config: Dict[str, Any]) -> None:
+        initial = {**self.base_state, **build_lead_state(lead, self.base_state)}
+        for _ in self.graph.stream(initial, config, durability="sync"):
+            if self._closed.is_set():
+                return  # close() releases the checkpoints once this returns
+        prune_lead(self.graph.checkpointer, config)
+
+    def _start(self, lead: Dict[str, Any], config: Dict[str, Any]) -> Future:
+        """Prepares a lead on its own daemon thread (the queue never holds more than ``depth``)."""
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                self._prepare(lead, config)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        threading.Thread(target=run, name=f"ace-prefetch-{lead['row_index']}", daemon=True).start()
+        return future
+
+    def _fill(self, target: int) -> None:
+        while not self._exhausted and len(self._queue) < target:
+            lead = fetch_lead(followup_number=self._followup_filter)
+            if not lead:
+                self._exhausted = True
+                break
+            config = lead_config(lead["row_index"], self._followup_filter)
+            self._queue.append((lead, self._start(lead, config)))
+
+    def next(self) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Returns ``(config, failed_state)`` for the next claimed lead, or None when done.
+
+        Waits if the lead is still being prepared. On success ``failed_state``
+        is None and the graph for ``config`` is paused before review (or has
+        finished, if the lead was skipped early). If preparation raised,
+        ``failed_state`` is the error state to record for the row. Threads
+        passed in through ``resume`` come first, exactly as they were left.
+        """
+        if self._resume:
+            return self._resume.popleft(), None
+
+        self._fill(1)
+        if not self._queue:
+            return None
+
+        lead, future = self._queue.popleft()
+        # Start on the leads after this one while it is being reviewed
+        self._fill(self.depth)
+
+        config = lead_config(lead["row_index"], self._followup_filter)
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Preparing lead at row {lead['row_index']} failed: {e}")
+            return config, {**self.base_state, **lead, "status": "error", "error_message": str(e)}
+        return config, None
+
+    def close(self) -> None:
+        """Drops queued leads and their checkpoints without waiting for running preparations.
+
+        A running preparation stops after its current graph step; its
+        checkpoints are released as soon as it does.
+        """
+        self._closed.set()
+        if self._queue:
+            rows = ", ".join(str(lead["row_index"]) for lead, _ in self._queue)
+            logger.info(f"Releasing unreviewed prefetched lead(s) at row(s) {rows}.")
+        saver = self.graph.checkpointer
+        for lead, future in self._queue:
+            config = lead_config(lead["row_index"], self._followup_filter)
+            future.cancel()
+            # Runs now if the lead is already prepared, else when its thread stops
+            future.add_done_callback(lambda _, config=config: release_lead(saver, config))
+        self._queue.clear()
@@ -0,0 +1,173 @@
+"""
+Bulk pre-validation of every pending lead in the sheet.
+
+Collects candidate addresses from all rows without a Status, resolves every
+distinct domain concurrently with dnspython's async resolver, stores the
+verdicts in the shared validation cache and writes a per-row verdict into
+the "Validation" column in a single batched update. fetch_lead skips rows
+whose verdict starts with "Invalid", so they never reach research or
+generation.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+from src.tools_sheets import extract_emails_from_row, get_lead_source, get_sheet_writer
+from src.tools_gmail import _check_syntax
+from src.validation_cache import DomainEntry, SyntaxEntry, get_validation_cache
+from config.settings import PREVALIDATE_CONCURRENCY, PREVALIDATE_DNS_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_HEADER = "Validation"
+
+
+async def _resolve_domain(
+    resolver: dns.asyncresolver.Resolver, domain: str
+) -> Optional[DomainEntry]:
+    """Async MX check mirroring email-validator's rules.
+
+    Returns None when DNS gave no usable answer (timeouts, no nameservers),
+    so the domain is left unverified rather than cached as a verdict.
+    """
+    try:
+        answer = await resolver.resolve(domain, "MX")
+        # RFC 7505: a lone null MX (".") means the domain takes no mail
+        if not any(str(r.exchange).rstrip(".") for r in answer):
+            return DomainEntry(False, f"The domain name {domain} does not accept email.")
+        return DomainEntry(True)
+    except dns.resolver.NXDOMAIN:
+        return DomainEntry(False, f"The domain name {domain} does not exist.")
+    except dns.resolver.NoAnswer:
+        # No MX record: fall back to A/AAAA like email-validator does
+        for rdtype in ("A", "AAAA"):
+            try:
+                await resolver.resolve(domain, rdtype)
+                return DomainEntry(True)
+            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+                continue
+            except dns.exception.DNSException:
+                return None
+        return DomainEntry(False, f"The domain name {domain} does not accept email.")
+    except dns.exception.DNSException as e:
+        logger.debug(f"DNS lookup for {domain} inconclusive: {e}")
+        return None
+
+
+async def _resolve_domains(domains: Iterable[str]) -> Dict[str, Optional[DomainEntry]]:
+    """Resolves all domains concurrently, at most PREVALIDATE_CONCURRENCY at a time."""
+    resolver = dns.asyncresolver.Resolver()
+    resolver.lifetime = PREVALIDATE_DNS_TIMEOUT
+    semaphore = asyncio.Semaphore(PREVALIDATE_CONCURRENCY)
+
+    async def resolve_one(domain: str) -> Tuple[str, Optional[DomainEntry]]:
+        async with semaphore:
+            return domain, await _resolve_domain(resolver, domain)
+
+    results = await asyncio.gather(*(resolve_one(d) for d in domains))
+    return dict(results)
+
+
+def _row_verdict(
+    syntax: Dict[str, SyntaxEntry], domains: Dict[str, Optional[DomainEntry]], emails: list
+) -> str:
+    """Collapses the per-address results of one row into a single verdict."""
+    if not emails:
+        return "Invalid: no email found"
+
+    reasons = []
+    unverified = False
+    for email in emails:
+        entry = syntax[email]
+        if not entry.is_valid:
+            reasons.append(entry.reason)
+            continue
+        domain = domains.get(entry.ascii_domain)
+        if domain is None:
+            unverified = True
+        elif domain.is_valid:
+            return "Valid"
+        else:
+            reasons.append(domain.reason)
+
+    if unverified:
+        return "Unverified"
+    return f"Invalid: {reasons[0]}" if reasons else "Invalid"
+
+
+def _free_column(rows: List[List[str]]) -> int:
+    """First column within A:Z that is empty in every row, header included (-1 if none).
+
+    The Sheets API drops trailing empty cells per row, so the header row
+    alone does not show which columns still hold data.
+    """
+    for col_index in range(26):
+        if all(len(row) <= col_index or not str(row[col_index]).strip() for row in rows):
+            return col_index
+    return -1
+
+
+def prevalidate_sheet() -> Dict[str, int]:
+    """Validates every pending lead and writes the verdicts back in one batch.
+
+    Returns a count of rows per verdict ("valid", "invalid", "unverified").
+    """
+    source = get_lead_source()
+    source.load()
+    if not source.rows:
+        return {}
+
+    validation_index = source.columns.get("validation", -1)
+    cells: Dict[Tuple[int, int], str] = {}
+    if validation_index == -1:
+        validation_index = _free_column(source.rows)
+        if validation_index == -1:
+            raise ValueError("No free column within A:Z for the Validation verdicts; add a 'Validation' header.")
+        cells[(1, validation_index)] = VALIDATION_HEADER
+
+    status_index = source.columns["status"]
+    pending: Dict[int, list] = {}
+    for row_index, row in enumerate(source.rows[1:], start=2):
+        status = row[status_index] if len(row) > status_index else ""
+        if status.strip():
+            continue
+        pending[row_index] = extract_emails_from_row(row, status_index)
+
+    # Syntax is cheap and cached; only distinct, uncached domains hit DNS
+    cache = get_validation_cache()
+    syntax: Dict[str, SyntaxEntry] = {}
+    domains: Dict[str, Optional[DomainEntry]] = {}
+    for emails in pending.values():
+        for email in emails:
+            if email in syntax:
+                continue
+            syntax[email] = entry = _check_syntax(email)
+            if entry.is_valid and entry.ascii_domain not in domains:
+                domains[entry.ascii_domain] = cache.get_domain(entry.ascii_domain)
+
+    unresolved = [d for d, entry in domains.items() if entry is None]
+    logger.info(
+        f"Pre-validating {len(pending)} pending row(s): {len(domains)} distinct domain(s), "
+        f"{len(unresolved)} needing DNS."
+    )
+    if unresolved:
+        resolved = asyncio.run(_resolve_domains(unresolved))
+        for domain, entry in resolved.items():
+            domains[domain] = entry
+            if entry is not None:
+                cache.put_domain(domain, entry)
+
+    counts = {"valid": 0, "invalid": 0, "unverified": 0}
+    for row_index, emails in pending.items():
+        verdict = _row_verdict(syntax, domains, emails)
+        counts[verdict.split(":")[0].lower()] += 1
+        cells[(row_index, validation_index)] = verdict
+
+    if cells:
+        get_sheet_writer().write_many(cells)
+    logger.info(f"Pre-validation complete: {counts}")
+    return counts
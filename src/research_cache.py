@@ -0,0 +1,169 @@
+"""
+Persistent cache of company research results.
+
+research_node asks this cache before calling the Google Search-bound model,
+so colleagues at the same company share one research call across leads and
+across runs. Entries are keyed by normalized company name (falling back to
+the recipient's email domain) and, with RESEARCH_CACHE_PER_RECIPIENT, the
+recipient too. SQLite is used by default; set RESEARCH_CACHE_BACKEND=redis
+to use the Redis service from docker-compose.yml instead.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import (
+    RESEARCH_CACHE_BACKEND,
+    RESEARCH_CACHE_FILE,
+    RESEARCH_CACHE_PER_RECIPIENT,
+    RESEARCH_CACHE_TTL_SECONDS,
+    REDIS_URL,
+)
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_LEGAL_SUFFIXES = frozenset({
+    "inc", "llc", "ltd", "limited", "corp", "corporation", "co", "gmbh",
+    "pvt", "private", "plc", "ag", "sa", "bv",
+})
+
+_REDIS_PREFIX = "ace:research:"
+
+
+def normalize_company(name: str) -> str:
+    """Lowercases, drops punctuation and trailing legal suffixes (Inc., Pvt Ltd, ...)."""
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split()
+    while words and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def invalidation_patterns(target: str) -> List[str]:
+    """Glob patterns for the cache keys of a company name or an email domain.
+
+    A company's leads may be cached under their email domain (see
+    ``research_key``), so a name also matches domains with it as a label:
+    "Acme Inc" covers acme.com and mail.acme.co.uk.
+    """
+    target = (target or "").strip().lower()
+    if "." in target and " " not in target:
+        domain = target.rsplit("@", 1)[-1]
+        return [domain, f"{domain}|*"]
+    company = normalize_company(target)
+    if not company:
+        return []
+    label = company.replace(" ", "")
+    return [company, f"{company}|*", f"{label}.*", f"*.{label}.*"]
+
+
+def research_key(company_name: str, recipient_name: str = "", emails: Optional[List[str]] = None) -> str:
+    """Builds the cache key for a lead, or "" if nothing identifies the company."""
+    company = normalize_company(company_name)
+    if not company or company == "unknown":
+        domains = [e.rsplit("@", 1)[-1].lower() for e in emails or [] if "@" in e]
+        company = domains[0] if domains else ""
+    if not company:
+        return ""
+    if RESEARCH_CACHE_PER_RECIPIENT:
+        return f"{company}|{normalize_company(recipient_name)}"
+    return company
+
+
+class SQLiteResearchCache:
+    """Research cache stored in a local SQLite file."""
+
+    def __init__(self, path=RESEARCH_CACHE_FILE, ttl: float = RESEARCH_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM research WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: Dict[str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research VALUES (?, ?, ?)",
+                (key, json.dumps(payload), time.time() + self.ttl),
+            )
+
+    def invalidate(self, company_name: str = "") -> int:
+        """Drops entries for one company or email domain (all recipients), or everything if empty."""
+        with self._lock, self._conn:
+            if not company_name:
+                cursor = self._conn.execute("DELETE FROM research")
+            else:
+                patterns = invalidation_patterns(company_name)
+                if not patterns:
+                    return 0
+                cursor = self._conn.execute(
+                    "DELETE FROM research WHERE " + " OR ".join(["key GLOB ?"] * len(patterns)),
+                    patterns,
+                )
+            return cursor.rowcount
+
+
+class RedisResearchCache:
+    """Research cache stored in Redis, expiring entries with native TTLs."""
+
+    def __init__(self, url: str = REDIS_URL, ttl: float = RESEARCH_CACHE_TTL_SECONDS):
+        self.ttl = int(ttl)
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        payload = self._client.get(_REDIS_PREFIX + key)
+        return json.loads(payload) if payload else None
+
+    def put(self, key: str, payload: Dict[str, str]) -> None:
+        self._client.set(_REDIS_PREFIX + key, json.dumps(payload), ex=self.ttl)
+
+    def invalidate(self, company_name: str = "") -> int:
+        """Drops entries for one company or email domain (all recipients), or everything if empty."""
+        if company_name:
+            keys = {
+                key for pattern in invalidation_patterns(company_name)
+                for key in self._client.scan_iter(_REDIS_PREFIX + pattern)
+            }
+        else:
+            keys = list(self._client.scan_iter(f"{_REDIS_PREFIX}*"))
+        return self._client.delete(*keys) if keys else 0
+
+
+_research_cache = None
+
+
+def get_research_cache():
+    """Returns the configured research cache backend, creating it on first use."""
+    global _research_cache
+    if _research_cache is None:
+        if RESEARCH_CACHE_BACKEND == "redis" and redis is not None:
+            _research_cache = RedisResearchCache()
+        else:
+            if RESEARCH_CACHE_BACKEND == "redis":
+                logger.warning("redis package not installed. Using the SQLite research cache.")
+            _research_cache = SQLiteResearchCache()
+    return _research_cache
@@ -0,0 +1,174 @@
+"""
+Concurrent lead pipeline for auto_draft mode.
+
+One event loop drives every lead: leads are claimed from the sheet one at a
+time (so no row can be claimed twice) and each runs the single-lead graph
+through ``ainvoke`` under its own graph thread, as an asyncio task. Finished
+leads are written back to the sheet in claim order, so the Status column
+always reflects a contiguous prefix of completed work; while a slow lead
+holds up the write-back, no more than WRITE_BACK_LAG times the concurrency
+of finished leads wait behind it before claiming pauses. Per-API limits live
+in src.limits.
+
+Lead threads are checkpointed durably (src.checkpoints); leads left over by
+an interrupted run can be passed back in through ``resume`` and continue
+from their last checkpoint before any new lead is claimed.
+"""
+import asyncio
+import logging
+import signal
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.checkpoints import acomplete_lead, async_checkpointer, lead_config
+from src.graph import create_graph
+from src.nodes import build_lead_state, aupdate_sheet_node
+from src.tools_sheets import afetch_lead
+
+logger = logging.getLogger(__name__)
+
+# Finished leads allowed to wait for write-back, per unit of concurrency
+WRITE_BACK_LAG = 2
+
+
+async def _process_lead(
+    graph, config: Dict[str, Any], base_state: Dict[str, Any], lead: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Runs one lead through the graph and returns its final state.
+
+    ``lead`` is a freshly claimed row, or None to continue ``config``'s
+    thread from its last checkpoint. Returns None if a resumed lead failed
+    and its state cannot be read back either: it is left to the next run.
+    """
+    try:
+        if lead is None:
+            await graph.ainvoke(None, config, durability="sync")
+        else:
+            # Stores blobs and logs the lead: file and SQLite work, kept off the loop
+            lead_state = await asyncio.to_thread(build_lead_state, lead, base_state)
+            await graph.ainvoke({**base_state, **lead_state}, config, durability="sync")
+        return (await graph.aget_state(config)).values
+    except Exception as e:
+        thread_id = config["configurable"]["thread_id"]
+        logger.error(f"Lead {thread_id} failed: {e}")
+        if lead is None:
+            try:
+                lead = (await graph.aget_state(config)).values
+            except Exception as state_error:
+                # Likely the checkpointer itself failed; keep the row for --resume
+                logger.error(f"Could not read back {thread_id}, releasing it unrecorded: {state_error}")
+                return None
+        return {**base_state, **lead, "status": "error", "error_message": str(e)}
+
+
+async def arun_auto_draft(
+    run_mode: str,
+    is_followup: bool,
+    followup_num: int,
+    concurrency: int,
+    resume: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """Processes every due lead with up to ``concurrency`` leads in flight.
+
+    ``resume`` lists the graph configs of leads left over by an interrupted
+    run; they are continued first. Returns the number of leads processed.
+    On Ctrl+C no new leads are claimed; leads already in flight are finished
+    and written back before KeyboardInterrupt is raised.
+    """
+    async with async_checkpointer() as saver:
+        return await _run(saver, run_mode, is_followup, followup_num, concurrency, list(resume or []))
+
+
+async def _run(
+    saver,
+    run_mode: str,
+    is_followup: bool,
+    followup_num: int,
+    concurrency: int,
+    resume: List[Dict[str, Any]],
+) -> int:
+    graph = create_graph(autonomous=True, single_lead=True, checkpointer=saver)
+    base_state = {
+        "mode": run_mode,
+        "is_followup_mode": is_followup,
+        "followup_number": followup_num,
+    }
+    followup_filter = followup_num if is_followup else 0
+    concurrency = max(concurrency, 1)
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    interrupted = False
+
+    def on_sigint() -> None:
+        nonlocal interrupted
+        if not interrupted:
+            logger.warning(f"Interrupted. Finishing {len(in_flight)} in-flight lead(s)...")
+        interrupted = True
+        stopping.set()
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, on_sigint)
+        handles_sigint = True
+    except (NotImplementedError, RuntimeError):
+        # Not the main thread or no signal support (Windows): Ctrl+C cancels the run instead
+        handles_sigint = False
+
+    in_flight: Dict[asyncio.Task, int] = {}
+    finished: Dict[int, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {}
+    max_finished = concurrency * WRITE_BACK_LAG
+    configs: Dict[int, Dict[str, Any]] = {}
+    next_claim = 0
+    next_write = 0
+
+    async def write_back_ready() -> None:
+        nonlocal next_write
+        while next_write in finished:
+            config, state = finished.pop(next_write)
+            if state is not None:
+                await aupdate_sheet_node(state)
+                await acomplete_lead(saver, config, state)
+            next_write += 1
+
+    try:
+        while True:
+            # Claiming pauses while too many finished leads wait on a slow earlier one
+            while not stopping.is_set() and len(in_flight) < concurrency and len(finished) < max_finished:
+                if resume:
+                    config, lead = resume.pop(0), None
+                else:
+                    lead = await afetch_lead(followup_number=followup_filter)
+                    if not lead:
+                        stopping.set()
+                        break
+                    config = lead_config(lead["row_index"], followup_filter)
+                task = asyncio.create_task(_process_lead(graph, config, base_state, lead))
+                in_flight[task] = next_claim
+                configs[next_claim] = config
+                next_claim += 1
+
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                seq = in_flight.pop(task)
+                finished[seq] = (configs.pop(seq), task.result())
+            await write_back_ready()
+    finally:
+        if handles_sigint:
+            loop.remove_signal_handler(signal.SIGINT)
+
+    if interrupted:
+        raise KeyboardInterrupt
+    return next_claim
+
+
+def run_auto_draft(
+    run_mode: str,
+    is_followup: bool,
+    followup_num: int,
+    concurrency: int,
+    resume: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """Synchronous entry point for arun_auto_draft."""
+    return asyncio.run(arun_auto_draft(run_mode, is_followup, followup_num, concurrency, resume))
@@ -0,0 +1,251 @@
+"""
+Paced, resumable sending of queued Gmail drafts (``--send-drafts``).
+
+Drafts are queued in SEND_QUEUE_FILE (SQLite) before the first send and
+leave the queue only once sent, so an interrupted run resumes where it
+stopped. Every send is logged with its time and recipient domain, and
+pacing is decided from that log:
+
+- a token bucket refilled at SEND_RATE_PER_MINUTE (bursts of up to
+  SEND_BURST), with up to SEND_JITTER of the interval added at random
+  after each send;
+- at most SEND_RATE_PER_DAY sends in any rolling 24 hours, across runs;
+- at least SEND_DOMAIN_SPACING seconds between two sends to the same
+  recipient domain. A draft whose domain is still cooling down is skipped
+  in favour of the next one, not waited for;
+- a 429 or 5xx answer halves the rate (down to 1/32 of it) and the draft
+  is retried later; each success afterwards takes a quarter off the
+  remaining slowdown. Any retry, after throttling or a network error,
+  first waits a send interval that doubles with each failed try.
+"""
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import getaddresses
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from config.settings import (
+    SEND_BURST,
+    SEND_DOMAIN_SPACING,
+    SEND_JITTER,
+    SEND_MAX_ATTEMPTS,
+    SEND_QUEUE_FILE,
+    SEND_RATE_PER_DAY,
+    SEND_RATE_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+MAX_SLOWDOWN = 32.0
+
+
+@dataclass
+class QueuedSend:
+    """One draft waiting in the send queue."""
+    draft_id: str
+    to: str
+    subject: str
+    domain: str
+    attempts: int = 0
+
+
+def recipient_domain(to_field: str) -> str:
+    """Lower-cased domain of the first address in a To header ("" if none)."""
+    for _, addr in getaddresses([to_field]):
+        if "@" in addr:
+            return addr.rsplit("@", 1)[1].lower()
+    return ""
+
+
+def is_throttled(error: Exception) -> bool:
+    """True for answers that mean "slow down": 429 and 5xx."""
+    return isinstance(error, HttpError) and (error.resp.status == 429 or error.resp.status >= 500)
+
+
+def describe_pace(
+    per_minute: float = SEND_RATE_PER_MINUTE,
+    per_day: int = SEND_RATE_PER_DAY,
+    domain_spacing: float = SEND_DOMAIN_SPACING,
+) -> str:
+    """One-line summary of a send pace, e.g. for help text and the mode banner."""
+    spacing = f", {domain_spacing:.0f}s between sends to one domain" if domain_spacing else ""
+    return f"up to {per_minute:g}/min and {per_day}/day{spacing}"
+
+
+def is_gone(error: Exception) -> bool:
+    """True if the draft no longer exists: it was sent (e.g. just before an interruption) or deleted."""
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+
+class SendScheduler:
+    """Durable send queue plus the pacing state deciding when the next draft may go."""
+
+    def __init__(
+        self,
+        path=SEND_QUEUE_FILE,
+        per_minute: float = SEND_RATE_PER_MINUTE,
+        per_day: int = SEND_RATE_PER_DAY,
+        burst: int = SEND_BURST,
+        domain_spacing: float = SEND_DOMAIN_SPACING,
+        jitter: float = SEND_JITTER,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.burst = max(burst, 1)
+        self.domain_spacing = domain_spacing
+        self.jitter = jitter
+        self._clock = clock
+        self._slowdown = 1.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS send_queue (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                draft_id TEXT NOT NULL UNIQUE,
+                recipient TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS send_log (
+                sent_at REAL NOT NULL,
+                domain TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_send_log_time ON send_log (sent_at);
+            """
+        )
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM send_log WHERE sent_at < ?", (now - DAY_SECONDS,))
+        # The bucket starts full unless this run continues straight after the last send
+        last = self._conn.execute("SELECT MAX(sent_at) FROM send_log").fetchone()[0]
+        self._tokens = float(self.burst)
+        self._updated_at = now
+        self._not_before = (last + self._interval()) if last else now
+        self._domain_last: Dict[str, float] = dict(
+            self._conn.execute("SELECT domain, MAX(sent_at) FROM send_log GROUP BY domain").fetchall()
+        )
+
+    # -- queue ------------------------------------------------------------
+    def enqueue(self, drafts: Iterable[Tuple[str, str, str]]) -> int:
+        """Queues ``(draft_id, to, subject)`` triples in order; returns how many were new."""
+        rows = [(draft_id, to, subject, recipient_domain(to)) for draft_id, to, subject in drafts]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO send_queue (draft_id, recipient, subject, domain) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def pending(self) -> List[QueuedSend]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT draft_id, recipient, subject, domain, attempts FROM send_queue ORDER BY seq"
+            ).fetchall()
+        return [QueuedSend(*row) for row in rows]
+
+    # -- pacing -----------------------------------------------------------
+    def _interval(self) -> float:
+        """Seconds per send at the current (possibly slowed) rate."""
+        return 60.0 / self.per_minute * self._slowdown
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) / self._interval())
+        self._updated_at = now
+
+    def sent_today(self) -> int:
+        """Sends in the last 24 hours, across runs."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM send_log WHERE sent_at >= ?", (self._clock() - DAY_SECONDS,)
+            ).fetchone()[0]
+
+    def daily_limit_reached(self) -> bool:
+        return self.sent_today() >= self.per_day
+
+    def next_ready(self) -> Tuple[Optional[QueuedSend], float]:
+        """Picks the next draft allowed to go now.
+
+        Returns ``(item, 0)``, or ``(None, seconds)`` to wait before asking
+        again; ``(None, 0)`` when the queue is empty.
+        """
+        queue = self.pending()
+        if not queue:
+            return None, 0.0
+        now = self._clock()
+        with self._lock:
+            self._refill(now)
+            wait = max(self._not_before - now, (1 - self._tokens) * self._interval(), 0.0)
+        if self.daily_limit_reached():
+            with self._lock:
+                oldest = self._conn.execute(
+                    "SELECT sent_at FROM send_log ORDER BY sent_at DESC LIMIT 1 OFFSET ?",
+                    (self.per_day - 1,),
+                ).fetchone()
+            wait = max(wait, oldest[0] + DAY_SECONDS - now) if oldest else wait
+        if wait > 0:
+            return None, wait
+
+        domain_wait = float("inf")
+        for item in queue:
+            free_at = self._domain_last.get(item.domain, 0.0) + self.domain_spacing if item.domain else 0.0
+            if free_at <= now:
+                return item, 0.0
+            domain_wait = min(domain_wait, free_at - now)
+        return None, domain_wait
+
+    def record_sent(self, item: QueuedSend) -> None:
+        """Takes a sent draft off the queue and spends a token."""
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM send_queue WHERE draft_id = ?", (item.draft_id,))
+            self._conn.execute("INSERT INTO send_log VALUES (?, ?)", (now, item.domain))
+            self._refill(now)
+            self._tokens -= 1
+            # A quarter of the slowdown beyond the configured rate goes per success
+            self._slowdown = 1.0 + (self._slowdown - 1.0) * 0.75
+            # Jitter goes on top of the wait for the next token
+            next_token = max(0.0, 1 - self._tokens) * self._interval()
+            self._not_before = now + next_token + random.uniform(0, self.jitter * self._interval())
+            if item.domain:
+                self._domain_last[item.domain] = now
+
+    def record_failure(self, item: QueuedSend, error: Exception) -> bool:
+        """Handles a failed send; returns True if the draft stays queued for another try.
+
+        Throttling answers slow the pace down; they and network errors keep
+        the draft, up to SEND_MAX_ATTEMPTS tries, and hold every send back
+        for a send interval that doubles with each failed try. A draft that
+        no longer exists (404: sent or deleted meanwhile) or any other error
+        drops it from the queue.
+        """
+        now = self._clock()
+        transient = is_throttled(error) or isinstance(error, OSError)
+        retry = transient and item.attempts + 1 < SEND_MAX_ATTEMPTS
+        with self._lock, self._conn:
+            if is_throttled(error):
+                self._slowdown = min(MAX_SLOWDOWN, self._slowdown * 2)
+                self._not_before = now + self._interval()
+                logger.warning(f"Gmail is throttling sends; slowing to one per {self._interval():.0f}s.")
+            if retry:
+                # Without a backoff a network blip burns every attempt within seconds
+                self._not_before = max(self._not_before, now + self._interval() * 2 ** item.attempts)
+                self._conn.execute(
+                    "UPDATE send_queue SET attempts = attempts + 1 WHERE draft_id = ?", (item.draft_id,)
+                )
+            else:
+                self._conn.execute("DELETE FROM send_queue WHERE draft_id = ?", (item.draft_id,))
+        return retry
+
+    def describe(self) -> str:
+        """One-line summary of the configured pace, for the mode banner."""
+        return describe_pace(self.per_minute, self.per_day, self.domain_spacing)
@@ -23,9 +23,9 @@ class AgentState(TypedDict):
     selected_emails: List[str]  # The final choice(s) made by user or default
     
     # Context Data
-    resume_content: str         # Loaded from resume.md
+    resume_ref: str             # Blob reference to resume.md's text (see src.blobs)
     resume_pdf_path: Optional[str]  # Path to resume PDF for attachment
-    search_summary: str         # Research Context from Google Search
+    research_ref: str           # Blob reference to the research summary
     company_domain: str         # e.g. Fintech, AI, SaaS
     
     # Email Content
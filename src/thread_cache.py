@@ -0,0 +1,62 @@
+"""
+In-process cache of full Gmail threads.
+
+A thread is fetched once in full and kept together with its ``historyId``;
+metadata, plaintext history and reply headers are all derived from that
+copy. Callers that know a thread's current historyId (``threads.list``
+returns it) pass it in, and a cached copy with a different one is stale and
+fetched again. Drafting a reply through ACE drops the thread's entry, since
+that changes the thread.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from config.settings import THREAD_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadCache:
+    """Bounded LRU of full thread resources, keyed by thread id."""
+
+    def __init__(self, max_entries: int = THREAD_CACHE_SIZE):
+        self.max_entries = max(max_entries, 1)
+        self._lock = threading.Lock()
+        self._threads: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, thread_id: str, history_id: Optional[str] = None) -> Optional[dict]:
+        """Returns the cached thread, or None if absent or older than ``history_id``."""
+        with self._lock:
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                return None
+            if history_id is not None and str(thread.get("historyId")) != str(history_id):
+                logger.debug(f"Thread {thread_id} changed (historyId {history_id}); refetching.")
+                del self._threads[thread_id]
+                return None
+            self._threads.move_to_end(thread_id)
+            return thread
+
+    def put(self, thread: dict) -> None:
+        with self._lock:
+            self._threads[thread["id"]] = thread
+            self._threads.move_to_end(thread["id"])
+            while len(self._threads) > self.max_entries:
+                self._threads.popitem(last=False)
+
+    def invalidate(self, thread_id: str) -> None:
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+
+_thread_cache: Optional[ThreadCache] = None
+
+
+def get_thread_cache() -> ThreadCache:
+    """Returns the process-wide ThreadCache, creating it on first use."""
+    global _thread_cache
+    if _thread_cache is None:
+        _thread_cache = ThreadCache()
+    return _thread_cache
@@ -0,0 +1,181 @@
+"""
+Compact plain text of Gmail messages for LLM prompts.
+
+A message's MIME tree is walked depth-first, so bodies nested inside
+multipart/mixed or multipart/related are found too. In a
+multipart/alternative the text/plain branch is preferred and text/html is
+converted to text only when there is no plain body. Attachments are never
+decoded.
+
+Quoted reply chains ("On ... wrote:", "> ..." lines, Outlook headers,
+Gmail's quote blocks) and signatures are dropped: every earlier message is
+already in the thread, so quoting it again only makes the prompt longer.
+"""
+import base64
+import re
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional, Tuple
+
+# Rough size of a token for English prose; good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# ---------------------------------------------------------------------------
+# MIME Walk
+# ---------------------------------------------------------------------------
+def _charset(part: dict) -> str:
+    for header in part.get("headers", []):
+        if header["name"].lower() == "content-type":
+            match = re.search(r'charset="?([\w.:-]+)', header["value"], re.IGNORECASE)
+            if match:
+                return match.group(1)
+    return "utf-8"
+
+
+def _decode(part: dict) -> str:
+    data = part.get("body", {}).get("data", "")
+    if not data:
+        return ""  # empty, or a large body stored as an attachment
+    raw = base64.urlsafe_b64decode(data)
+    try:
+        return raw.decode(_charset(part), errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+
+def _has_plain(part: dict) -> bool:
+    if part.get("mimeType") == "text/plain" and not part.get("filename"):
+        return True
+    return any(_has_plain(child) for child in part.get("parts") or [])
+
+
+def iter_bodies(part: dict) -> Iterator[Tuple[str, str]]:
+    """Yields ``(mime_type, text)`` for each displayable body of a Gmail message payload."""
+    mime_type = part.get("mimeType", "")
+    children = part.get("parts") or []
+    if children:
+        if mime_type == "multipart/alternative":
+            # Alternatives are ordered simplest first; take the first plain one, else the richest
+            children = [next((c for c in children if _has_plain(c)), children[-1])]
+        for child in children:
+            yield from iter_bodies(child)
+    elif mime_type in ("text/plain", "text/html") and not part.get("filename"):
+        text = _decode(part)
+        if text.strip():
+            yield mime_type, text
+
+
+def message_text(payload: dict) -> str:
+    """Plain text of a message payload with quoted history and signature removed."""
+    texts = []
+    for mime_type, text in iter_bodies(payload):
+        if mime_type == "text/html":
+            text = html_to_text(text)
+        texts.append(strip_quoted(text))
+    return "\n\n".join(t for t in texts if t)
+
+
+# ---------------------------------------------------------------------------
+# HTML to Text
+# ---------------------------------------------------------------------------
+_BLOCK_TAGS = {"p", "div", "br", "tr", "li", "ul", "ol", "table", "h1", "h2", "h3", "h4", "h5", "h6", "hr"}
+_SKIP_TAGS = {"script", "style", "head", "title", "blockquote"}
+_QUOTE_CLASSES = {"gmail_quote", "gmail_signature", "gmail_extra", "yahoo_quoted", "moz-cite-prefix"}
+_VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "col", "area", "base", "wbr", "source"}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks: List[str] = []
+        # The element whose subtree is left out, and how many elements of that
+        # name are open inside it (itself included). Other tags in the subtree
+        # are ignored, so ones left unclosed cannot end the skip early or late.
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if not self._skip_tag and tag in _BLOCK_TAGS:
+                self.chunks.append("\n")
+            return
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        attrs = dict(attrs)
+        classes = set((attrs.get("class") or "").split())
+        # divRplyFwdMsg holds Outlook's quoted header block
+        if tag in _SKIP_TAGS or classes & _QUOTE_CLASSES or attrs.get("id") == "divRplyFwdMsg":
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in _BLOCK_TAGS:
+            self.chunks.append("\n")
+        if tag == "li":
+            self.chunks.append("- ")
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+        elif tag in _BLOCK_TAGS and tag != "li":  # the next item starts its own line
+            self.chunks.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_tag:
+            self.chunks.append(re.sub(r"\s+", " ", data))
+
+
+def html_to_text(html: str) -> str:
+    """Visible text of an HTML body, one line per block element, quotes and signatures left out."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = [line.strip() for line in "".join(parser.chunks).split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+# ---------------------------------------------------------------------------
+# Quote and Signature Stripping
+# ---------------------------------------------------------------------------
+# Lines that start the quoted copy of an earlier message; everything below goes
+_QUOTE_HEADER = re.compile(
+    r"^(On\s.+wrote:\s*$"
+    r"|-+\s*Original Message\s*-+"
+    r"|-+\s*Forwarded message\s*-+"
+    r"|_{10,}\s*$)",
+    re.IGNORECASE,
+)
+# Lines that start a signature
+_SIGNATURE = re.compile(r"^(--\s*$|Sent from my\s|Get Outlook for\s)", re.IGNORECASE)
+
+
+def strip_quoted(text: str) -> str:
+    """Drops ``>`` quotes, the quoted earlier message and the signature from a plain-text body."""
+    lines = text.replace("\r\n", "\n").split("\n")
+    kept = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith(">"):
+            continue
+        if _SIGNATURE.match(stripped):
+            break
+        if _QUOTE_HEADER.match(stripped):
+            break
+        following = lines[i + 1].strip().lower() if i + 1 < len(lines) else ""
+        # Gmail wraps long attributions: "On Mon, 1 Jan 2024 at 10:00, Name <a@b.c>\nwrote:"
+        if stripped.lower().startswith("on ") and following == "wrote:":
+            break
+        # Outlook's header block: "From: ...\nSent: ..."
+        if stripped.lower().startswith("from:") and following.startswith(("sent:", "date:")):
+            break
+        kept.append(line)
+    return "\n".join(kept).strip()
@@ -1,15 +1,13 @@
 import logging
 import re
 from typing import Dict, List, Optional
-from googleapiclient.discovery import build
-from src.google_auth import get_credentials
+from src.google_clients import get_service
 from config.settings import GOOGLE_SHEET_NAME, GOOGLE_SHEET_ID
 
 logger = logging.getLogger(__name__)
 
 def get_sheets_service():
-    creds = get_credentials()
-    return build('sheets', 'v4', credentials=creds)
+    return get_service('sheets', 'v4')
 
 def get_sheet_id(service, spreadsheet_id, sheet_name):
     """Gets the numeric sheetId (gid) for a given sheet name."""
@@ -134,6 +132,7 @@ def get_all_leads_with_status():
             leads_to_sync.append({
                 "row_index": i,
                 "email": email,
+                "status": status,
                 "thread_idx": thread_idx
             })
             
@@ -154,3 +153,12 @@ def update_thread_id(row_index: int, thread_id: str, thread_idx: int):
         body=body
     ).execute()
     logger.info(f"Updated Row {row_index} with Thread ID: {thread_id}")
+
+
+def update_thread_ids(thread_ids: Dict[int, str], thread_idx: int):
+    """Writes many rows' Thread IDs (row_index -> thread id) in one batched update."""
+    from src.tools_sheets import get_sheet_writer
+    if not thread_ids:
+        return
+    get_sheet_writer().write_many({(row, thread_idx): tid for row, tid in thread_ids.items()})
+    logger.info(f"Thread IDs queued for {len(thread_ids)} row(s).")
@@ -1,18 +1,29 @@
+import asyncio
 import base64
 import logging
 import os
 import mimetypes
 import random
 import re
+import threading
 import time
+from datetime import date
+from io import BytesIO
+from email.generator import BytesGenerator
 from email.message import EmailMessage
 from email.policy import default
-from typing import List, Optional, Tuple
+from email.utils import getaddresses
+from typing import Callable, Dict, List, Optional, Tuple
 
 import markdown
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from src.google_auth import get_credentials
+from googleapiclient.http import MediaIoBaseUpload
+from config.settings import GMAIL_BATCH_SIZE, GMAIL_MEDIA_UPLOAD, THREAD_HISTORY_TOKEN_BUDGET
+from src.google_clients import get_service
+from src.limits import api_limit, async_api_limit
+from src.mailbox_index import get_mailbox_index, is_bounce_sender
+from src.thread_cache import get_thread_cache
+from src.thread_text import CHARS_PER_TOKEN, estimate_tokens, message_text
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +56,7 @@ EMAIL_SIGNATURE = """
 # Gmail Service
 # ---------------------------------------------------------------------------
 def get_gmail_service():
-    creds = get_credentials()
-    return build('gmail', 'v1', credentials=creds)
+    return get_service('gmail', 'v1')
 
 
 # ---------------------------------------------------------------------------
@@ -54,6 +64,8 @@ def get_gmail_service():
 # ---------------------------------------------------------------------------
 from dataclasses import dataclass, field
 from email_validator import validate_email as _ev_validate, EmailNotValidError
+from email_validator.deliverability import validate_email_deliverability
+from src.validation_cache import DomainEntry, SyntaxEntry, get_validation_cache
 
 
 @dataclass
@@ -65,27 +77,65 @@ class ValidationResult:
     failure_reason: str = ""
 
 
+def _check_syntax(email: str) -> SyntaxEntry:
+    cache = get_validation_cache()
+    entry = cache.get_syntax(email)
+    if entry is None:
+        try:
+            info = _ev_validate(email, check_deliverability=False)
+            entry = SyntaxEntry(True, info.normalized, info.ascii_domain)
+        except EmailNotValidError as e:
+            entry = SyntaxEntry(False, reason=str(e))
+        cache.put_syntax(email, entry)
+    return entry
+
+
+def _check_domain(ascii_domain: str, domain_i18n: str) -> DomainEntry:
+    cache = get_validation_cache()
+    entry = cache.get_domain(ascii_domain)
+    if entry is None:
+        try:
+            info = validate_email_deliverability(ascii_domain, domain_i18n)
+        except EmailNotValidError as e:
+            entry = DomainEntry(False, str(e))
+            cache.put_domain(ascii_domain, entry)
+        else:
+            entry = DomainEntry(True)
+            # Timeouts/resolver failures are not a verdict; retry next time
+            if "unknown-deliverability" not in info:
+                cache.put_domain(ascii_domain, entry)
+    return entry
+
+
 def validate_email(email: str) -> ValidationResult:
     """Validates an email address using RFC syntax checks and DNS MX record lookup.
 
+    Syntax results are cached per address and MX results per domain
+    (see src.validation_cache), so repeated addresses and colleagues at
+    the same company do not trigger new DNS lookups.
+
     Returns a ValidationResult with normalized email on success,
     or a human-readable failure_reason on failure.
     """
-    try:
-        info = _ev_validate(email, check_deliverability=True)
-        return ValidationResult(
-            original=email,
-            is_valid=True,
-            normalized=info.normalized,
-        )
-    except EmailNotValidError as e:
-        reason = str(e)
-        logger.warning(f"Email validation failed for '{email}': {reason}")
-        return ValidationResult(
-            original=email,
-            is_valid=False,
-            failure_reason=reason,
-        )
+    syntax = _check_syntax(email)
+    if syntax.is_valid:
+        domain = _check_domain(syntax.ascii_domain, syntax.normalized.rsplit('@', 1)[-1])
+        if domain.is_valid:
+            return ValidationResult(
+                original=email,
+                is_valid=True,
+                normalized=syntax.normalized,
+            )
+        reason = domain.reason
+    else:
+        reason = syntax.reason
+
+    logger.warning(f"Email validation failed for '{email}': {reason}")
+    return ValidationResult(
+        original=email,
+        is_valid=False,
+        failure_reason=reason,
+    )
 
 
 def validate_recipients(recipients: str) -> Tuple[List[str], List[str]]:
@@ -108,7 +158,8 @@ def _execute_with_retry(api_call, max_retries: int = 3):
     """Executes a Gmail API call with exponential backoff on 429 errors."""
     for attempt in range(max_retries + 1):
         try:
-            return api_call()
+            with api_limit("gmail"):
+                return api_call()
         except HttpError as e:
             if e.resp.status == 429 and attempt < max_retries:
                 wait = (2 ** attempt) + random.uniform(0, 1)
@@ -121,6 +172,45 @@ def _execute_with_retry(api_call, max_retries: int = 3):
                 raise
 
 
+def _execute_batch(service, build_request: Callable[[str], object], ids: List[str], max_retries: int = 3) -> Dict[str, dict]:
+    """Runs one Gmail read per id through HTTP batch requests.
+
+    Up to GMAIL_BATCH_SIZE reads share a round trip. Items rejected with 429
+    are retried together in a later batch with exponential backoff; items
+    that fail otherwise, or run out of retries, are logged and left out of
+    the returned ``{id: response}`` dict.
+    """
+    results: Dict[str, dict] = {}
+    pending = list(dict.fromkeys(ids))
+    for attempt in range(max_retries + 1):
+        rate_limited: List[str] = []
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status == 429 and attempt < max_retries:
+                rate_limited.append(request_id)
+            else:
+                logger.warning(f"Batched Gmail read for {request_id} failed: {exception}")
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for item_id in pending[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(build_request(item_id), request_id=item_id)
+            _execute_with_retry(batch.execute)
+
+        if not rate_limited:
+            break
+        wait = (2 ** attempt) + random.uniform(0, 1)
+        logger.warning(
+            f"Rate limited (429) on {len(rate_limited)} batched read(s). Retrying in {wait:.1f}s "
+            f"(attempt {attempt + 1}/{max_retries})"
+        )
+        time.sleep(wait)
+        pending = rate_limited
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Text Processing
 # ---------------------------------------------------------------------------
@@ -158,12 +248,85 @@ def markdown_to_html(text: str) -> str:
         return ""
     text = re.sub(r"^[•\*\-\+]\s+", "- ", text, flags=re.MULTILINE)
     text = re.sub(r"([^\n])\n(- \s*)", r"\1\n\n\2", text)
-    return markdown.markdown(text)
+    return _markdown_converter().reset().convert(text)
+
+
+_markdown_local = threading.local()
+
+
+def _markdown_converter() -> markdown.Markdown:
+    """This thread's Markdown instance; building one loads every extension, so reuse it."""
+    converter = getattr(_markdown_local, "converter", None)
+    if converter is None:
+        converter = _markdown_local.converter = markdown.Markdown()
+    return converter
 
 
 # ---------------------------------------------------------------------------
 # Email Building (shared by create_draft and send_email)
 # ---------------------------------------------------------------------------
+# The HTML body wraps the rendered Markdown and the signature; only the middle changes
+_HTML_PREFIX, _HTML_SUFFIX = f'''
+    <div dir="ltr" style="font-family: Arial, sans-serif; font-size: 12px; color: #000000;">
+        {{body}}
+        {EMAIL_SIGNATURE}
+    </div>
+    '''.split("{body}")
+
+# Line length is left alone so long header values are not re-folded
+_SEND_POLICY = default.clone(max_line_length=None)
+
+
+class _EncodedPart(EmailMessage):
+    """A MIME part whose serialized form is computed once and reused."""
+
+    serialized: bytes = b""
+
+
+class _MessageGenerator(BytesGenerator):
+    """BytesGenerator that copies an _EncodedPart's bytes instead of re-walking its payload."""
+
+    def _write(self, msg):
+        if isinstance(msg, _EncodedPart) and msg.serialized:
+            self._fp.write(msg.serialized)
+        else:
+            super()._write(msg)
+
+
+_attachment_lock = threading.Lock()
+_attachment_parts: Dict[str, Tuple[Tuple[int, int], _EncodedPart]] = {}
+
+
+def _attachment_part(attachment_path: str) -> _EncodedPart:
+    """The attachment as a ready, base64-encoded MIME part, rebuilt only when the file changes.
+
+    Parts are shared between messages and must not be modified.
+    """
+    stat = os.stat(attachment_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _attachment_lock:
+        cached = _attachment_parts.get(attachment_path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+    filename = os.path.basename(attachment_path)
+    ctype, _ = mimetypes.guess_type(attachment_path)
+    if ctype is None:
+        ctype = 'application/octet-stream'
+    maintype, subtype = ctype.split('/', 1)
+    with open(attachment_path, 'rb') as f:
+        part = _EncodedPart()
+        part.set_content(
+            f.read(), maintype=maintype, subtype=subtype,
+            disposition='attachment', filename=filename,
+        )
+    part.serialized = _message_bytes(part)
+    with _attachment_lock:
+        _attachment_parts[attachment_path] = (key, part)
+    logger.debug(f"Encoded attachment {filename}")
+    return part
+
+
 def _build_email_message(
     to: str,
     subject: str,
@@ -178,41 +341,90 @@ def _build_email_message(
     message['To'] = to
     message['Subject'] = subject
     message.set_content(plain_text_body)
-
-    html_structure = f'''
-    <div dir="ltr" style="font-family: Arial, sans-serif; font-size: 12px; color: #000000;">
-        {html_body_content}
-        {EMAIL_SIGNATURE}
-    </div>
-    '''
-    message.add_alternative(html_structure, subtype='html')
+    message.add_alternative(_HTML_PREFIX + html_body_content + _HTML_SUFFIX, subtype='html')
 
     if attachment_path and os.path.isfile(attachment_path):
-        filename = os.path.basename(attachment_path)
-        ctype, _ = mimetypes.guess_type(attachment_path)
-        if ctype is None:
-            ctype = 'application/octet-stream'
-        maintype, subtype = ctype.split('/', 1)
-        with open(attachment_path, 'rb') as f:
-            message.add_attachment(
-                f.read(), maintype=maintype, subtype=subtype, filename=filename
-            )
-        logger.info(f"Attached file: {filename}")
+        message.make_mixed()
+        message.attach(_attachment_part(attachment_path))
+        logger.info(f"Attached file: {os.path.basename(attachment_path)}")
 
     return message
 
 
-def _encode_message(message: EmailMessage) -> str:
-    """Encodes an EmailMessage to base64url string."""
-    user_policy = default.clone(max_line_length=None)
-    return base64.urlsafe_b64encode(
-        message.as_bytes(policy=user_policy)
-    ).decode()
+def _message_bytes(message: EmailMessage) -> bytes:
+    """Serializes an EmailMessage (as ``as_bytes`` would), reusing pre-encoded parts."""
+    buffer = BytesIO()
+    _MessageGenerator(buffer, mangle_from_=False, policy=_SEND_POLICY).flatten(message)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Message Upload
+# ---------------------------------------------------------------------------
+# Drafts and sends go up as message/rfc822 media rather than a base64url "raw"
+# JSON field: a third fewer bytes on the wire and no encoded copy in memory.
+# Messages above this size are uploaded resumably, in chunks.
+_RESUMABLE_UPLOAD_BYTES = 5 * 1024 * 1024
+# Statuses after which the same message is retried through the "raw" field
+_MEDIA_FALLBACK_STATUSES = (400, 413, 415)
+
+
+def _upload_calls(method, data: bytes, thread_id: Optional[str], draft: bool) -> Tuple[Callable, Callable]:
+    """Zero-argument calls passing ``data`` to ``method`` as media upload and as ``raw``."""
+    def body(**fields) -> dict:
+        if thread_id:
+            fields['threadId'] = thread_id
+        return {'message': fields} if draft else fields
+
+    def via_media():
+        media = MediaIoBaseUpload(
+            BytesIO(data), mimetype='message/rfc822',
+            resumable=len(data) > _RESUMABLE_UPLOAD_BYTES,
+        )
+        return method(userId="me", body=body() or None, media_body=media).execute()
+
+    def via_raw():
+        return method(userId="me", body=body(raw=base64.urlsafe_b64encode(data).decode())).execute()
+
+    return via_media, via_raw
+
+
+def _upload_message(method, message: EmailMessage, thread_id: Optional[str] = None, draft: bool = False) -> dict:
+    """Creates a draft from, or sends, ``message`` via ``method`` (drafts().create or messages().send)."""
+    via_media, via_raw = _upload_calls(method, _message_bytes(message), thread_id, draft)
+    if GMAIL_MEDIA_UPLOAD:
+        try:
+            return _execute_with_retry(via_media)
+        except HttpError as e:
+            if e.resp.status not in _MEDIA_FALLBACK_STATUSES:
+                raise
+            logger.warning(f"Media upload rejected ({e.resp.status}). Retrying as a raw message.")
+    return _execute_with_retry(via_raw)
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
+def _track_thread(thread_id: Optional[str], to: str = "") -> None:
+    """Adds a thread ACE wrote to into the mailbox index (never fails the send)."""
+    if not thread_id:
+        return
+    try:
+        get_mailbox_index().track(thread_id, to.split(","))
+    except Exception as e:
+        logger.warning(f"Could not add thread {thread_id} to the mailbox index: {e}")
+
+
+def _known_bounce(thread_id: str) -> bool:
+    """True if the mailbox index already saw a bounce in ``thread_id``."""
+    try:
+        status = get_mailbox_index().status(thread_id)
+    except Exception as e:
+        logger.warning(f"Could not read the mailbox index: {e}")
+        return False
+    return status is not None and status.is_bounced
+
+
 def create_draft(
     to: str,
     subject: str,
@@ -222,28 +434,14 @@ def create_draft(
     """Creates a Gmail draft with optional attachment. Retries on rate limits."""
     service = get_gmail_service()
     message = _build_email_message(to, subject, body, attachment_path)
-    encoded = _encode_message(message)
-    create_body = {'message': {'raw': encoded}}
-
-    draft = _execute_with_retry(
-        lambda: service.users().drafts().create(
-            userId="me", body=create_body
-        ).execute()
-    )
+    draft = _upload_message(service.users().drafts().create, message, draft=True)
+    _track_thread(draft.get('message', {}).get('threadId'), to)
     logger.info(f"Draft created for: {to}")
     return draft
 
 
-def create_draft_reply(
-    thread_id: str,
-    body: str,
-    attachment_path: Optional[str] = None,
-) -> dict:
-    """Creates a threaded draft reply in an existing Gmail thread with optional attachment."""
-    service = get_gmail_service()
-    
-    # 1. Fetch the original thread to get the last message details for headers
-    thread = service.users().threads().get(userId='me', id=thread_id).execute()
+def _build_reply_message(thread_id: str, thread: dict, body: str, attachment_path: Optional[str]) -> Optional[EmailMessage]:
+    """Builds the reply to the last message in ``thread``, or None if the thread bounced."""
     messages = thread.get('messages', [])
     if not messages:
         raise ValueError(f"Thread {thread_id} has no messages.")
@@ -253,15 +451,14 @@ def create_draft_reply(
     
     for msg in messages:
         headers = {h['name']: h['value'] for h in msg['payload']['headers']}
-        from_field = headers.get('From', '').lower()
-        if 'mailer-daemon' in from_field or 'postmaster' in from_field:
+        if is_bounce_sender(headers.get('From', '')):
             is_bounced = True
         else:
             last_valid_msg = msg
 
     if is_bounced:
         logger.info(f"Bounced email detected in thread {thread_id}. Skipping draft creation.")
-        return {"is_bounced": True}
+        return None
 
     if not last_valid_msg:
         last_valid_msg = messages[-1]
@@ -283,31 +480,43 @@ def create_draft_reply(
     prev_references = headers.get('references', '')
     references = f"{prev_references} {msg_id}".strip() if msg_id else prev_references
     
-    # 2. Build the reply message (reuse shared builder for body + attachment)
+    # Build the reply message (reuse shared builder for body + attachment)
     message = _build_email_message(to_field, subject, body, attachment_path)
     if msg_id:
         message['In-Reply-To'] = msg_id
     if references:
         message['References'] = references
     message['From'] = headers.get('from', 'me')
+    return message
+
+
+def create_draft_reply(
+    thread_id: str,
+    body: str,
+    attachment_path: Optional[str] = None,
+) -> dict:
+    """Creates a threaded draft reply in an existing Gmail thread with optional attachment."""
+    service = get_gmail_service()
+
+    # A bounce already seen by the mailbox sync needs no read at all
+    if _known_bounce(thread_id):
+        logger.info(f"Bounced email detected in thread {thread_id}. Skipping draft creation.")
+        return {"is_bounced": True}
     
-    encoded = _encode_message(message)
-    
-    # 3. Create the draft with the threadId
-    create_body = {
-        'message': {
-            'threadId': thread_id,
-            'raw': encoded
-        }
-    }
+    # 1. Fetch the original thread (usually cached) for the last message's headers
+    thread = get_thread(thread_id)
 
-    draft = _execute_with_retry(
-        lambda: service.users().drafts().create(
-            userId="me", body=create_body
-        ).execute()
-    )
+    # 2. Build the reply (None means the thread contains a bounce)
+    message = _build_reply_message(thread_id, thread, body, attachment_path)
+    if message is None:
+        return {"is_bounced": True}
+
+    # 3. Create the draft with the threadId, so it lands in the same conversation
+    draft = _upload_message(service.users().drafts().create, message, thread_id=thread_id, draft=True)
+    get_thread_cache().invalidate(thread_id)
+    _track_thread(thread_id)
     logger.info(f"Threaded draft reply created in thread: {thread_id}")
-    draft['is_bounced'] = is_bounced
+    draft['is_bounced'] = False
     return draft
 
 
@@ -320,14 +529,120 @@ def send_email(
     """Sends a multipart email with optional attachment. Retries on rate limits."""
     service = get_gmail_service()
     message = _build_email_message(to, subject, body, attachment_path)
-    encoded = _encode_message(message)
-    send_body = {'raw': encoded}
+    result = _upload_message(service.users().messages().send, message)
+    _track_thread(result.get('threadId'), to)
+    logger.info(f"Email sent to: {to}")
+    return result
 
-    result = _execute_with_retry(
-        lambda: service.users().messages().send(
-            userId="me", body=send_body
-        ).execute()
-    )
+
+# ---------------------------------------------------------------------------
+# Async API
+# ---------------------------------------------------------------------------
+# googleapiclient is blocking, so each request runs in a worker thread, but
+# only after an async Gmail slot is free: waiting leads cost no threads.
+async def _aexecute_with_retry(api_call, max_retries: int = 3):
+    """Async variant of _execute_with_retry."""
+    for attempt in range(max_retries + 1):
+        try:
+            async with async_api_limit("gmail"):
+                return await asyncio.to_thread(api_call)
+        except HttpError as e:
+            if e.resp.status == 429 and attempt < max_retries:
+                wait = (2 ** attempt) + random.uniform(0, 1)
+                logger.warning(
+                    f"Rate limited (429). Retrying in {wait:.1f}s "
+                    f"(attempt {attempt + 1}/{max_retries})"
+                )
+                await asyncio.sleep(wait)
+            else:
+                raise
+
+
+async def _aupload_message(method, message: EmailMessage, thread_id: Optional[str] = None, draft: bool = False) -> dict:
+    """Async variant of _upload_message."""
+    # Serializing reads attachments: keep it off the event loop
+    data = await asyncio.to_thread(_message_bytes, message)
+    via_media, via_raw = _upload_calls(method, data, thread_id, draft)
+    if GMAIL_MEDIA_UPLOAD:
+        try:
+            return await _aexecute_with_retry(via_media)
+        except HttpError as e:
+            if e.resp.status not in _MEDIA_FALLBACK_STATUSES:
+                raise
+            logger.warning(f"Media upload rejected ({e.resp.status}). Retrying as a raw message.")
+    return await _aexecute_with_retry(via_raw)
+
+
+async def avalidate_email(email: str) -> ValidationResult:
+    """Async variant of validate_email (DNS lookups run off the event loop)."""
+    return await asyncio.to_thread(validate_email, email)
+
+
+async def avalidate_recipients(recipients: str) -> Tuple[List[str], List[str]]:
+    """Async variant of validate_recipients."""
+    emails = [e.strip() for e in recipients.split(',') if e.strip()]
+    results = await asyncio.gather(*(avalidate_email(e) for e in emails))
+    valid = [r.normalized for r in results if r.is_valid]
+    invalid = [r.original for r in results if not r.is_valid]
+    return valid, invalid
+
+
+async def acreate_draft(
+    to: str,
+    subject: str,
+    body: str,
+    attachment_path: Optional[str] = None,
+) -> dict:
+    """Async variant of create_draft."""
+    service = get_gmail_service()
+    message = await asyncio.to_thread(_build_email_message, to, subject, body, attachment_path)
+    draft = await _aupload_message(service.users().drafts().create, message, draft=True)
+    await asyncio.to_thread(_track_thread, draft.get('message', {}).get('threadId'), to)
+    logger.info(f"Draft created for: {to}")
+    return draft
+
+
+async def acreate_draft_reply(
+    thread_id: str,
+    body: str,
+    attachment_path: Optional[str] = None,
+) -> dict:
+    """Async variant of create_draft_reply."""
+    service = get_gmail_service()
+    if await asyncio.to_thread(_known_bounce, thread_id):
+        logger.info(f"Bounced email detected in thread {thread_id}. Skipping draft creation.")
+        return {"is_bounced": True}
+
+    thread = get_thread_cache().get(thread_id)
+    if thread is None:
+        thread = await _aexecute_with_retry(
+            lambda: service.users().threads().get(userId='me', id=thread_id).execute()
+        )
+        get_thread_cache().put(thread)
+
+    message = await asyncio.to_thread(_build_reply_message, thread_id, thread, body, attachment_path)
+    if message is None:
+        return {"is_bounced": True}
+
+    draft = await _aupload_message(service.users().drafts().create, message, thread_id=thread_id, draft=True)
+    get_thread_cache().invalidate(thread_id)
+    await asyncio.to_thread(_track_thread, thread_id)
+    logger.info(f"Threaded draft reply created in thread: {thread_id}")
+    draft['is_bounced'] = False
+    return draft
+
+
+async def asend_email(
+    to: str,
+    subject: str,
+    body: str,
+    attachment_path: Optional[str] = None,
+) -> dict:
+    """Async variant of send_email."""
+    service = get_gmail_service()
+    message = await asyncio.to_thread(_build_email_message, to, subject, body, attachment_path)
+    result = await _aupload_message(service.users().messages().send, message)
+    await asyncio.to_thread(_track_thread, result.get('threadId'), to)
     logger.info(f"Email sent to: {to}")
     return result
 
@@ -369,22 +684,34 @@ def get_draft_details(draft_id: str) -> dict:
     draft = _execute_with_retry(
         lambda: service.users().drafts().get(
             userId="me", id=draft_id, format="metadata",
-            metadataHeaders=["To", "Subject"],
         ).execute()
     )
     return draft
 
 
-def send_draft(draft_id: str) -> dict:
+def get_drafts_details_bulk(draft_ids: List[str]) -> Dict[str, dict]:
+    """Batched get_draft_details: ``{draft_id: draft}`` for every draft that could be read."""
+    service = get_gmail_service()
+    return _execute_batch(
+        service,
+        # drafts.get has no metadataHeaders filter; metadata format returns every header
+        lambda draft_id: service.users().drafts().get(userId="me", id=draft_id, format="metadata"),
+        draft_ids,
+    )
+
+
+def send_draft(draft_id: str, max_retries: int = 3) -> dict:
     """Sends an existing Gmail draft by its ID. Retries on rate limits.
 
-    Returns the sent message object from the Gmail API.
+    Returns the sent message object from the Gmail API. Pass
+    ``max_retries=0`` when the caller paces and retries sends itself.
     """
     service = get_gmail_service()
     result = _execute_with_retry(
         lambda: service.users().drafts().send(
             userId="me", body={"id": draft_id}
-        ).execute()
+        ).execute(),
+        max_retries=max_retries,
     )
     logger.info(f"Draft {draft_id} sent successfully.")
     return result
@@ -417,54 +744,98 @@ def list_starred_threads(max_results: int = 50) -> list[dict]:
     return threads[:max_results]
 
 
+def get_thread(thread_id: str, history_id: Optional[str] = None) -> dict:
+    """Full thread, from the thread cache unless missing or older than ``history_id``."""
+    cache = get_thread_cache()
+    thread = cache.get(thread_id, history_id)
+    if thread is None:
+        service = get_gmail_service()
+        thread = _execute_with_retry(
+            lambda: service.users().threads().get(userId="me", id=thread_id).execute()
+        )
+        cache.put(thread)
+    return thread
+
+
+def get_threads_bulk(
+    thread_ids: List[str], history_ids: Optional[Dict[str, str]] = None
+) -> Dict[str, dict]:
+    """Full threads for ``thread_ids``: ``{thread_id: thread}`` for every thread that could be read.
+
+    Threads found in the thread cache (and current per ``history_ids``, as
+    returned by threads.list) are not re-read; the rest are fetched in
+    batches and cached. One full thread carries what format_thread_history,
+    extract_thread_metadata and a draft reply need, so each thread costs at
+    most one read.
+    """
+    cache = get_thread_cache()
+    history_ids = history_ids or {}
+    threads: Dict[str, dict] = {}
+    missing = []
+    for thread_id in thread_ids:
+        thread = cache.get(thread_id, history_ids.get(thread_id))
+        if thread is None:
+            missing.append(thread_id)
+        else:
+            threads[thread_id] = thread
+
+    if missing:
+        service = get_gmail_service()
+        fetched = _execute_batch(
+            service,
+            lambda thread_id: service.users().threads().get(userId="me", id=thread_id),
+            missing,
+        )
+        for thread in fetched.values():
+            cache.put(thread)
+        threads.update(fetched)
+    return threads
+
+
 def get_thread_history(thread_id: str) -> str:
     """Extracts a readable plaintext history of a thread's messages for LLM parsing."""
-    service = get_gmail_service()
-    thread = _execute_with_retry(
-        lambda: service.users().threads().get(userId="me", id=thread_id).execute()
-    )
-    
-    messages = thread.get('messages', [])
+    return format_thread_history(get_thread(thread_id))
+
+
+def format_thread_history(thread: dict, token_budget: int = THREAD_HISTORY_TOKEN_BUDGET) -> str:
+    """Readable plaintext history of an already fetched (full format) thread.
+
+    Quoted earlier messages and signatures are stripped from each body (see
+    src.thread_text). If the thread is longer than ``token_budget`` the
+    oldest messages are left out, and a newest message that alone exceeds
+    the budget is cut short.
+    """
     chat_log = []
-    
-    for msg in messages:
+    used = 0
+    messages = thread.get('messages', [])
+    for msg in reversed(messages):
         headers = {h['name'].lower(): h['value'] for h in msg['payload']['headers']}
         sender = headers.get('from', 'Unknown')
         date = headers.get('date', 'Unknown Date')
-        
-        # Get raw text body
-        parts = msg.get('payload', {}).get('parts', [])
-        body_data = ""
-        
-        # If it's multipart
-        if parts:
-            for part in parts:
-                if part.get('mimeType') == 'text/plain':
-                    data = part.get('body', {}).get('data', '')
-                    if data:
-                        body_data = base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
-                        break
-        else:
-            # Single part
-            data = msg.get('payload', {}).get('body', {}).get('data', '')
-            if data:
-                body_data = base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
-                
-        # Clean history a bit (optional)
-        body_data = clean_text_plain(body_data)
-        
-        chat_log.append(f"--- Message on {date} ---\nFrom: {sender}\n\n{body_data}\n")
-        
-    return "\n".join(chat_log)
+        body_data = clean_text_plain(message_text(msg['payload']))
+
+        entry = f"--- Message on {date} ---\nFrom: {sender}\n\n{body_data}\n"
+        tokens = estimate_tokens(entry)
+        if used + tokens > token_budget:
+            if not chat_log:
+                chat_log.append(entry[:token_budget * CHARS_PER_TOKEN].rstrip() + " [...]\n")
+            break
+        chat_log.append(entry)
+        used += tokens
+
+    omitted = len(messages) - len(chat_log)
+    if omitted:
+        chat_log.append(f"[{omitted} earlier message(s) omitted]\n")
+    return "\n".join(reversed(chat_log))
 
 
 def get_thread_metadata(thread_id: str) -> dict:
     """Extracts metadata from a thread like its main subject, last reply date, and participant count."""
-    service = get_gmail_service()
-    thread = _execute_with_retry(
-        lambda: service.users().threads().get(userId="me", id=thread_id, format="metadata").execute()
-    )
-    
+    return extract_thread_metadata(get_thread(thread_id))
+
+
+def extract_thread_metadata(thread: dict) -> dict:
+    """Subject, last reply date and message count of an already fetched thread."""
     messages = thread.get('messages', [])
     if not messages:
         return {"subject": "Unknown", "last_date": "Unknown", "msg_count": 0}
@@ -483,3 +854,146 @@ def get_thread_metadata(thread_id: str) -> dict:
         "last_date": last_date,
         "msg_count": len(messages)
     }
+
+
+# ---------------------------------------------------------------------------
+# Mailbox Sync
+# ---------------------------------------------------------------------------
+def _refresh_indexed_threads(service, thread_ids: List[str]) -> int:
+    """Re-reads threads (headers only) into the mailbox index; returns how many were read.
+
+    Threads that could not be read are marked unsynced, so the next sync
+    retries them even though their history is already behind it.
+    """
+    if not thread_ids:
+        return 0
+    index = get_mailbox_index()
+    cache = get_thread_cache()
+    threads = _execute_batch(
+        service,
+        lambda thread_id: service.users().threads().get(
+            userId="me", id=thread_id, format="metadata",
+            metadataHeaders=["From", "To", "Cc"],
+        ),
+        thread_ids,
+    )
+    for thread_id, thread in threads.items():
+        index.record(thread)
+        cache.invalidate(thread_id)
+    failed = [thread_id for thread_id in thread_ids if thread_id not in threads]
+    if failed:
+        index.mark_unsynced(failed)
+        logger.warning(f"{len(failed)} thread(s) could not be re-read; the next sync retries them.")
+    return len(threads)
+
+
+def _history_since(service, start_history_id: str) -> Tuple[set, str]:
+    """Thread ids with messages added since ``start_history_id``, and the mailbox's current history id."""
+    thread_ids = set()
+    latest = start_history_id
+    page_token = None
+    while True:
+        result = _execute_with_retry(
+            lambda pt=page_token: service.users().history().list(
+                userId="me", startHistoryId=start_history_id,
+                historyTypes=["messageAdded"], maxResults=500, pageToken=pt,
+            ).execute()
+        )
+        for record in result.get("history", []):
+            for added in record.get("messagesAdded", []):
+                thread_ids.add(added["message"]["threadId"])
+        latest = result.get("historyId", latest)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return thread_ids, latest
+
+
+def sync_mailbox_index() -> int:
+    """Brings the mailbox index up to date; returns the number of threads re-read.
+
+    Only threads ACE wrote to are indexed. After the first sync, only the
+    history since the stored history id is listed, and only indexed threads
+    that gained messages, were never read, or failed to be read last time are
+    read again. If the stored id has expired (history.list answers 404)
+    every indexed thread is re-read once.
+    """
+    index = get_mailbox_index()
+    service = get_gmail_service()
+    start = index.history_id()
+
+    changed: set = set()
+    latest = None
+    if start is not None:
+        try:
+            added, latest = _history_since(service, start)
+            changed = index.known(added)
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            logger.info("Stored mailbox history id has expired. Re-reading every indexed thread.")
+            start = None
+
+    if start is None:
+        # Take the new starting point before reading, so nothing added meanwhile is missed
+        latest = _execute_with_retry(
+            lambda: service.users().getProfile(userId="me").execute()
+        )["historyId"]
+        changed = set(index.thread_ids())
+
+    changed.update(index.thread_ids(unsynced_only=True))
+    refreshed = _refresh_indexed_threads(service, sorted(changed))
+    index.set_history_id(latest)
+    logger.info(f"Mailbox index synced: {refreshed} thread(s) re-read.")
+    return refreshed
+
+
+def latest_threads_by_recipient(
+    label_id: str,
+    wanted: Optional[List[List[str]]] = None,
+    after: Optional[date] = None,
+) -> Dict[str, str]:
+    """Maps every address messages under ``label_id`` went to onto its most recent thread.
+
+    The label is listed 500 ids per page, newest first, and each page's
+    To/Cc headers are read in batches, so the scan costs a few calls per
+    thousand messages instead of one search per address. ``after`` limits
+    it to messages from that date on; with ``wanted`` (each lead's
+    addresses) it stops after the page on which every lead has a match.
+    """
+    service = get_gmail_service()
+    # Building the resource is costly next to queuing a request, so do it once
+    resource = service.users().messages()
+    query = f"after:{after:%Y/%m/%d}" if after else None
+    latest: Dict[str, Tuple[int, str]] = {}
+    scanned = 0
+    page_token = None
+    while True:
+        result = _execute_with_retry(
+            lambda pt=page_token: resource.list(
+                userId="me", labelIds=[label_id], q=query, maxResults=500, pageToken=pt,
+            ).execute()
+        )
+        messages = _execute_batch(
+            service,
+            lambda message_id: resource.get(
+                userId="me", id=message_id, format="metadata", metadataHeaders=["To", "Cc"],
+            ),
+            [m["id"] for m in result.get("messages", [])],
+        )
+        scanned += len(messages)
+        for message in messages.values():
+            headers = {h["name"].lower(): h["value"] for h in message.get("payload", {}).get("headers", [])}
+            sent_at = int(message.get("internalDate", 0))
+            for _, addr in getaddresses([headers.get("to", ""), headers.get("cc", "")]):
+                addr = addr.lower()
+                if addr and (addr not in latest or sent_at > latest[addr][0]):
+                    latest[addr] = (sent_at, message["threadId"])
+
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+        # Later pages are older, so they cannot hold a newer thread for a matched lead
+        if wanted is not None and all(any(a.lower() in latest for a in addrs) for addrs in wanted):
+            break
+    logger.info(f"Scanned {scanned} {label_id} message(s) for {len(latest)} recipient(s).")
+    return {addr: thread_id for addr, (_, thread_id) in latest.items()}
@@ -1,11 +1,23 @@
+import asyncio
+import atexit
+import json
 import logging
+import os
 import re
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from googleapiclient.discovery import build
-from src.google_auth import get_credentials
-from config.settings import GOOGLE_SHEET_NAME, GOOGLE_SHEET_ID
+from src.google_clients import get_service
+from src.limits import api_limit
+from config.settings import (
+    GOOGLE_SHEET_NAME,
+    GOOGLE_SHEET_ID,
+    LEAD_SOURCE_REFRESH_SECONDS,
+    SHEET_WRITE_BATCH_SIZE,
+    SHEET_WRITE_FLUSH_SECONDS,
+    SHEET_WRITE_JOURNAL,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +25,7 @@ EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
 
 
 def get_sheets_service():
-    creds = get_credentials()
-    return build('sheets', 'v4', credentials=creds)
+    return get_service('sheets', 'v4')
 
 
 def _column_letter(index: int) -> str:
@@ -42,98 +53,392 @@ def extract_emails_from_row(row_data: list, status_index: int) -> List[str]:
     return list(dict.fromkeys(found_emails))
 
 
-def fetch_lead(followup_number: int = 0) -> Optional[Dict]:
-    """
-    Dynamically finds relevant columns and fetches the next row.
-    If followup_number > 0, fetches rows that need follow-up.
-    """
-    if not GOOGLE_SHEET_ID:
-        raise ValueError("GOOGLE_SHEET_ID is not set in environment variables.")
-
-    service = get_sheets_service()
-    sheet = service.spreadsheets()
-
-    range_name = f"'{GOOGLE_SHEET_NAME}'!A:Z"
-    result = sheet.values().get(
-        spreadsheetId=GOOGLE_SHEET_ID, range=range_name
-    ).execute()
-    values = result.get('values', [])
-
-    if not values:
-        return None
-
-    headers = [str(h).strip().lower() for h in values[0]]
-    logger.debug(f"Headers found: {headers}")
-
-    # Robust header detection
-    status_index = -1
-    thread_id_index = -1
-    f1_index = -1
-    f2_index = -1
+def _detect_columns(headers: List[str]) -> Dict[str, int]:
+    """Maps the well-known lead sheet headers to their 0-based column index."""
+    columns = {"status": -1, "thread_id": -1, "f1": -1, "f2": -1, "validation": -1}
 
     for i, h in enumerate(headers):
         if h == "status":
-            status_index = i
+            columns["status"] = i
         elif h == "thread id":
-            thread_id_index = i
+            columns["thread_id"] = i
         elif h == "follow-up 1" or h == "followup 1":
-            f1_index = i
+            columns["f1"] = i
         elif h == "follow-up 2" or h == "followup 2":
-            f2_index = i
+            columns["f2"] = i
+        elif h == "validation":
+            columns["validation"] = i
 
-    if status_index == -1:
-        status_index = 5
+    if columns["status"] == -1:
+        columns["status"] = 5
         logger.warning("'Status' header not found. Defaulting to index 5")
 
-    for i, row in enumerate(values[1:], start=2):
+    return columns
+
+
+class LeadSource:
+    """In-memory snapshot of the lead sheet with a scan cursor per mode.
+
+    The sheet is downloaded once and only re-read after ``refresh_interval``
+    seconds. Rows behind the cursor have already been handed out, so each
+    ``next_lead`` call resumes where the previous one stopped instead of
+    rescanning from row 2. Writes made through ``update_lead_status`` are
+    applied to the snapshot so it never disagrees with what we wrote.
+
+    All methods are thread-safe; a row is handed out by ``next_lead`` once.
+    """
+
+    def __init__(self, refresh_interval: float = LEAD_SOURCE_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.rows: List[list] = []
+        self.columns: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._cursors: Dict[int, int] = {}
+        self._reserved: set = set()
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """Downloads the full sheet into the snapshot (cursors are kept)."""
+        if not GOOGLE_SHEET_ID:
+            raise ValueError("GOOGLE_SHEET_ID is not set in environment variables.")
+
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        # Push buffered status writes first so the download already has them
+        writer = get_sheet_writer()
+        try:
+            writer.flush()
+        except Exception as e:
+            logger.error(f"Could not flush pending sheet writes before reload: {e}")
+
+        service = get_sheets_service()
+        range_name = f"'{GOOGLE_SHEET_NAME}'!A:Z"
+        with api_limit("sheets"):
+            result = service.spreadsheets().values().get(
+                spreadsheetId=GOOGLE_SHEET_ID, range=range_name
+            ).execute()
+        values = result.get('values', [])
+
+        self.rows = values
+        self._loaded_at = time.monotonic()
+        if values:
+            headers = [str(h).strip().lower() for h in values[0]]
+            logger.debug(f"Headers found: {headers}")
+            self.columns = _detect_columns(headers)
+        # Anything still unflushed must not look like a pending lead
+        for (row_index, col_index), value in writer.pending_cells().items():
+            self.apply_update(row_index, col_index, value)
+        logger.info(f"Loaded {max(len(values) - 1, 0)} lead row(s) from sheet.")
+
+    def _ensure_fresh(self) -> None:
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_interval
+        ):
+            self.load()
+
+    def apply_update(self, row_index: int, col_index: int, value: str) -> None:
+        """Mirrors a cell write into the snapshot (row_index is 1-based)."""
+        pos = row_index - 1
+        with self._lock:
+            if pos < 0 or pos >= len(self.rows) or col_index < 0:
+                return
+            row = self.rows[pos]
+            if len(row) <= col_index:
+                row.extend([""] * (col_index + 1 - len(row)))
+            row[col_index] = value
+            if pos == 0:
+                self.columns = _detect_columns([str(h).strip().lower() for h in row])
+
+    def reserve(self, row_indices) -> None:
+        """Keeps ``next_lead`` from handing out rows that are already owned elsewhere."""
+        with self._lock:
+            self._reserved.update(row_indices)
+
+    def _lead_from_row(self, row_index: int, row: list, followup_number: int) -> Dict:
+        status_index = self.columns["status"]
+        thread_id_index = self.columns["thread_id"]
+        lead = {
+            "row_index": row_index,
+            "status_index": status_index,
+            "thread_id_index": thread_id_index,
+            "f1_index": self.columns["f1"],
+            "f2_index": self.columns["f2"],
+            "recipient_name": row[0] if len(row) > 0 else "Unknown",
+            "company_name": row[1] if len(row) > 1 else "Unknown",
+            "position": row[2] if len(row) > 2 else "Unknown",
+            "candidate_emails": extract_emails_from_row(row, status_index),
+            "status": "drafting",
+        }
+        if followup_number > 0:
+            lead["thread_id"] = row[thread_id_index] if thread_id_index != -1 and len(row) > thread_id_index else None
+        return lead
+
+    def _is_due(self, row: list, followup_number: int) -> bool:
+        status_index = self.columns["status"]
         status = row[status_index] if len(row) > status_index else ""
-        
-        # Follow-up Logic
+
         if followup_number > 0:
             # We only follow up if initial status is 'Sent' or 'Drafted'
             if not (status.lower().startswith("sent") or status.lower().startswith("drafted")):
-                continue
-            
+                return False
             # Check if this follow-up is already done
-            current_f_idx = f1_index if followup_number == 1 else f2_index
+            current_f_idx = self.columns["f1"] if followup_number == 1 else self.columns["f2"]
             if current_f_idx != -1 and len(row) > current_f_idx and row[current_f_idx].strip():
-                continue # Already drafted/replied
-            
-            # Found a lead for follow-up
-            candidate_emails = extract_emails_from_row(row, status_index)
-            thread_id = row[thread_id_index] if thread_id_index != -1 and len(row) > thread_id_index else None
-            
-            return {
-                "row_index": i,
-                "status_index": status_index,
-                "thread_id_index": thread_id_index,
-                "f1_index": f1_index,
-                "f2_index": f2_index,
-                "recipient_name": row[0] if len(row) > 0 else "Unknown",
-                "company_name": row[1] if len(row) > 1 else "Unknown",
-                "position": row[2] if len(row) > 2 else "Unknown",
-                "candidate_emails": candidate_emails,
-                "thread_id": thread_id,
-                "status": "drafting",
-            }
-        
-        # Normal Cold Email Logic
-        else:
-            if not status or status.strip() == "":
-                candidate_emails = extract_emails_from_row(row, status_index)
-                return {
-                    "row_index": i,
-                    "status_index": status_index,
-                    "thread_id_index": thread_id_index,
-                    "f1_index": f1_index,
-                    "f2_index": f2_index,
-                    "recipient_name": row[0] if len(row) > 0 else "Unknown",
-                    "company_name": row[1] if len(row) > 1 else "Unknown",
-                    "position": row[2] if len(row) > 2 else "Unknown",
-                    "candidate_emails": candidate_emails,
-                    "status": "drafting",
+                return False  # Already drafted/replied
+            return True
+
+        if status and status.strip() != "":
+            return False
+        # Rows rejected by a --prevalidate pass never reach the LLM
+        validation_index = self.columns.get("validation", -1)
+        if validation_index != -1 and len(row) > validation_index:
+            return not row[validation_index].strip().lower().startswith("invalid")
+        return True
+
+    def next_lead(self, followup_number: int = 0) -> Optional[Dict]:
+        """Returns the next due row after the cursor and advances past it."""
+        with self._lock:
+            self._ensure_fresh()
+            if not self.rows:
+                return None
+
+            pos = self._cursors.get(followup_number, 1)
+            while pos < len(self.rows):
+                row = self.rows[pos]
+                pos += 1
+                if pos not in self._reserved and self._is_due(row, followup_number):
+                    self._cursors[followup_number] = pos
+                    return self._lead_from_row(pos, row, followup_number)
+
+            self._cursors[followup_number] = pos
+            return None
+
+
+_lead_source: Optional[LeadSource] = None
+_lead_source_lock = threading.Lock()
+
+
+def get_lead_source() -> LeadSource:
+    """Returns the process-wide LeadSource, creating it on first use."""
+    global _lead_source
+    if _lead_source is not None:
+        return _lead_source
+    with _lead_source_lock:
+        if _lead_source is None:
+            _lead_source = LeadSource()
+        return _lead_source
+
+
+def fetch_lead(followup_number: int = 0) -> Optional[Dict]:
+    """
+    Fetches the next row that needs a cold email from the cached sheet snapshot.
+    If followup_number > 0, fetches rows that need follow-up.
+    """
+    return get_lead_source().next_lead(followup_number)
+
+
+async def afetch_lead(followup_number: int = 0) -> Optional[Dict]:
+    """Async variant of fetch_lead (a snapshot reload runs off the event loop)."""
+    return await asyncio.to_thread(fetch_lead, followup_number)
+
+
+class SheetWriter:
+    """Write-behind buffer that coalesces single-cell writes into one batchUpdate.
+
+    Every write is appended to a local journal before it is buffered, and the
+    journal is only cleared once the batch has reached the sheet. Entries left
+    behind by a crash are replayed when the next writer is created, so a
+    status can never silently go missing and cause duplicate outreach.
+
+    A daemon thread flushes writes that have waited ``flush_interval``
+    seconds, even when no further write arrives.
+    """
+
+    def __init__(
+        self,
+        journal_path=SHEET_WRITE_JOURNAL,
+        batch_size: int = SHEET_WRITE_BATCH_SIZE,
+        flush_interval: float = SHEET_WRITE_FLUSH_SECONDS,
+    ):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[int, int], str] = {}
+        self._oldest_pending_at: Optional[float] = None
+        self._lock = threading.RLock()
+        # Serializes batchUpdate calls so an older batch never lands after a newer one
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._replay_journal()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_when_due, name="ace-sheet-flush", daemon=True).start()
+
+    def _replay_journal(self) -> None:
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._pending[(entry["row"], entry["col"])] = entry["value"]
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning("Ignoring corrupt sheet journal entry.")
+        if self._pending:
+            self._oldest_pending_at = time.monotonic()
+            logger.warning(f"Recovered {len(self._pending)} unflushed sheet write(s) from journal.")
+
+    def _append_journal(self, cells: Dict[Tuple[int, int], str], path=None) -> None:
+        with open(path or self.journal_path, "a") as f:
+            for (row_index, col_index), value in cells.items():
+                f.write(json.dumps({"row": row_index, "col": col_index, "value": value}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self, cells: Dict[Tuple[int, int], str]) -> None:
+        """Replaces the journal with just ``cells`` (atomically, so a crash keeps one version)."""
+        if not cells:
+            open(self.journal_path, "w").close()
+            return
+        tmp_path = f"{self.journal_path}.tmp"
+        open(tmp_path, "w").close()
+        self._append_journal(cells, tmp_path)
+        os.replace(tmp_path, self.journal_path)
+
+    def _mark_pending(self) -> None:
+        """Starts the age clock for a newly non-empty buffer (call with the lock held)."""
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = time.monotonic()
+            self._wake.set()
+
+    def _flush_when_due(self) -> None:
+        """Background loop flushing the buffer once its oldest write is flush_interval old."""
+        while True:
+            with self._lock:
+                oldest = self._oldest_pending_at
+                self._wake.clear()
+            if oldest is None:
+                self._wake.wait()
+                continue
+            delay = oldest + self.flush_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Sheet batch flush failed, will retry later: {e}")
+                time.sleep(self.flush_interval)
+
+    def pending_cells(self) -> Dict[Tuple[int, int], str]:
+        """Returns a copy of the buffered (row, column) -> value writes."""
+        with self._lock:
+            return dict(self._pending)
+
+    def write(self, row_index: int, col_index: int, value: str) -> None:
+        """Buffers a cell write, flushing when the size or age threshold is hit."""
+        with self._lock:
+            self._append_journal({(row_index, col_index): value})
+            self._pending[(row_index, col_index)] = value
+            self._mark_pending()
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest_pending_at >= self.flush_interval
+            )
+        # Outside our lock: LeadSource.load() takes its lock before ours
+        get_lead_source().apply_update(row_index, col_index, value)
+
+        if due:
+            self._flush_or_defer()
+
+    def _flush_or_defer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            # The journal still holds the writes; the age-flush thread retries them
+            logger.error(f"Sheet batch flush failed, will retry later: {e}")
+
+    def write_many(self, cells: Dict[Tuple[int, int], str]) -> None:
+        """Buffers many (row, column) -> value writes and flushes them as one batch.
+
+        Like ``write``, a failed flush is logged and retried later: the
+        writes are journaled and already visible in the LeadSource snapshot.
+        """
+        with self._lock:
+            self._append_journal(cells)
+            self._pending.update(cells)
+            self._mark_pending()
+        source = get_lead_source()
+        for (row_index, col_index), value in cells.items():
+            source.apply_update(row_index, col_index, value)
+        self._flush_or_defer()
+
+    def flush(self) -> None:
+        """Sends all buffered writes in a single values.batchUpdate call.
+
+        The buffer is swapped out under the lock and sent without it, so
+        writers are not blocked by the network call. A failed batch is put
+        back, behind any newer write to the same cell.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                batch_oldest, self._oldest_pending_at = self._oldest_pending_at, None
+
+            data = [
+                {
+                    "range": f"'{GOOGLE_SHEET_NAME}'!{_column_letter(col_index)}{row_index}",
+                    "values": [[value]],
                 }
-    return None
+                for (row_index, col_index), value in sorted(batch.items())
+            ]
+            try:
+                service = get_sheets_service()
+                with api_limit("sheets"):
+                    service.spreadsheets().values().batchUpdate(
+                        spreadsheetId=GOOGLE_SHEET_ID,
+                        body={"valueInputOption": "USER_ENTERED", "data": data},
+                    ).execute()
+            except BaseException:
+                with self._lock:
+                    batch.update(self._pending)
+                    self._pending = batch
+                    self._oldest_pending_at = batch_oldest
+                raise
+            logger.info(f"Flushed {len(data)} sheet cell update(s) in one batch.")
+
+            # Writes buffered during the call stay journaled; the sent ones go
+            with self._lock:
+                self._rewrite_journal(self._pending)
+
+
+_sheet_writer: Optional[SheetWriter] = None
+_sheet_writer_lock = threading.Lock()
+
+
+def _flush_on_exit() -> None:
+    if _sheet_writer is None:
+        return
+    try:
+        _sheet_writer.flush()
+    except Exception as e:
+        logger.error(f"Final sheet flush failed; writes kept in {_sheet_writer.journal_path}: {e}")
+
+
+def get_sheet_writer() -> SheetWriter:
+    """Returns the process-wide SheetWriter, creating it on first use."""
+    global _sheet_writer
+    if _sheet_writer is not None:
+        return _sheet_writer
+    with _sheet_writer_lock:
+        if _sheet_writer is None:
+            _sheet_writer = SheetWriter()
+            atexit.register(_flush_on_exit)
+        return _sheet_writer
 
 
 def update_lead_status(
@@ -145,9 +450,9 @@ def update_lead_status(
     thread_id: str = None,
     thread_id_index: int = -1
 ) -> None:
-    """Updates the appropriate column (Status or Follow-up) and Thread ID."""
-    service = get_sheets_service()
-    
+    """Queues the Status (or Follow-up) cell and Thread ID for the next batched write."""
+    writer = get_sheet_writer()
+
     # 1. Update Status/Follow-up Column
     target_idx = status_index
     if followup_number == 1 and f_indices and f_indices.get('f1') is not None and f_indices.get('f1') != -1:
@@ -155,29 +460,15 @@ def update_lead_status(
     elif followup_number == 2 and f_indices and f_indices.get('f2') is not None and f_indices.get('f2') != -1:
         target_idx = f_indices['f2']
 
-    col_letter = _column_letter(target_idx)
-    range_name = f"'{GOOGLE_SHEET_NAME}'!{col_letter}{row_index}"
-    body = {'values': [[status_text]]}
-
-    service.spreadsheets().values().update(
-        spreadsheetId=GOOGLE_SHEET_ID,
-        range=range_name,
-        valueInputOption="USER_ENTERED",
-        body=body,
-    ).execute()
-    logger.info(f"Sheet row {row_index} column {col_letter} updated: {status_text}")
+    writer.write(row_index, target_idx, status_text)
+    logger.info(f"Sheet row {row_index} column {_column_letter(target_idx)} queued: {status_text}")
 
     # 2. Update Thread ID Column (if new ID provided and column exists)
     if thread_id and thread_id_index != -1:
-        tid_col_letter = _column_letter(thread_id_index)
-        tid_range = f"'{GOOGLE_SHEET_NAME}'!{tid_col_letter}{row_index}"
-        tid_body = {'values': [[thread_id]]}
-        service.spreadsheets().values().update(
-            spreadsheetId=GOOGLE_SHEET_ID,
-            range=tid_range,
-            valueInputOption="USER_ENTERED",
-            body=tid_body,
-        ).execute()
-        logger.info(f"Thread ID saved to row {row_index} column {tid_col_letter}: {thread_id}")
-
-    time.sleep(1.5)
+        writer.write(row_index, thread_id_index, thread_id)
+        logger.info(f"Thread ID queued for row {row_index} column {_column_letter(thread_id_index)}: {thread_id}")
+
+
+async def aupdate_lead_status(row_index: int, status_text: str, **kwargs) -> None:
+    """Async variant of update_lead_status (a due batch flush runs off the event loop)."""
+    await asyncio.to_thread(update_lead_status, row_index, status_text, **kwargs)
@@ -0,0 +1,128 @@
+"""
+On-disk cache for email validation results.
+
+Syntax checks are cached per normalized address and never expire, since the
+outcome only depends on the string. MX (deliverability) checks are cached per
+domain with separate TTLs for positive and negative answers, so every lead at
+the same company shares a single DNS lookup across nodes and across runs.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config.settings import (
+    VALIDATION_CACHE_FILE,
+    MX_CACHE_TTL_SECONDS,
+    MX_NEGATIVE_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyntaxEntry:
+    """Cached outcome of the RFC syntax check for one address."""
+    is_valid: bool
+    normalized: str = ""
+    ascii_domain: str = ""
+    reason: str = ""
+
+
+@dataclass
+class DomainEntry:
+    """Cached outcome of the MX lookup for one domain."""
+    is_valid: bool
+    reason: str = ""
+
+
+def normalize_address(email: str) -> str:
+    """Cache key for an address: whitespace stripped and domain lowercased.
+
+    The local part keeps its case because the normalized form returned by
+    email-validator does too.
+    """
+    local, sep, domain = email.strip().rpartition("@")
+    return f"{local}{sep}{domain.lower()}" if sep else domain
+
+
+class ValidationCache:
+    """SQLite-backed cache shared by every node that validates addresses."""
+
+    def __init__(
+        self,
+        path=VALIDATION_CACHE_FILE,
+        mx_ttl: float = MX_CACHE_TTL_SECONDS,
+        mx_negative_ttl: float = MX_NEGATIVE_CACHE_TTL_SECONDS,
+    ):
+        self.mx_ttl = mx_ttl
+        self.mx_negative_ttl = mx_negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS syntax (
+                address TEXT PRIMARY KEY,
+                is_valid INTEGER NOT NULL,
+                normalized TEXT NOT NULL,
+                ascii_domain TEXT NOT NULL,
+                reason TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS mx (
+                domain TEXT PRIMARY KEY,
+                is_valid INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+
+    def get_syntax(self, email: str) -> Optional[SyntaxEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT is_valid, normalized, ascii_domain, reason FROM syntax WHERE address = ?",
+                (normalize_address(email),),
+            ).fetchone()
+        if row is None:
+            return None
+        return SyntaxEntry(bool(row[0]), row[1], row[2], row[3])
+
+    def put_syntax(self, email: str, entry: SyntaxEntry) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syntax VALUES (?, ?, ?, ?, ?)",
+                (normalize_address(email), int(entry.is_valid), entry.normalized,
+                 entry.ascii_domain, entry.reason),
+            )
+
+    def get_domain(self, domain: str) -> Optional[DomainEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT is_valid, reason, expires_at FROM mx WHERE domain = ?",
+                (domain.lower(),),
+            ).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        return DomainEntry(bool(row[0]), row[1])
+
+    def put_domain(self, domain: str, entry: DomainEntry) -> None:
+        ttl = self.mx_ttl if entry.is_valid else self.mx_negative_ttl
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mx VALUES (?, ?, ?, ?)",
+                (domain.lower(), int(entry.is_valid), entry.reason, time.time() + ttl),
+            )
+        logger.debug(f"Cached MX verdict for {domain}: {'ok' if entry.is_valid else entry.reason}")
+
+
+_validation_cache: Optional[ValidationCache] = None
+
+
+def get_validation_cache() -> ValidationCache:
+    """Returns the process-wide ValidationCache, opening it on first use."""
+    global _validation_cache
+    if _validation_cache is None:
+        _validation_cache = ValidationCache()
+    return _validation_cache